@@ -1,11 +1,25 @@
-from fastapi import FastAPI
-from app.routers import router  # Import the main router from the routers package
+from typing import Any
 
-app = FastAPI()
 
-# Include routers
-app.include_router(router)  # Use the main router from routers/__init__.py which has all sub-routers included
+def _create_app():
+    from fastapi import FastAPI
+    from app.routers import router  # Import the main router from the routers package
 
-@app.get("/")
-def read_root():
-    return {"message": "Welcome to the FastAPI application!"}
\ No newline at end of file
+    app = FastAPI()
+
+    # Include routers
+    app.include_router(router)  # Use the main router from routers/__init__.py which has all sub-routers included
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Welcome to the FastAPI application!"}
+
+    return app
+
+
+def __getattr__(name: str) -> Any:
+    # Built on first access so importing any app.* module doesn't import every router
+    if name == "app":
+        globals()["app"] = _create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,52 @@
+import asyncio
+import time
+import typer
+from app.utils.startup_profiler import package_totals, profile_imports, startup_timer
+
+# Create a Typer app
+app = typer.Typer(help="Startup profiling commands")
+
+
+@app.command()
+def startup(
+    module: str = typer.Option("app.main", help="Module whose import is profiled"),
+    top: int = typer.Option(25, help="Number of modules and packages to list"),
+    lifespan: bool = typer.Option(True, help="Also run the application lifespan and time its phases"),
+):
+    """
+    Report import time per module and package, then the duration of each lifespan phase.
+    """
+    timings = profile_imports(module)
+    total = next((timing for timing in reversed(timings) if timing.module == module), None)
+
+    typer.echo(f"Import of {module}: {total.cumulative_us / 1000:.1f} ms" if total else f"Import of {module}:")
+    typer.echo(f"\nTop {top} modules by cumulative import time (ms):")
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        typer.echo(f"  {timing.cumulative_us / 1000:9.1f}  {timing.self_us / 1000:9.1f} self  {timing.module}")
+
+    typer.echo(f"\nTop {top} packages by self import time (ms):")
+    for package, self_us in list(package_totals(timings).items())[:top]:
+        typer.echo(f"  {self_us / 1000:9.1f}  {package}")
+
+    if not lifespan:
+        return
+
+    started = time.perf_counter()
+    from app.main import app as fastapi_app
+    imported = time.perf_counter() - started
+
+    async def run_lifespan():
+        async with fastapi_app.router.lifespan_context(fastapi_app):
+            pass
+
+    startup_timer.reset()
+    asyncio.run(run_lifespan())
+
+    typer.echo("\nStartup phases (ms):")
+    typer.echo(f"  {imported * 1000:9.1f}  import {module} (in process)")
+    for phase, seconds in startup_timer.phases.items():
+        typer.echo(f"  {seconds * 1000:9.1f}  {phase}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,135 @@
+"""
+Shared factory for boto3 clients.
+All AWS clients use one tuned botocore configuration and are cached per service,
+region, endpoint and credentials so connection pools are actually reused.
+"""
+import hashlib
+import os
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    from botocore.config import Config
+
+
+def build_client_config() -> "Config":
+    """
+    Build the botocore configuration shared by all clients.
+    Settings come from environment variables since this module sits below the config service.
+    """
+    # boto3/botocore are imported on first use; they dominate import time otherwise
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=int(os.getenv("AWS_MAX_POOL_CONNECTIONS", "50")),
+        retries={
+            "mode": os.getenv("AWS_RETRY_MODE", "adaptive"),
+            "max_attempts": int(os.getenv("AWS_MAX_ATTEMPTS", "3")),
+        },
+        connect_timeout=float(os.getenv("AWS_CONNECT_TIMEOUT", "2")),
+        read_timeout=float(os.getenv("AWS_READ_TIMEOUT", "5")),
+        tcp_keepalive=True,
+    )
+
+
+ClientKey = Tuple[str, Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
+def _secret_digest(aws_secret_access_key: Optional[str], aws_session_token: Optional[str]) -> Optional[str]:
+    """
+    Digest of the secret parts of a set of credentials, for the client cache key.
+    Rotated secrets under the same access key get a new client, and the secrets
+    themselves are never kept in the key.
+    """
+    if aws_secret_access_key is None and aws_session_token is None:
+        return None
+    digest = hashlib.sha256()
+    for part in (aws_secret_access_key, aws_session_token):
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AWSClientFactory:
+    """
+    Thread-safe cache of boto3 clients.
+    boto3 clients are safe to share between threads, but sessions are not,
+    so client creation is serialized behind a lock.
+    """
+
+    def __init__(self, config: Optional["Config"] = None):
+        self._config = config
+        self._clients: Dict[ClientKey, object] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> "Config":
+        """The shared botocore configuration"""
+        if self._config is None:
+            self._config = build_client_config()
+        return self._config
+
+    def get_client(
+        self,
+        service_name: str,
+        region_name: Optional[str] = None,
+        endpoint_url: Optional[str] = None,
+        aws_access_key_id: Optional[str] = None,
+        aws_secret_access_key: Optional[str] = None,
+        aws_session_token: Optional[str] = None
+    ):
+        """Get the cached client for a service, creating it on first use"""
+        key = (
+            service_name,
+            region_name,
+            endpoint_url,
+            aws_access_key_id,
+            _secret_digest(aws_secret_access_key, aws_session_token),
+        )
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                import boto3
+
+                session = boto3.session.Session(
+                    aws_access_key_id=aws_access_key_id,
+                    aws_secret_access_key=aws_secret_access_key,
+                    aws_session_token=aws_session_token,
+                    region_name=region_name
+                )
+                client = session.client(service_name, endpoint_url=endpoint_url, config=self.config)
+                self._clients[key] = client
+            return client
+
+    def clear(self) -> None:
+        """Drop all cached clients (e.g. after credentials or settings change)"""
+        with self._lock:
+            self._clients.clear()
+            self._config = None
+
+
+# Global instance
+aws_client_factory = AWSClientFactory()
+
+
+def get_aws_client(
+    service_name: str,
+    region_name: Optional[str] = None,
+    endpoint_url: Optional[str] = None,
+    aws_access_key_id: Optional[str] = None,
+    aws_secret_access_key: Optional[str] = None,
+    aws_session_token: Optional[str] = None
+):
+    """Get a shared boto3 client for the given service"""
+    return aws_client_factory.get_client(
+        service_name,
+        region_name=region_name,
+        endpoint_url=endpoint_url,
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        aws_session_token=aws_session_token
+    )
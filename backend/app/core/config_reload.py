@@ -0,0 +1,115 @@
+"""
+Triggers for configuration hot reload: changes to the env and secrets files, SIGHUP,
+and a periodic Secrets Manager poll. Each trigger calls ConfigService.reload, which
+swaps in a new snapshot and notifies the subscribers whose settings changed.
+"""
+import asyncio
+import os
+import signal
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set
+from app.core.config_service import ConfigService, config_service
+from app.core.logging_service import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class ConfigReloader:
+    """
+    Runs the reload triggers on the event loop. Reloads run in a worker thread since
+    they read files and may call Secrets Manager, and never overlap.
+    """
+
+    def __init__(
+        self,
+        service: ConfigService,
+        watch_interval: float = 5.0,
+        secrets_poll_interval: float = 300.0
+    ):
+        self.service = service
+        self.watch_interval = watch_interval
+        self.secrets_poll_interval = secrets_poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._signal_reloads: Set[asyncio.Task] = set()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sighup_installed = False
+
+    async def reload(self, trigger: str, refresh_aws_secrets: bool = True) -> FrozenSet[str]:
+        """Reload configuration now. Returns the changed keys (empty on failure)."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                changed = await asyncio.to_thread(self.service.reload, refresh_aws_secrets=refresh_aws_secrets)
+            except Exception as e:
+                metrics.increment("config_reloads_total", trigger=trigger, outcome="error")
+                logger.error(f"Configuration reload ({trigger}) failed: {e}")
+                return frozenset()
+        metrics.increment("config_reloads_total", trigger=trigger, outcome="changed" if changed else "unchanged")
+        return changed
+
+    @staticmethod
+    def _mtimes(paths: List[Path]) -> Dict[Path, Optional[int]]:
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    async def _watch_files(self) -> None:
+        mtimes = self._mtimes(self.service.watched_files())
+        while True:
+            await asyncio.sleep(self.watch_interval)
+            current = self._mtimes(self.service.watched_files())
+            if current != mtimes:
+                mtimes = current
+                # A file edit doesn't mean the remote secret changed
+                await self.reload("file", refresh_aws_secrets=False)
+
+    async def _poll_secrets(self) -> None:
+        while True:
+            await asyncio.sleep(self.secrets_poll_interval)
+            await self.reload("secrets_poll")
+
+    def _on_sighup(self) -> None:
+        task = self._loop.create_task(self.reload("sighup"))
+        self._signal_reloads.add(task)
+        task.add_done_callback(self._signal_reloads.discard)
+
+    def start(self) -> None:
+        """Start the enabled triggers on the running event loop"""
+        if self._tasks or self._sighup_installed:
+            return
+        self._loop = asyncio.get_running_loop()
+        if self.watch_interval > 0:
+            self._tasks.append(self._loop.create_task(self._watch_files()))
+        if self.secrets_poll_interval > 0 and os.getenv("AWS_SECRETS_MANAGER_SECRET_NAME"):
+            self._tasks.append(self._loop.create_task(self._poll_secrets()))
+        try:
+            self._loop.add_signal_handler(signal.SIGHUP, self._on_sighup)
+            self._sighup_installed = True
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            # No SIGHUP (Windows) or not on the main thread
+            logger.info("SIGHUP configuration reload is not available here")
+
+    def stop(self) -> None:
+        """Stop all triggers"""
+        for task in [*self._tasks, *self._signal_reloads]:
+            task.cancel()
+        self._tasks = []
+        self._signal_reloads.clear()
+        if self._sighup_installed:
+            self._loop.remove_signal_handler(signal.SIGHUP)
+            self._sighup_installed = False
+
+
+# Global instance
+config_reloader = ConfigReloader(
+    config_service,
+    watch_interval=config_service.get("config_watch_interval", 5.0),
+    secrets_poll_interval=config_service.get("config_secrets_poll_interval", 300.0),
+)
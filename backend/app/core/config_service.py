@@ -1,20 +1,27 @@
 """
 Configuration service for the backend application.
 Loads configuration from environment variables, AWS Secrets Manager, and secrets file.
+Environment variables are read at import; the secret sources (and yaml/boto3) are only
+loaded the first time a value is looked up that the environment doesn't provide.
 """
 import os
-import yaml
-from typing import Dict, Any, List
+import threading
+from typing import Callable, Dict, Any, FrozenSet, Iterable, List, Optional, Tuple
 from pathlib import Path
 import logging
-from dotenv import load_dotenv
+from dotenv import dotenv_values, load_dotenv
+from pydantic import Field
 from pydantic_settings import BaseSettings
-import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+from app.core.config_snapshot import ConfigSnapshot
 
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+# Called with (old snapshot, new snapshot, changed keys) after a reload
+ConfigSubscriber = Callable[[ConfigSnapshot, ConfigSnapshot, FrozenSet[str]], None]
+
 class ConfigService:
     """
     Service for loading and accessing application configuration.
@@ -25,15 +32,107 @@ class ConfigService:
         self._config: Dict[str, Any] = {}
         self._secrets: Dict[str, Any] = {}
         self._aws_secrets: Dict[str, Any] = {}
+        self._secrets_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._subscribers: List[Tuple[ConfigSubscriber, Optional[FrozenSet[str]]]] = []
+        self._env_file: Optional[Path] = None
+        self._secrets_file: Optional[Path] = None
+        # Variables set by the process environment win over the env file, also on reload
+        self._process_env_keys = frozenset(os.environ)
 
         # Determine environment
         self._env = os.getenv("APP_ENV", "development")
 
-        # Load configuration
+        # Load configuration; secret sources are loaded on first use
         self._load_env_file()
         self._load_env_vars()
-        self._load_aws_secrets()
-        self._load_secrets()
+        self._snapshot = self._compile_snapshot(secrets_loaded=False)
+
+    def _compile_snapshot(self, secrets_loaded: bool) -> ConfigSnapshot:
+        """Merge the loaded sources into an immutable snapshot"""
+        return ConfigSnapshot(
+            env=self._env,
+            env_values=self._config,
+            aws_secrets=self._aws_secrets,
+            file_secrets=self._secrets,
+            cognito_config=self._read_cognito_config(),
+            use_mock_cognito=os.getenv("USE_MOCK_COGNITO", "false").lower() == "true",
+            env_database_url=os.getenv("DATABASE_URL"),
+            secrets_loaded=secrets_loaded
+        )
+
+    def _ensure_secrets_loaded(self) -> None:
+        """Load AWS Secrets Manager and the secrets file, once"""
+        if self._snapshot.secrets_loaded:
+            return
+        with self._secrets_lock:
+            if not self._snapshot.secrets_loaded:
+                self._load_aws_secrets()
+                self._load_secrets()
+                # Published in one assignment, so readers see either snapshot, never a mix
+                self._snapshot = self._compile_snapshot(secrets_loaded=True)
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """The complete configuration snapshot (loads the secret sources on first use)"""
+        self._ensure_secrets_loaded()
+        return self._snapshot
+
+    def subscribe(self, callback: ConfigSubscriber, keys: Optional[Iterable[str]] = None) -> None:
+        """
+        Call `callback(old, new, changed)` after a reload that changed configuration.
+        With `keys` (config keys or snapshot attribute names), only when one of them changed.
+        """
+        self._subscribers.append((callback, frozenset(keys) if keys is not None else None))
+
+    def unsubscribe(self, callback: ConfigSubscriber) -> None:
+        """Stop notifying a subscriber"""
+        self._subscribers = [entry for entry in self._subscribers if entry[0] != callback]
+
+    def watched_files(self) -> List[Path]:
+        """Files whose changes should trigger a reload"""
+        base_dir = Path(__file__).resolve().parent.parent.parent
+        files = [self._env_file, base_dir / "secrets.yaml", self._secrets_file]
+        return list(dict.fromkeys(path for path in files if path is not None))
+
+    def reload(self, refresh_aws_secrets: bool = True) -> FrozenSet[str]:
+        """
+        Re-read the env file, environment and secret sources, publish the new snapshot in
+        one assignment and notify subscribers. Secret sources are only re-read if they
+        were loaded, and a source that fails to load keeps its previous values.
+        `refresh_aws_secrets=False` reuses the Secrets Manager payload already held.
+
+        Returns:
+            The keys and snapshot attributes that changed
+        """
+        with self._reload_lock:
+            old = self._snapshot
+            with self._secrets_lock:
+                self._reload_env_file()
+                self._load_env_vars()
+                secrets_loaded = self._snapshot.secrets_loaded
+                if secrets_loaded:
+                    if refresh_aws_secrets:
+                        self._load_aws_secrets(use_cache=False)
+                    self._load_secrets()
+                new = self._compile_snapshot(secrets_loaded=secrets_loaded)
+                self._snapshot = new
+
+            changed = old.diff(new)
+            if changed:
+                logger.info(f"Configuration reloaded; changed: {', '.join(sorted(changed))}")
+                self._notify(old, new, changed)
+            return changed
+
+    def _notify(self, old: ConfigSnapshot, new: ConfigSnapshot, changed: FrozenSet[str]) -> None:
+        for callback, keys in list(self._subscribers):
+            if keys is not None and keys.isdisjoint(changed):
+                continue
+            try:
+                callback(old, new, changed)
+            except Exception as e:
+                # One broken subscriber must not keep the others on stale configuration
+                logger.error(f"Configuration subscriber {getattr(callback, '__qualname__', callback)} failed: {e}")
 
     def _load_env_file(self) -> None:
         """Load the appropriate .env file based on environment"""
@@ -56,9 +155,18 @@ class ConfigService:
         if env_file.exists():
             logger.info(f"Loading environment from {env_file}")
             load_dotenv(env_file)
+            self._env_file = env_file
         else:
             logger.warning("No environment file found. Using default values.")
 
+    def _reload_env_file(self) -> None:
+        """Apply the current env file contents, except for variables the process environment set"""
+        if self._env_file is None or not self._env_file.exists():
+            return
+        for key, value in dotenv_values(self._env_file).items():
+            if key not in self._process_env_keys and value is not None:
+                os.environ[key] = value
+
     def _load_env_vars(self) -> None:
         """Load configuration from environment variables"""
         self._config = {
@@ -80,9 +188,74 @@ class ConfigService:
             "log_rotation": os.getenv("LOG_ROTATION", "20 MB"),
             "log_retention": os.getenv("LOG_RETENTION", "1 week"),
             "log_compression": os.getenv("LOG_COMPRESSION", "zip"),
+            "log_async": os.getenv("LOG_ASYNC", "False").lower() in ("true", "1", "t"),
+            "log_queue_size": int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+            "log_overflow_policy": os.getenv("LOG_OVERFLOW_POLICY", "block"),
+            "log_batch_size": int(os.getenv("LOG_BATCH_SIZE", "256")),
+            "log_flush_interval": float(os.getenv("LOG_FLUSH_INTERVAL", "0.5")),
+            "log_profile": os.getenv("LOG_PROFILE", ""),
+            "log_exception_dedup_window": float(os.getenv("LOG_EXCEPTION_DEDUP_WINDOW")) if os.getenv("LOG_EXCEPTION_DEDUP_WINDOW") else None,
+            "log_sampling_rules": os.getenv("LOG_SAMPLING_RULES", ""),
+            "log_sampling_slow_ms": float(os.getenv("LOG_SAMPLING_SLOW_MS", "1000")),
+            "log_error_repeat_limit": int(os.getenv("LOG_ERROR_REPEAT_LIMIT", "10")),
+            "log_error_repeat_window": float(os.getenv("LOG_ERROR_REPEAT_WINDOW", "60")),
+
+            # Authentication configuration
+            "principal_cache_ttl": float(os.getenv("PRINCIPAL_CACHE_TTL", "30")),
+            "principal_cache_max_size": int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000")),
+            "token_revocation_capacity": int(os.getenv("TOKEN_REVOCATION_CAPACITY", "100000")),
+            "token_revocation_sync_interval": float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", "5")),
+            "token_revocation_sync_overlap": float(os.getenv("TOKEN_REVOCATION_SYNC_OVERLAP", "60")),
+            "refresh_token_coalesce_ttl": float(os.getenv("REFRESH_TOKEN_COALESCE_TTL", "5")),
+
+            # Rate limiting for sign in / sign up
+            "rate_limit_enabled": os.getenv("RATE_LIMIT_ENABLED", "True").lower() in ("true", "1", "t"),
+            "rate_limit_backend": os.getenv("RATE_LIMIT_BACKEND", "memory"),
+            "rate_limit_trust_forwarded_for": os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "False").lower() in ("true", "1", "t"),
+            "rate_limit_trusted_proxies": int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", "1")),
+            "rate_limit_purge_interval": float(os.getenv("RATE_LIMIT_PURGE_INTERVAL", "300")),
+            "rate_limit_ip_burst": float(os.getenv("RATE_LIMIT_IP_BURST", "20")),
+            "rate_limit_ip_per_minute": float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", "10")),
+            "rate_limit_email_burst": float(os.getenv("RATE_LIMIT_EMAIL_BURST", "5")),
+            "rate_limit_email_per_minute": float(os.getenv("RATE_LIMIT_EMAIL_PER_MINUTE", "5")),
+            "rate_limit_global_burst": float(os.getenv("RATE_LIMIT_GLOBAL_BURST", "200")),
+            "rate_limit_global_per_minute": float(os.getenv("RATE_LIMIT_GLOBAL_PER_MINUTE", "600")),
+
+            # Identity provider: "cognito" or "local" (USE_MOCK_COGNITO takes precedence)
+            "auth_provider": os.getenv("AUTH_PROVIDER", "cognito").lower(),
+            "local_idp_issuer": os.getenv("LOCAL_IDP_ISSUER", "http://localhost:9010/api/v1/auth"),
+            "local_idp_client_id": os.getenv("LOCAL_IDP_CLIENT_ID", "local-client"),
+            "local_idp_private_key_path": os.getenv("LOCAL_IDP_PRIVATE_KEY_PATH", ""),
+            "local_idp_password_scheme": os.getenv("LOCAL_IDP_PASSWORD_SCHEME", "bcrypt"),
+            "local_idp_password_rounds": int(os.getenv("LOCAL_IDP_PASSWORD_ROUNDS", "0")),
+            "local_idp_hash_workers": int(os.getenv("LOCAL_IDP_HASH_WORKERS", "2")),
+            "local_idp_access_token_ttl": int(os.getenv("LOCAL_IDP_ACCESS_TOKEN_TTL", "3600")),
+
+            # Mock Cognito token store
+            "mock_token_max_size": int(os.getenv("MOCK_TOKEN_MAX_SIZE", "100000")),
+            "mock_token_sweep_interval": float(os.getenv("MOCK_TOKEN_SWEEP_INTERVAL", "60")),
+            "mock_user_cache_ttl": float(os.getenv("MOCK_USER_CACHE_TTL", "300")),
+            "mock_user_cache_max_size": int(os.getenv("MOCK_USER_CACHE_MAX_SIZE", "10000")),
+
+            # Cognito client configuration
+            "cognito_max_concurrency": int(os.getenv("COGNITO_MAX_CONCURRENCY", "10")),
+            "cognito_max_queue_depth": int(os.getenv("COGNITO_MAX_QUEUE_DEPTH", "100")),
+            "cognito_breaker_failure_threshold": int(os.getenv("COGNITO_BREAKER_FAILURE_THRESHOLD", "5")),
+            "cognito_breaker_recovery_timeout": float(os.getenv("COGNITO_BREAKER_RECOVERY_TIMEOUT", "30")),
+
+            # Database connection pool (ignored for SQLite)
+            "db_pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+            "db_max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            "db_pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            "db_pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "-1")),
+            "db_pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "False").lower() in ("true", "1", "t"),
+
+            # Configuration hot reload (seconds between checks, 0 disables)
+            "config_watch_interval": float(os.getenv("CONFIG_WATCH_INTERVAL", "5")),
+            "config_secrets_poll_interval": float(os.getenv("CONFIG_SECRETS_POLL_INTERVAL", "300")),
         }
 
-    def _load_aws_secrets(self) -> None:
+    def _load_aws_secrets(self, use_cache: bool = True) -> None:
         """Load secrets from AWS Secrets Manager if configured"""
         # Check if AWS Secrets Manager is configured
         secret_name = os.getenv("AWS_SECRETS_MANAGER_SECRET_NAME")
@@ -90,16 +263,30 @@ class ConfigService:
             logger.info("AWS Secrets Manager not configured. Skipping AWS secrets loading.")
             return
 
+        import yaml
+        from botocore.exceptions import ClientError, NoCredentialsError
+        from app.core.secrets_cache import EncryptedSecretsCache
+
+        # A fresh copy in the encrypted disk cache saves the network call on cold starts
+        cache = EncryptedSecretsCache.from_env()
+        if cache is not None and use_cache:
+            secret_string = cache.load(secret_name)
+            if secret_string is not None:
+                try:
+                    self._aws_secrets = yaml.safe_load(secret_string) or {}
+                    logger.info("Loaded AWS Secrets Manager secrets from the encrypted cache")
+                    return
+                except yaml.YAMLError:
+                    logger.warning("Cached secrets could not be parsed. Fetching from AWS Secrets Manager.")
+
         try:
+            from app.core.aws_clients import get_aws_client
+
             # Get AWS region from environment or use default
             region_name = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
 
-            # Create a Secrets Manager client
-            session = boto3.Session()
-            client = session.client(
-                service_name="secretsmanager",
-                region_name=region_name
-            )
+            # Get the shared Secrets Manager client
+            client = get_aws_client("secretsmanager", region_name=region_name)
 
             logger.info(f"Loading secrets from AWS Secrets Manager: {secret_name}")
 
@@ -108,9 +295,15 @@ class ConfigService:
             secret_string = response["SecretString"]
 
             # Parse the secret as YAML (same format as local secrets.yaml)
-            self._aws_secrets = yaml.safe_load(secret_string)
+            aws_secrets = yaml.safe_load(secret_string) or {}
+            if not isinstance(aws_secrets, dict):
+                raise yaml.YAMLError("Expected a mapping")
+            self._aws_secrets = aws_secrets
             logger.info("Successfully loaded secrets from AWS Secrets Manager")
 
+            if cache is not None:
+                cache.store(secret_name, secret_string)
+
         except NoCredentialsError:
             logger.error("AWS credentials not found. Cannot load secrets from AWS Secrets Manager.")
         except ClientError as e:
@@ -134,6 +327,8 @@ class ConfigService:
 
     def _load_secrets(self) -> None:
         """Load secrets from YAML file"""
+        import yaml
+
         # Determine the secrets file path based on environment
         base_dir = Path(__file__).resolve().parent.parent.parent
         secrets_file = base_dir / "secrets.yaml"
@@ -144,63 +339,33 @@ class ConfigService:
             secrets_file = base_dir / "secrets.example.yaml"
 
         # Load secrets from file
+        self._secrets_file = secrets_file
         if secrets_file.exists():
             try:
                 with open(secrets_file, "r") as f:
-                    self._secrets = yaml.safe_load(f)
+                    self._secrets = yaml.safe_load(f) or {}
                 logger.info(f"Loaded secrets from {secrets_file}")
             except Exception as e:
+                # Keeps what was loaded before, so a bad edit doesn't wipe secrets on reload
                 logger.error(f"Error loading secrets file: {e}")
-                self._secrets = {}
         else:
             logger.warning("No secrets file found. Using default values.")
             self._secrets = {}
 
     def get(self, key: str, default: Any = None) -> Any:
         """
-        Get a configuration value by key.
+        Get a configuration value by key (dotted keys address nested secrets).
         Priority order:
         1. Environment variables
         2. AWS Secrets Manager
         3. Local secrets file
         4. Default value
         """
-        # Check if key exists in environment variables
-        if key in self._config:
-            return self._config[key]
-
-        # Check if key exists in AWS Secrets Manager (supports nested keys with dot notation)
-        if self._aws_secrets and "." in key:
-            parts = key.split(".")
-            value = self._aws_secrets
-            for part in parts:
-                if isinstance(value, dict) and part in value:
-                    value = value[part]
-                else:
-                    break
-            else:
-                return value
-
-        # Check if key exists at top level of AWS secrets
-        if self._aws_secrets and key in self._aws_secrets:
-            return self._aws_secrets[key]
-
-        # Check if key exists in local secrets file (supports nested keys with dot notation)
-        if "." in key:
-            parts = key.split(".")
-            value = self._secrets
-            for part in parts:
-                if isinstance(value, dict) and part in value:
-                    value = value[part]
-                else:
-                    return default
-            return value
-
-        # Check if key exists at top level of local secrets
-        if key in self._secrets:
-            return self._secrets[key]
-
-        return default
+        value = self._snapshot.values.get(key, _MISSING)
+        if value is _MISSING and not self._snapshot.secrets_loaded:
+            # Not an environment value, so the secret sources are needed
+            value = self.snapshot.values.get(key, _MISSING)
+        return default if value is _MISSING else value
 
     def get_database_url(self) -> str:
         """
@@ -210,33 +375,17 @@ class ConfigService:
         2. Full URL from secrets
         3. Constructed from components
         """
-        # In test mode, prioritize environment variable over secrets
-        if self.is_testing():
+        # In test mode the environment wins, so the secret sources aren't needed
+        if self._snapshot.is_testing:
             db_url = os.getenv("DATABASE_URL")
             if db_url:
                 return db_url
 
-        # Check if a full URL is provided in secrets
-        if self._secrets and "database" in self._secrets and "url" in self._secrets["database"]:
-            return self._secrets["database"]["url"]
-
-        # Check if a full URL is provided in environment
-        db_url = os.getenv("DATABASE_URL")
-        if db_url:
-            return db_url
-
-        # Construct from components
-        username = self.get("database.username", "postgres")
-        password = self.get("database.password", "postgres")
-        host = self.get("database.host", "localhost")
-        port = self.get("database.port", 5432)
-        name = self.get("database.name", "mydatabase")
-
-        return f"postgresql://{username}:{password}@{host}:{port}/{name}"
+        return self.snapshot.database_url
 
     def get_secret_key(self) -> str:
         """Get the secret key for JWT tokens and other security features"""
-        return self.get("security.secret_key", "your_secret_key_here")
+        return self.snapshot.secret_key
 
     def get_aws_credentials(self) -> Dict[str, str]:
         """Get AWS credentials from secrets"""
@@ -248,6 +397,10 @@ class ConfigService:
 
     def get_cognito_config(self) -> Dict[str, str]:
         """Get Cognito configuration from environment variables"""
+        return dict(self._snapshot.cognito_config)
+
+    @staticmethod
+    def _read_cognito_config() -> Dict[str, str]:
         return {
             "user_pool_id": os.getenv("COGNITO_USER_POOL_ID", ""),
             "client_id": os.getenv("COGNITO_CLIENT_ID", ""),
@@ -258,23 +411,29 @@ class ConfigService:
 
     def is_localstack_enabled(self) -> bool:
         """Check if LocalStack is enabled for development"""
-        return self.get("use_localstack", False)
+        return self.snapshot.localstack_enabled
 
     def is_development(self) -> bool:
         """Check if the application is running in development mode"""
-        return self._env.lower() == "development"
+        return self._snapshot.is_development
 
     def is_production(self) -> bool:
         """Check if the application is running in production mode"""
-        return self._env.lower() == "production"
+        return self._snapshot.is_production
 
     def is_testing(self) -> bool:
         """Check if the application is running in test mode"""
-        return self._env.lower() in ("test", "testing")
+        return self._snapshot.is_testing
 
     def use_mock_cognito(self) -> bool:
         """Check if mock Cognito service should be used"""
-        return os.getenv("USE_MOCK_COGNITO", "false").lower() == "true"
+        return self._snapshot.use_mock_cognito
+
+    def get_auth_provider(self) -> str:
+        """Get the identity provider to use: mock, local or cognito"""
+        if self.use_mock_cognito():
+            return "mock"
+        return self.get("auth_provider", "cognito")
 
 
 # Create a singleton instance
@@ -315,27 +474,31 @@ class Settings(BaseSettings):
     Application settings that loads from environment variables and secrets file
     """
     # API settings
-    API_V1_STR: str = config_service.get("api_prefix", "/api/v1")
-    PROJECT_NAME: str = config_service.get("project_name", "My Boilerplate App")
+    API_V1_STR: str = Field(default_factory=lambda: config_service.get("api_prefix", "/api/v1"))
+    PROJECT_NAME: str = Field(default_factory=lambda: config_service.get("project_name", "My Boilerplate App"))
 
     # CORS settings
-    CORS_ORIGINS: str = ",".join(config_service.get("cors_origins", ["http://localhost:3000", "http://localhost:5173"]))
+    CORS_ORIGINS: str = Field(default_factory=lambda: ",".join(
+        config_service.get("cors_origins", ["http://localhost:3000", "http://localhost:5173"])
+    ))
 
     # Database settings
-    DATABASE_URL: str = config_service.get_database_url()
-    DB_NAME: str = config_service.get("database.name", "mydatabase")
+    DATABASE_URL: str = Field(default_factory=lambda: config_service.get_database_url())
+    DB_NAME: str = Field(default_factory=lambda: config_service.get("database.name", "mydatabase"))
 
     # Security settings
-    SECRET_KEY: str = config_service.get_secret_key()
+    SECRET_KEY: str = Field(default_factory=lambda: config_service.get_secret_key())
 
     # Application settings
-    DEBUG: bool = config_service.get("debug", True)
-    LOG_LEVEL: str = config_service.get("log_level", "info")
-    ALLOWED_HOSTS: str = ",".join(config_service.get("allowed_hosts", ["localhost", "127.0.0.1"]))
+    DEBUG: bool = Field(default_factory=lambda: config_service.get("debug", True))
+    LOG_LEVEL: str = Field(default_factory=lambda: config_service.get("log_level", "info"))
+    ALLOWED_HOSTS: str = Field(default_factory=lambda: ",".join(
+        config_service.get("allowed_hosts", ["localhost", "127.0.0.1"])
+    ))
 
     # AWS settings
-    AWS_ACCESS_KEY_ID: str = config_service.get("aws.access_key_id", "")
-    AWS_SECRET_ACCESS_KEY: str = config_service.get("aws.secret_access_key", "")
+    AWS_ACCESS_KEY_ID: str = Field(default_factory=lambda: config_service.get("aws.access_key_id", ""))
+    AWS_SECRET_ACCESS_KEY: str = Field(default_factory=lambda: config_service.get("aws.secret_access_key", ""))
 
     @property
     def BACKEND_CORS_ORIGINS(self) -> List[str]:
@@ -354,5 +517,22 @@ class Settings(BaseSettings):
         extra = 'ignore'  # Ignore extra fields from environment
 
 
-# Create a singleton instance of Settings
-settings = Settings()
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """The Settings singleton, created on first use since it reads the secret sources"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()
+    return _settings
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from app.core.config_service import settings` working without building it at import
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
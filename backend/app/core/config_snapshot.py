@@ -0,0 +1,142 @@
+"""
+Immutable, pre-flattened view of the application configuration.
+All sources are merged into one mapping keyed by dotted path when configuration is
+loaded, so lookups are a single dict access and hot-path checks are attribute reads.
+"""
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Mapping, Optional
+
+_MISSING = object()
+
+
+def _freeze(value: Any) -> Any:
+    """Read-only copy of a nested config value"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def flatten(source: Optional[Mapping[str, Any]], into: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """
+    Add every key path of a nested mapping to `into`, e.g. {"database": {"port": 5432}}
+    gives "database" -> {...} and "database.port" -> 5432. Existing keys are overwritten.
+    """
+    if not isinstance(source, Mapping):
+        return into
+    for key, value in source.items():
+        path = f"{prefix}{key}"
+        into[path] = _freeze(value)
+        if isinstance(value, Mapping):
+            flatten(value, into, f"{path}.")
+    return into
+
+
+class ConfigSnapshot:
+    """
+    Frozen configuration compiled from the environment, AWS Secrets Manager and the
+    secrets file (environment first, then AWS, then the file).
+
+    Snapshots built before the secret sources are loaded only hold environment values;
+    the attributes derived from the environment are valid on either kind.
+    """
+
+    __slots__ = (
+        "values",
+        "secrets_loaded",
+        "env",
+        "is_development",
+        "is_production",
+        "is_testing",
+        "use_mock_cognito",
+        "auth_provider",
+        "localstack_enabled",
+        "cognito_config",
+        "database_url",
+        "secret_key",
+        "jwt_algorithm",
+        "rate_limit_trust_forwarded_for",
+        "rate_limit_trusted_proxies",
+    )
+
+    def __init__(
+        self,
+        env: str,
+        env_values: Mapping[str, Any],
+        aws_secrets: Optional[Mapping[str, Any]] = None,
+        file_secrets: Optional[Mapping[str, Any]] = None,
+        cognito_config: Optional[Mapping[str, str]] = None,
+        use_mock_cognito: bool = False,
+        env_database_url: Optional[str] = None,
+        secrets_loaded: bool = False
+    ):
+        values: Dict[str, Any] = {}
+        flatten(file_secrets, values)
+        flatten(aws_secrets, values)
+        values.update((key, _freeze(value)) for key, value in env_values.items())
+
+        assign = object.__setattr__
+        assign(self, "values", MappingProxyType(values))
+        assign(self, "secrets_loaded", secrets_loaded)
+        assign(self, "env", env)
+        assign(self, "is_development", env.lower() == "development")
+        assign(self, "is_production", env.lower() == "production")
+        assign(self, "is_testing", env.lower() in ("test", "testing"))
+        assign(self, "use_mock_cognito", use_mock_cognito)
+        assign(self, "auth_provider", "mock" if use_mock_cognito else values.get("auth_provider", "cognito"))
+        assign(self, "localstack_enabled", bool(values.get("use_localstack", False)))
+        assign(self, "cognito_config", MappingProxyType(dict(cognito_config or {})))
+        assign(self, "database_url", self._database_url(file_secrets, env_database_url) if secrets_loaded else None)
+        assign(self, "secret_key", values.get("security.secret_key", "your_secret_key_here"))
+        assign(self, "jwt_algorithm", values.get("security.algorithm", "HS256"))
+        assign(self, "rate_limit_trust_forwarded_for", bool(values.get("rate_limit_trust_forwarded_for", False)))
+        assign(self, "rate_limit_trusted_proxies", max(1, int(values.get("rate_limit_trusted_proxies", 1))))
+
+    def _database_url(self, file_secrets: Optional[Mapping[str, Any]], env_database_url: Optional[str]) -> str:
+        """
+        Database URL, by priority:
+        1. Full URL from environment (prioritized in test mode)
+        2. Full URL from the secrets file
+        3. Full URL from environment
+        4. Constructed from components
+        """
+        if self.is_testing and env_database_url:
+            return env_database_url
+
+        database = (file_secrets or {}).get("database")
+        if isinstance(database, Mapping) and "url" in database:
+            return database["url"]
+
+        if env_database_url:
+            return env_database_url
+
+        username = self.get("database.username", "postgres")
+        password = self.get("database.password", "postgres")
+        host = self.get("database.host", "localhost")
+        port = self.get("database.port", 5432)
+        name = self.get("database.name", "mydatabase")
+        return f"postgresql://{username}:{password}@{host}:{port}/{name}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Value for a key or dotted path, or default"""
+        value = self.values.get(key, _MISSING)
+        return default if value is _MISSING else value
+
+    def diff(self, other: "ConfigSnapshot") -> FrozenSet[str]:
+        """Keys and attributes whose values differ in `other`"""
+        changed = {
+            key for key in self.values.keys() | other.values.keys()
+            if self.values.get(key, _MISSING) != other.values.get(key, _MISSING)
+        }
+        changed.update(
+            name for name in self.__slots__
+            if name != "values" and getattr(self, name) != getattr(other, name)
+        )
+        return frozenset(changed)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("ConfigSnapshot is immutable")
@@ -39,6 +39,29 @@ class CognitoError(AppException):
     pass
 
 
+class ServiceUnavailableError(CognitoError):
+    """Raised when a call is refused without reaching Cognito (open circuit or full bulkhead)."""
+
+    def __init__(
+        self,
+        message: str,
+        retry_after: int = 1,
+        error_code: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None
+    ):
+        self.retry_after = retry_after
+        super().__init__(message, error_code=error_code, details=details)
+
+
+class RateLimitExceededError(AppException):
+    """Raised when a request is over one of its rate limits."""
+
+    def __init__(self, message: str, retry_after: int = 1, rule: Optional[str] = None):
+        self.retry_after = retry_after
+        self.rule = rule
+        super().__init__(message, error_code="RateLimitExceeded", details={"rule": rule})
+
+
 class UserNotFoundError(AppException):
     """Raised when a user is not found."""
     pass
@@ -46,7 +69,10 @@ class UserNotFoundError(AppException):
 
 class UserAlreadyExistsError(AppException):
     """Raised when trying to create a user that already exists."""
-    pass
+
+    def __init__(self, message: str, field: Optional[str] = None):
+        self.field = field
+        super().__init__(message, error_code="UserAlreadyExists", details={"field": field})
 
 
 # Cognito-specific error mappings
@@ -68,6 +94,7 @@ COGNITO_ERROR_MESSAGES = {
     "UnexpectedLambdaException": "Service error. Please try again later.",
     "UserPoolTaggingException": "Service configuration error. Please contact support.",
     "InternalErrorException": "Internal service error. Please try again later.",
+    "ServiceUnavailable": "Authentication service is temporarily unavailable. Please try again later.",
 }
 
 
@@ -1,8 +1,9 @@
 """
 JWT utilities for token validation and user authentication.
 """
-import requests
-from typing import Dict, Optional, Any
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from jose import JWTError, jwt as jose_jwt
 from jose.constants import ALGORITHMS
@@ -13,123 +14,284 @@ from app.schemas.auth import TokenData
 logger = get_logger(__name__)
 
 
+class KeySource(ABC):
+    """
+    Source of signing keys for a single token issuer.
+    Keys are looked up by the token's 'kid' header and converted to PEM once.
+    """
+
+    def __init__(self):
+        self._pem_cache: Dict[str, str] = {}
+
+    @abstractmethod
+    def _load_jwks(self) -> Dict[str, Any]:
+        """Return the JSON Web Key Set for this issuer"""
+
+    def _refresh(self) -> bool:
+        """Reload the key set after an unknown kid. Returns True if keys may have changed."""
+        return False
+
+    def has_key(self, kid: str) -> bool:
+        """Check whether the kid is already known, without touching the network"""
+        return kid in self._pem_cache
+
+    def get_signing_key(self, kid: str) -> str:
+        """Get the PEM encoded signing key for the given kid"""
+        pem = self._pem_cache.get(kid)
+        if pem is not None:
+            return pem
+
+        pem = self._find_key(kid)
+        if pem is None and self._refresh():
+            # Keys may have been rotated since the last fetch
+            pem = self._find_key(kid)
+        if pem is None:
+            raise Exception(f"Unable to find signing key with kid: {kid}")
+        return pem
+
+    def _find_key(self, kid: str) -> Optional[str]:
+        for key in self._load_jwks().get("keys", []):
+            if key.get("kid") == kid:
+                # Convert JWK to PEM format
+                from jose.backends.rsa_backend import RSAKey
+                pem = RSAKey(key, ALGORITHMS.RS256).to_pem().decode('utf-8')
+                self._pem_cache[kid] = pem
+                return pem
+        return None
+
+
+class StaticKeySource(KeySource):
+    """Key source backed by an in-memory JWKS document (no network access)"""
+
+    def __init__(self, jwks: Dict[str, Any]):
+        super().__init__()
+        self._jwks = jwks
+
+    def _load_jwks(self) -> Dict[str, Any]:
+        return self._jwks
+
+
+class RemoteJWKSKeySource(KeySource):
+    """Key source that fetches a JWKS document over HTTP and caches it"""
+
+    def __init__(self, jwks_url: str, timeout: int = 10, min_refresh_interval: int = 300):
+        super().__init__()
+        self.jwks_url = jwks_url
+        self.timeout = timeout
+        self.min_refresh_interval = min_refresh_interval
+        self._jwks_cache: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+
+    def _fetch(self) -> Dict[str, Any]:
+        import requests
+
+        try:
+            response = requests.get(self.jwks_url, timeout=self.timeout)
+            response.raise_for_status()
+            self._jwks_cache = response.json()
+            self._fetched_at = time.monotonic()
+            logger.info(f"Successfully fetched JWKS from {self.jwks_url}")
+        except Exception as e:
+            logger.exception(f"Failed to fetch JWKS: {e}")
+            raise Exception("Failed to fetch JWKS for token validation")
+        return self._jwks_cache
+
+    def _load_jwks(self) -> Dict[str, Any]:
+        if self._jwks_cache is None:
+            return self._fetch()
+        return self._jwks_cache
+
+    def _refresh(self) -> bool:
+        # Rate limit refetches so forged kids can't be used to hammer the JWKS endpoint
+        if time.monotonic() - self._fetched_at < self.min_refresh_interval:
+            return False
+        self._fetch()
+        return True
+
+
+class TokenIssuer:
+    """
+    A trusted token issuer and the key source used to verify its tokens.
+    """
+
+    def __init__(
+        self,
+        issuer: str,
+        key_source: KeySource,
+        client_id: Optional[str] = None,
+        algorithms: Optional[List[str]] = None,
+        name: str = "cognito"
+    ):
+        self.issuer = issuer
+        self.key_source = key_source
+        self.client_id = client_id
+        self.algorithms = algorithms or [ALGORITHMS.RS256]
+        self.name = name
+
+
 class JWTValidator:
-    """JWT token validator for Cognito tokens with dev mode fallback"""
+    """
+    JWT token validator for Cognito tokens with dev mode fallback.
+
+    Tokens are dispatched on their unverified header and claims: HMAC signed tokens
+    go to local validation (dev only), asymmetric tokens go to the registered issuer
+    matching their 'iss' claim (or, failing that, the issuer that already knows their 'kid').
+    """
 
     def __init__(self):
         self.cognito_config = config_service.get_cognito_config()
         self.is_localstack = config_service.is_localstack_enabled()
         self.is_development = config_service.is_development()
-        self._jwks_cache: Optional[Dict[str, Any]] = None
+        self._issuers: Dict[str, TokenIssuer] = {}
+        self._register_cognito_issuer()
 
-    def _get_jwks_url(self) -> str:
-        """Get the JWKS URL for token validation"""
+    def _get_issuer_url(self) -> str:
+        """Get the Cognito issuer URL ('iss' claim) for the configured user pool"""
         if self.is_localstack:
-            # LocalStack JWKS endpoint
-            return f"{self.cognito_config['endpoint_url']}/{self.cognito_config['user_pool_id']}/.well-known/jwks.json"
+            # LocalStack issuer
+            return f"{self.cognito_config['endpoint_url']}/{self.cognito_config['user_pool_id']}"
         else:
-            # AWS Cognito JWKS endpoint
+            # AWS Cognito issuer
             region = self.cognito_config["region"]
             user_pool_id = self.cognito_config["user_pool_id"]
-            return f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}/.well-known/jwks.json"
+            return f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
 
-    def _get_jwks(self) -> Dict[str, Any]:
-        """Get JSON Web Key Set (JWKS) for token validation"""
-        if self._jwks_cache is None:
-            try:
-                jwks_url = self._get_jwks_url()
-                response = requests.get(jwks_url, timeout=10)
-                response.raise_for_status()
-                self._jwks_cache = response.json()
-                logger.info("Successfully fetched JWKS")
-            except Exception as e:
-                logger.exception(f"Failed to fetch JWKS: {e}")
-                raise Exception("Failed to fetch JWKS for token validation")
-        
-        # At this point, _jwks_cache cannot be None because we either
-        # have a previously cached value or we just set it (or raised an exception)
-        assert self._jwks_cache is not None
-        return self._jwks_cache
-
-    def _get_signing_key(self, token_header: Dict[str, Any]) -> str:
-        """Get the signing key for token validation"""
-        jwks = self._get_jwks()
-        
-        # Find the key that matches the token's kid
-        kid = token_header.get("kid")
-        if not kid:
-            raise Exception("Token header missing 'kid' field")
-
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                # Convert JWK to PEM format
-                from jose.backends.rsa_backend import RSAKey
-                return RSAKey(key, ALGORITHMS.RS256).to_pem().decode('utf-8')
-        
-        raise Exception(f"Unable to find signing key with kid: {kid}")
+    def _get_jwks_url(self) -> str:
+        """Get the JWKS URL for token validation"""
+        return f"{self._get_issuer_url()}/.well-known/jwks.json"
+
+    def _register_cognito_issuer(self) -> None:
+        """Register the configured Cognito user pool as a trusted issuer"""
+        if not self.cognito_config["user_pool_id"]:
+            return
+        self.register_issuer(TokenIssuer(
+            issuer=self._get_issuer_url(),
+            key_source=RemoteJWKSKeySource(self._get_jwks_url()),
+            client_id=self.cognito_config["client_id"],
+            name="cognito"
+        ))
+
+    def on_config_change(self, old, new, changed) -> None:
+        """Re-register the Cognito issuer after a reload changed the user pool settings"""
+        previous_issuer = self._get_issuer_url() if self.cognito_config["user_pool_id"] else None
+        previous_client_id = self.cognito_config["client_id"]
+
+        self.cognito_config = dict(new.cognito_config)
+        self.is_localstack = new.localstack_enabled
+        self.is_development = new.is_development
+
+        issuer = self._get_issuer_url() if self.cognito_config["user_pool_id"] else None
+        if issuer == previous_issuer and self.cognito_config["client_id"] == previous_client_id:
+            # Same pool: keep the cached signing keys
+            return
+        if previous_issuer is not None:
+            self.unregister_issuer(previous_issuer)
+        self._register_cognito_issuer()
+
+    def register_issuer(self, issuer: TokenIssuer) -> None:
+        """Register a trusted token issuer"""
+        self._issuers[issuer.issuer] = issuer
+        logger.info(f"Registered token issuer '{issuer.name}': {issuer.issuer}")
+
+    def unregister_issuer(self, issuer_url: str) -> None:
+        """Remove a trusted token issuer"""
+        self._issuers.pop(issuer_url, None)
+
+    def get_issuer(self, issuer_url: str) -> Optional[TokenIssuer]:
+        """Get a registered issuer by its 'iss' value"""
+        return self._issuers.get(issuer_url)
+
+    def _resolve_issuer(self, header: Dict[str, Any], claims: Dict[str, Any]) -> TokenIssuer:
+        """Pick the issuer for a token from its unverified header and claims"""
+        issuer_url = claims.get("iss")
+        if issuer_url:
+            issuer = self._issuers.get(issuer_url)
+            if issuer is None:
+                raise Exception(f"Unknown token issuer: {issuer_url}")
+            return issuer
+
+        # No 'iss' claim: fall back to an issuer that already has this kid cached
+        kid = header.get("kid")
+        if kid:
+            for issuer in self._issuers.values():
+                if issuer.key_source.has_key(kid):
+                    return issuer
+        raise Exception("Unable to determine token issuer")
 
     def validate_token(self, token: str) -> TokenData:
         """
         Validate JWT token and return token data.
-        Tries Cognito validation first, then falls back to local token validation in dev mode.
+        Routes the token straight to the matching validator based on its unverified header.
         """
-        # First, try to validate as Cognito token
         try:
-            return self._validate_cognito_token(token)
-        except Exception as cognito_error:
-            logger.debug(f"Cognito token validation failed: {cognito_error}")
-
-            # In development mode, try local token validation as fallback
-            if self.is_development:
-                try:
-                    return self._validate_local_token(token)
-                except Exception as local_error:
-                    logger.debug(f"Local token validation failed: {local_error}")
-                    raise Exception("Token validation failed: Invalid token format")
-            else:
-                # In production, only Cognito tokens are allowed
+            header = jose_jwt.get_unverified_header(token)
+        except JWTError as e:
+            logger.debug("Token header could not be decoded: {}", e)
+            raise Exception("Token validation failed: Invalid token format")
+
+        algorithm = header.get("alg", "")
+        if algorithm in ALGORITHMS.HMAC:
+            # Symmetric tokens can only be locally issued development tokens
+            if not self.is_development:
                 raise Exception("Token validation failed: Invalid Cognito token")
+            try:
+                return self._validate_local_token(token)
+            except Exception as local_error:
+                logger.debug("Local token validation failed: {}", local_error)
+                raise Exception("Token validation failed: Invalid token format")
 
-    def _validate_cognito_token(self, token: str) -> TokenData:
-        """Validate Cognito JWT token"""
         try:
-            # Decode token header to get key ID
-            unverified_header = jose_jwt.get_unverified_header(token)
+            payload = self.verify_token_claims(token, header=header)
+        except Exception as issuer_error:
+            logger.debug("Issuer token validation failed: {}", issuer_error)
+            raise Exception("Token validation failed: Invalid Cognito token")
+
+        username = payload.get("cognito:username") or payload.get("username")
+        logger.debug("Cognito token validated successfully for user: {}", username)
+
+        return TokenData(
+            username=username,
+            user_sub=payload.get("sub"),
+            email=payload.get("email")
+        )
+
+    def verify_token_claims(self, token: str, header: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Verify an issuer-signed token and return its claims"""
+        try:
+            if header is None:
+                header = jose_jwt.get_unverified_header(token)
+            issuer = self._resolve_issuer(header, jose_jwt.get_unverified_claims(token))
 
-            # Get signing key
-            signing_key = self._get_signing_key(unverified_header)
+            kid = header.get("kid")
+            if not kid:
+                raise Exception("Token header missing 'kid' field")
+            signing_key = issuer.key_source.get_signing_key(kid)
 
-            # Verify and decode token
+            # Audience is checked below since access and ID tokens carry it differently
             payload = jose_jwt.decode(
                 token,
                 signing_key,
-                algorithms=["RS256"],
-                audience=self.cognito_config["client_id"],
-                options={"verify_exp": True}
+                algorithms=issuer.algorithms,
+                issuer=issuer.issuer,
+                options={"verify_exp": True, "verify_aud": False}
             )
 
-            # Extract token data
-            username = payload.get("cognito:username") or payload.get("username")
-            user_sub = payload.get("sub")
-            email = payload.get("email")
-
             # Verify token type
             token_use = payload.get("token_use")
             if token_use not in ["access", "id"]:
                 raise Exception("Invalid token type")
 
+            if issuer.client_id:
+                audience = payload.get("aud") if token_use == "id" else payload.get("client_id")
+                if audience != issuer.client_id:
+                    raise Exception("Invalid token audience")
+
             # Check expiration
             exp = payload.get("exp")
             if exp and datetime.fromtimestamp(exp, tz=timezone.utc) < datetime.now(timezone.utc):
                 raise Exception("Token has expired")
 
-            logger.info(f"Cognito token validated successfully for user: {username}")
-
-            return TokenData(
-                username=username,
-                user_sub=user_sub,
-                email=email
-            )
+            return payload
 
         except JWTError as e:
             logger.error(f"Cognito JWT validation error: {e}")
@@ -144,8 +306,8 @@ class JWTValidator:
             raise Exception("Local tokens not allowed in production")
 
         try:
-            secret_key = config_service.get_secret_key()
-            algorithm = config_service.get("security.algorithm", "HS256")
+            snapshot = config_service.snapshot
+            secret_key, algorithm = snapshot.secret_key, snapshot.jwt_algorithm
 
             payload = jose_jwt.decode(token, secret_key, algorithms=[algorithm])
 
@@ -159,7 +321,7 @@ class JWTValidator:
             if exp and datetime.fromtimestamp(exp, tz=timezone.utc) < datetime.now(timezone.utc):
                 raise Exception("Token has expired")
 
-            logger.info(f"Local token validated successfully for user: {username}")
+            logger.debug("Local token validated successfully for user: {}", username)
 
             return TokenData(
                 username=username,
@@ -185,6 +347,9 @@ class JWTValidator:
 
 # Global instance
 jwt_validator = JWTValidator()
+config_service.subscribe(
+    jwt_validator.on_config_change, keys=("cognito_config", "localstack_enabled", "is_development")
+)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[int] = None) -> str:
@@ -206,8 +371,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[int] = Non
         raise Exception("Username is required for local token")
 
     # Use the secret key from configuration
-    secret_key = config_service.get_secret_key()
-    algorithm = config_service.get("security.algorithm", "HS256")
+    snapshot = config_service.snapshot
+    secret_key, algorithm = snapshot.secret_key, snapshot.jwt_algorithm
 
     encoded_jwt = jose_jwt.encode(to_encode, secret_key, algorithm=algorithm)
     logger.info(f"Created local access token for user: {to_encode.get('username')}")
@@ -217,8 +382,8 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[int] = Non
 def verify_local_token(token: str) -> Dict[str, Any]:
     """Verify a locally created token"""
     try:
-        secret_key = config_service.get_secret_key()
-        algorithm = config_service.get("security.algorithm", "HS256")
+        snapshot = config_service.snapshot
+        secret_key, algorithm = snapshot.secret_key, snapshot.jwt_algorithm
         
         payload = jose_jwt.decode(token, secret_key, algorithms=[algorithm])
         return payload
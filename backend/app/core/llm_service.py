@@ -1,12 +1,9 @@
 from enum import Enum
 from typing import Dict, List, Optional, Any, Type, TypeVar, Generic, Union, cast
+import importlib.util
 import json
-try:
-    import boto3
-    from botocore.exceptions import ClientError
-    BOTO3_AVAILABLE = True
-except ImportError:
-    BOTO3_AVAILABLE = False
+# boto3 itself is only imported when a client is created
+BOTO3_AVAILABLE = importlib.util.find_spec("boto3") is not None
 from pydantic import BaseModel, Field
 
 T = TypeVar('T', bound=BaseModel)
@@ -64,8 +61,10 @@ class LLMClient(Generic[T]):
         if not BOTO3_AVAILABLE:
             raise ImportError("boto3 is required for AWS Bedrock integration. Please install it with 'pip install boto3'.")
             
+        from app.core.aws_clients import get_aws_client
+
         self.model_id = model_id
-        self.client = boto3.client("bedrock-runtime", region_name=region_name)
+        self.client = get_aws_client("bedrock-runtime", region_name=region_name)
         self.config = config or LLMConfig()
     
     def _get_model_family(self) -> ModelFamily:
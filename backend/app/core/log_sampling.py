@@ -0,0 +1,256 @@
+"""
+Sampling and repeat suppression for high-volume log records.
+Request records are kept or dropped by ordered rules keyed on event name, route, status
+class and latency; errors and slow requests are always kept. Repeated error messages are
+rate limited per key, and repeated tracebacks per exception type. Every record or
+traceback left out is counted, so totals can be reconstructed.
+"""
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.core.config_service import config_service
+from app.core.metrics import metrics
+
+# Config keys the sampler is built from (rebuilt when they change on reload)
+SAMPLING_CONFIG_KEYS = (
+    "log_sampling_rules", "log_sampling_slow_ms", "log_error_repeat_limit", "log_error_repeat_window",
+)
+
+
+@dataclass(frozen=True)
+class SamplingRule:
+    """
+    Keep `rate` (0.0-1.0) of the records matching every criterion that is set.
+
+    `route` is an exact path, or a prefix when it ends with "*". `status_class` is e.g.
+    "2xx". A record without a status code or latency does not match rules that test them;
+    RequestLoggingMiddleware therefore decides request_started records at completion.
+    """
+    rate: float
+    event: Optional[str] = None
+    route: Optional[str] = None
+    status_class: Optional[str] = None
+    max_latency_ms: Optional[float] = None
+    name: str = ""
+
+    def applies_to(self, event: str, route: str) -> bool:
+        """Whether the event and route criteria match, whatever the status and latency"""
+        if self.event is not None and self.event != event:
+            return False
+        if self.route is not None:
+            if self.route.endswith("*"):
+                return route.startswith(self.route[:-1])
+            return self.route == route
+        return True
+
+    def matches(self, event: str, route: str, status_code: Optional[int], latency_ms: Optional[float]) -> bool:
+        if not self.applies_to(event, route):
+            return False
+        if self.status_class is not None:
+            if status_code is None or self.status_class[0] != str(status_code)[0]:
+                return False
+        if self.max_latency_ms is not None:
+            if latency_ms is None or latency_ms > self.max_latency_ms:
+                return False
+        return True
+
+
+def parse_rules(spec: str) -> List[SamplingRule]:
+    """
+    Rules from a LOG_SAMPLING_RULES string: rules separated by ";", each a comma-separated
+    list of key=value pairs with keys event, route, status, max_latency_ms and rate, e.g.
+    "route=/health,status=2xx,rate=0.01;event=request_started,rate=0.1".
+    """
+    rules = []
+    for text in (part.strip() for part in spec.split(";")):
+        if not text:
+            continue
+        fields = {}
+        for pair in text.split(","):
+            key, sep, value = pair.partition("=")
+            if not sep:
+                raise ValueError(f"Invalid sampling rule {text!r}: expected key=value, got {pair!r}")
+            fields[key.strip()] = value.strip()
+
+        unknown = set(fields) - {"event", "route", "status", "max_latency_ms", "rate"}
+        if unknown:
+            raise ValueError(f"Invalid sampling rule {text!r}: unknown keys {sorted(unknown)}")
+        if "rate" not in fields:
+            raise ValueError(f"Invalid sampling rule {text!r}: rate is required")
+        rate = float(fields["rate"])
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"Invalid sampling rule {text!r}: rate must be between 0 and 1")
+        status_class = fields.get("status")
+        if status_class is not None and (len(status_class) != 3 or status_class[1:].lower() != "xx"):
+            raise ValueError(f"Invalid sampling rule {text!r}: status must look like 2xx")
+
+        rules.append(SamplingRule(
+            rate=rate,
+            event=fields.get("event"),
+            route=fields.get("route"),
+            status_class=status_class.lower() if status_class else None,
+            max_latency_ms=float(fields["max_latency_ms"]) if "max_latency_ms" in fields else None,
+            name=text,
+        ))
+    return rules
+
+
+class LogSampler:
+    """
+    Decides which request log records are written.
+
+    Sampling decisions are derived from a per-request key (the request ID), so the
+    started and completed records of one request are kept or dropped together when
+    the same rate applies to both. Records that may be dropped are decided once the
+    request's status and latency are known (see may_drop).
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[SamplingRule] = (),
+        slow_ms: Optional[float] = None,
+        error_repeat_limit: int = 0,
+        error_repeat_window: float = 60.0,
+        max_keys: int = 10000
+    ):
+        self.rules: Tuple[SamplingRule, ...] = tuple(rules)
+        self.slow_ms = slow_ms
+        self.error_repeat_limit = error_repeat_limit
+        self.error_repeat_window = error_repeat_window
+        self.max_keys = max_keys
+        # key -> [window start, records written in the window, records suppressed since the last written one]
+        self._repeats: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "LogSampler":
+        """A sampler built from the LOG_SAMPLING_* and LOG_ERROR_REPEAT_* settings"""
+        slow_ms = config_service.get("log_sampling_slow_ms", 0)
+        return cls(
+            rules=parse_rules(config_service.get("log_sampling_rules", "")),
+            slow_ms=slow_ms if slow_ms > 0 else None,
+            error_repeat_limit=config_service.get("log_error_repeat_limit", 0),
+            error_repeat_window=config_service.get("log_error_repeat_window", 60.0),
+        )
+
+    def sample_rate(
+        self,
+        event: str,
+        route: str,
+        status_code: Optional[int] = None,
+        latency_ms: Optional[float] = None
+    ) -> Tuple[float, Optional[SamplingRule]]:
+        """The fraction of matching records to keep, and the rule that set it"""
+        if status_code is not None and status_code >= 500:
+            return 1.0, None
+        if self.slow_ms is not None and latency_ms is not None and latency_ms >= self.slow_ms:
+            return 1.0, None
+        for rule in self.rules:
+            if rule.matches(event, route, status_code, latency_ms):
+                return rule.rate, rule
+        return 1.0, None
+
+    def may_drop(self, event: str, route: str) -> bool:
+        """
+        Whether a rule could drop a record of this event and route, depending on the
+        request's status and latency. If not, the record can be written before they are known.
+        """
+        return any(rule.rate < 1.0 and rule.applies_to(event, route) for rule in self.rules)
+
+    def should_log(
+        self,
+        event: str,
+        route: str,
+        sample_key: str,
+        status_code: Optional[int] = None,
+        latency_ms: Optional[float] = None
+    ) -> Tuple[bool, float]:
+        """Whether to write a request record, and the rate it was sampled at"""
+        rate, rule = self.sample_rate(event, route, status_code, latency_ms)
+        if rate >= 1.0:
+            return True, 1.0
+        if rate > 0.0 and zlib.crc32(sample_key.encode()) < rate * 0x100000000:
+            return True, rate
+        metrics.increment("log_records_sampled_out_total", event=event, rule=rule.name)
+        return False, rate
+
+    def allow_repeat(self, key: str, now: Optional[float] = None) -> Tuple[bool, int]:
+        """
+        Rate limit an error message: at most `error_repeat_limit` records per key per window.
+        Returns whether to write it, and how many were suppressed since the last one written.
+        """
+        if self.error_repeat_limit <= 0:
+            return True, 0
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._repeats.get(key)
+            if entry is None or now - entry[0] >= self.error_repeat_window:
+                suppressed = int(entry[2]) if entry is not None else 0
+                self._repeats[key] = [now, 1, 0]
+                self._repeats.move_to_end(key)
+                while len(self._repeats) > self.max_keys:
+                    self._repeats.popitem(last=False)
+                return True, suppressed
+            if entry[1] < self.error_repeat_limit:
+                entry[1] += 1
+                suppressed, entry[2] = int(entry[2]), 0
+                return True, suppressed
+            entry[2] += 1
+        metrics.increment("log_records_suppressed_total")
+        return False, 0
+
+    def on_config_change(self, old, new, changed) -> None:
+        """Pick up sampling settings after a configuration reload."""
+        sampler = LogSampler.from_config()
+        self.rules = sampler.rules
+        self.slow_ms = sampler.slow_ms
+        self.error_repeat_limit = sampler.error_repeat_limit
+        self.error_repeat_window = sampler.error_repeat_window
+
+
+class ExceptionDeduplicator:
+    """
+    Loguru patcher that keeps the traceback of only the first exception of each type per
+    `window` seconds. Later records of that type within the window are still written, but
+    carry just the exception type and message, so they are not formatted at all.
+    The next full traceback of a type reports how many were left out before it.
+    """
+
+    def __init__(self, window: float, max_types: int = 1000):
+        self.window = window
+        self.max_types = max_types
+        # exception type -> [time its last traceback was kept, tracebacks left out since]
+        self._seen: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        exception = record["exception"]
+        if exception is None or exception.type is None:
+            return
+        exc_type = exception.type
+        key = f"{exc_type.__module__}.{exc_type.__qualname__}"
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                self._seen[key] = [now, 0]
+                self._seen.move_to_end(key)
+                while len(self._seen) > self.max_types:
+                    self._seen.popitem(last=False)
+                if entry is not None and entry[1]:
+                    record["extra"]["tracebacks_suppressed"] = int(entry[1])
+                return
+            entry[1] += 1
+
+        record["exception"] = None
+        record["extra"]["exception_type"] = exc_type.__name__
+        record["extra"]["exception_value"] = str(exception.value)
+        record["extra"]["traceback_suppressed"] = True
+        metrics.increment("log_tracebacks_suppressed_total", exception_type=exc_type.__name__)
+
+
+log_sampler = LogSampler.from_config()
+config_service.subscribe(log_sampler.on_config_change, keys=SAMPLING_CONFIG_KEYS)
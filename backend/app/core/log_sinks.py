@@ -0,0 +1,363 @@
+"""
+Log sinks used by the logging service.
+"""
+import json
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional, TextIO
+
+from app.core.metrics import metrics
+
+try:
+    import orjson
+except ImportError:  # listed in requirements.txt; the slower stdlib encoder is the fallback
+    orjson = None
+
+# Whether JSON lines are encoded with orjson (the logging service warns once when not)
+FAST_JSON_ENCODER = orjson is not None
+
+# loguru's INFO and ERROR severities; records below INFO are DEBUG or TRACE
+_INFO_NO = 20
+_ERROR_NO = 40
+
+# Extra field the file handler's format function stores a record's JSON line in
+JSON_LINE_KEY = "_json_line"
+
+# Fields of the flat JSON schema that extra values may not overwrite
+_STANDARD_FIELDS = frozenset((
+    "timestamp", "level", "message", "module", "function", "line", "process_id", "thread_id", "exception",
+    JSON_LINE_KEY,
+))
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+    def dumps_line(data: Dict[str, Any]) -> bytes:
+        """One newline-terminated JSON document; values JSON can't represent are written with str()"""
+        return orjson.dumps(data, default=str, option=_ORJSON_OPTIONS)
+else:
+    _json_encoder = json.JSONEncoder(default=str, separators=(",", ":"), ensure_ascii=False)
+
+    def dumps_line(data: Dict[str, Any]) -> bytes:
+        """One newline-terminated JSON document; values JSON can't represent are written with str()"""
+        return (_json_encoder.encode(data) + "\n").encode("utf-8")
+
+
+def format_exception(exception, traceback_text: Optional[str] = None) -> Dict[str, str]:
+    """The type, value and traceback of a loguru record's exception"""
+    exc_type, value, tb = exception
+    if traceback_text is None:
+        traceback_text = "".join(traceback.format_exception(exc_type, value, tb))
+    return {
+        "type": exc_type.__name__ if exc_type is not None else "",
+        "value": str(value),
+        "traceback": traceback_text,
+    }
+
+
+def flat_record(record: Dict[str, Any], traceback_text: Optional[str] = None) -> Dict[str, Any]:
+    """
+    A loguru record as a flat dict: the standard fields, then extra fields at the top level.
+    This is the schema of JSON log lines (loguru's serialize=True nests everything instead).
+    `traceback_text` is the exception as loguru already formatted it, if available.
+    """
+    serialized = {
+        "timestamp": record["time"].strftime("%Y-%m-%d %H:%M:%S.%f"),
+        "level": record["level"].name,
+        "message": record["message"],
+        "module": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+        "process_id": record["process"].id,
+        "thread_id": record["thread"].id,
+    }
+
+    if record["exception"] is not None:
+        serialized["exception"] = format_exception(record["exception"], traceback_text)
+
+    for key, value in record["extra"].items():
+        # Don't overwrite standard fields
+        if key not in _STANDARD_FIELDS:
+            serialized[key] = value
+
+    return serialized
+
+
+def exception_format(record: Dict[str, Any]) -> str:
+    """
+    Handler format for the JSON sinks: the formatted message is just the exception text.
+    Loguru formats a record's exception for every handler, so the sinks reuse that text.
+    """
+    return "{exception}"
+
+
+def _traceback_text(message) -> Optional[str]:
+    return str(message) if message.record["exception"] is not None else None
+
+
+def render_json(message) -> str:
+    """A message from an `exception_format` handler as a flat JSON line (AsyncLogSink `render` hook)"""
+    return dumps_line(flat_record(message.record, _traceback_text(message))).decode("utf-8")
+
+
+def json_line_format(record: Dict[str, Any]) -> str:
+    """
+    Handler format for loguru's own file sink: stores the record's flat JSON line in its
+    extra fields and formats only that.
+    """
+    record["extra"][JSON_LINE_KEY] = dumps_line(flat_record(record)).decode("utf-8")
+    return "{extra[%s]}" % JSON_LINE_KEY
+
+
+def _report_error(name: str, error: Exception) -> None:
+    # Logging must never take the caller down; report on stderr like loguru does
+    sys.stderr.write(f"--- Logging error in {name} sink: {error} ---\n")
+
+
+class OverflowPolicy(str, Enum):
+    """What an asynchronous sink does with a record when its queue is full."""
+    BLOCK = "block"              # wait for the writer to make room
+    DROP_DEBUG = "drop-debug"    # drop DEBUG/TRACE records, wait for room for the rest
+    DROP_OLDEST = "drop-oldest"  # discard the oldest queued record
+
+
+class AsyncLogSink:
+    """
+    Loguru sink that hands formatted records to a background writer thread.
+
+    Callers only append to a bounded in-memory queue, so a slow stream (e.g. a stdout
+    pipe drained by a struggling container log driver) no longer stalls requests.
+    The writer takes everything queued at once and writes it with a single call.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        max_size: int = 10000,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        name: str = "console",
+        render: Callable[[Any], str] = str,
+        close_stream: bool = False
+    ):
+        self.stream = stream
+        self.render = render
+        self.close_stream = close_stream
+        self.max_size = max_size
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.name = name
+        self.queued = 0
+        self.dropped = 0
+        self._published_queued = 0
+        self._queue: Deque[str] = deque()
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._drain, name=f"log-writer-{name}", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message) -> None:
+        """Enqueue one formatted record (called by loguru)"""
+        with self._condition:
+            if self._closed:
+                # After stop() records are written directly so nothing is lost at shutdown
+                self._write(self.render(message))
+                return
+            while len(self._queue) >= self.max_size:
+                if self.overflow_policy == OverflowPolicy.DROP_OLDEST:
+                    self._queue.popleft()
+                    self._record_drop()
+                    break
+                if self.overflow_policy == OverflowPolicy.DROP_DEBUG and message.record["level"].no < _INFO_NO:
+                    self._record_drop()
+                    return
+                self._condition.wait()
+                if self._closed:
+                    self._write(self.render(message))
+                    return
+            self._queue.append(self.render(message))
+            self.queued += 1
+            self._condition.notify_all()
+
+    def _record_drop(self) -> None:
+        self.dropped += 1
+        metrics.increment("log_records_dropped_total", sink=self.name, policy=self.overflow_policy.value)
+
+    def _write(self, text: str) -> None:
+        try:
+            self.stream.write(text)
+            self.stream.flush()
+        except Exception as e:
+            _report_error(self.name, e)
+
+    def _drain(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                batch = "".join(self._queue)
+                self._queue.clear()
+                self._writing = True
+                # Producers blocked on a full queue can continue
+                self._condition.notify_all()
+
+            self._write(batch)
+
+            with self._condition:
+                self._writing = False
+                queued, self._published_queued = self.queued - self._published_queued, self.queued
+                depth = len(self._queue)
+                self._condition.notify_all()
+            metrics.increment("log_records_queued_total", queued, sink=self.name)
+            metrics.set_gauge("log_queue_depth", depth, sink=self.name)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued so far is written. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._writing, timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write what is queued and stop the writer thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        if self.close_stream:
+            self.stream.close()
+
+
+class _FileText(str):
+    """Text for loguru's file sink, which reads the record time for time-based rotation"""
+
+
+class RotatingFileStream:
+    """
+    Text stream writing to a log file through loguru's file sink, so AsyncLogSink can write
+    files from its writer thread with loguru's rotation, retention and compression.
+    Rotation is checked per write, so a file can pass a size limit by one batch of records.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rotation: Optional[str] = None,
+        retention: Optional[str] = None,
+        compression: Optional[str] = None
+    ):
+        # loguru has no public API for its file sink outside a handler
+        from loguru._file_sink import FileSink
+
+        self._sink = FileSink(path, rotation=rotation, retention=retention, compression=compression)
+
+    def write(self, text: str) -> None:
+        message = _FileText(text)
+        message.record = {"time": datetime.now().astimezone()}
+        self._sink.write(message)
+
+    def flush(self) -> None:
+        """Lines are flushed as they are written"""
+
+    def close(self) -> None:
+        """Close the file (a later write opens it again)"""
+        self._sink.stop()
+
+
+class JsonLogSink:
+    """
+    Loguru sink that writes records as flat JSON lines (see `flat_record`); add it with
+    format=exception_format.
+
+    Lines are encoded into one reusable byte buffer and written together once
+    `batch_size` records are pending, when an ERROR or worse is logged, or at the latest
+    `flush_interval` seconds after the first pending record (checked by a daemon thread).
+    Text streams with an underlying binary buffer, like sys.stdout, get the bytes directly.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        buffer_size: int = 64 * 1024,
+        name: str = "console"
+    ):
+        self.stream = stream
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.name = name
+        self._buffer_size = buffer_size
+        self._buffer = bytearray(buffer_size)
+        self._end = 0
+        self._pending = 0
+        self._first_pending_at = 0.0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._flush_periodically, name=f"log-flusher-{name}", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message) -> None:
+        """Encode one record into the buffer (called by loguru)"""
+        record = message.record
+        line = dumps_line(flat_record(record, _traceback_text(message)))
+        with self._lock:
+            end = self._end + len(line)
+            if end > len(self._buffer):
+                self._buffer.extend(bytes(end - len(self._buffer)))
+            # Same-length slice assignment overwrites in place; the buffer is not reallocated
+            self._buffer[self._end:end] = line
+            self._end = end
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending += 1
+            if self._pending >= self.batch_size or record["level"].no >= _ERROR_NO or self._closed:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        """Write the buffered lines. Caller must hold the lock."""
+        if not self._end:
+            return
+        try:
+            binary = getattr(self.stream, "buffer", None)
+            with memoryview(self._buffer) as view, view[:self._end] as chunk:
+                if binary is not None:
+                    # Text written to the stream directly must come out first
+                    self.stream.flush()
+                    binary.write(chunk)
+                    binary.flush()
+                else:
+                    self.stream.write(str(chunk, "utf-8"))
+                    self.stream.flush()
+        except Exception as e:
+            _report_error(self.name, e)
+        self._end = 0
+        self._pending = 0
+        if len(self._buffer) > 4 * self._buffer_size:
+            # Give back the memory a burst of large records grew the buffer to
+            del self._buffer[self._buffer_size:]
+
+    def _flush_periodically(self) -> None:
+        while not self._stopped.wait(self.flush_interval / 2):
+            with self._lock:
+                if self._pending and time.monotonic() - self._first_pending_at >= self.flush_interval:
+                    self._flush_locked()
+
+    def flush(self) -> None:
+        """Write everything buffered so far"""
+        with self._lock:
+            self._flush_locked()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write what is buffered and stop the flusher thread; later records are written directly"""
+        with self._lock:
+            self._closed = True
+            self._flush_locked()
+        self._stopped.set()
+        self._thread.join(timeout)
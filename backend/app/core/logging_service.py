@@ -2,6 +2,7 @@
 Centralized logging service for the application.
 Provides structured JSON logging with configurable output destinations and log levels.
 """
+import atexit
 import os
 import sys
 import logging
@@ -14,6 +15,18 @@ from loguru import logger as loguru_logger
 from pydantic import BaseModel
 
 from app.core.config_service import config_service
+from app.core.log_sampling import ExceptionDeduplicator
+from app.core.request_context import current_request_context
+from app.core.log_sinks import (
+    FAST_JSON_ENCODER,
+    AsyncLogSink,
+    JsonLogSink,
+    OverflowPolicy,
+    RotatingFileStream,
+    exception_format,
+    json_line_format,
+    render_json,
+)
 
 
 class LogLevel(str, Enum):
@@ -25,6 +38,12 @@ class LogLevel(str, Enum):
     CRITICAL = "CRITICAL"
 
 
+class LogProfile(str, Enum):
+    """How much diagnostic detail logged exceptions carry."""
+    DEVELOPMENT = "development"  # extended tracebacks with the values of local variables
+    PRODUCTION = "production"    # plain tracebacks, and only one per exception type per dedup window
+
+
 class LogConfig(BaseModel):
     """Configuration for the logging service."""
     level: LogLevel = LogLevel.INFO
@@ -35,6 +54,50 @@ class LogConfig(BaseModel):
     rotation: str = "20 MB"  # Size at which to rotate log files
     retention: str = "1 week"  # How long to keep log files
     compression: str = "zip"  # Compression format for rotated logs
+    async_output: bool = False  # Write console and file output from background threads
+    queue_size: int = 10000  # Records the async sink holds before the overflow policy applies
+    overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK
+    batch_size: int = 256  # JSON console records written per batch
+    flush_interval: float = 0.5  # Longest a JSON console record waits for its batch (seconds)
+    profile: LogProfile = LogProfile.DEVELOPMENT
+    exception_dedup_window: Optional[float] = None  # Seconds; None uses the profile's default
+
+    @property
+    def rich_tracebacks(self) -> bool:
+        """Whether tracebacks are extended beyond the catching frame and show local variables"""
+        return self.profile == LogProfile.DEVELOPMENT
+
+    @property
+    def dedup_window(self) -> float:
+        """Seconds during which repeated exceptions of one type are logged without a traceback"""
+        if self.exception_dedup_window is not None:
+            return self.exception_dedup_window
+        return 60.0 if self.profile == LogProfile.PRODUCTION else 0.0
+
+
+# Severity numbers of loguru's built-in levels
+_LEVEL_NOS = {"TRACE": 5, "DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+_DEBUG_NO = _LEVEL_NOS["DEBUG"]
+_INFO_NO = _LEVEL_NOS["INFO"]
+_WARNING_NO = _LEVEL_NOS["WARNING"]
+_ERROR_NO = _LEVEL_NOS["ERROR"]
+_CRITICAL_NO = _LEVEL_NOS["CRITICAL"]
+_DISABLED_NO = sys.maxsize
+
+# Lowest severity any configured handler accepts, kept current by LoggingService._configure_loguru.
+# Logger methods compare against it before doing any work for a record.
+_min_level_no = _INFO_NO
+
+# Whether the missing orjson encoder was already reported
+_slow_encoder_reported = False
+
+
+# Config keys the logging service is built from (reconfigured when they change on reload)
+LOG_CONFIG_KEYS = (
+    "log_level", "log_json_format", "log_console_output", "log_file_output", "log_file_path",
+    "log_rotation", "log_retention", "log_compression", "log_async", "log_queue_size", "log_overflow_policy",
+    "log_batch_size", "log_flush_interval", "log_profile", "log_exception_dedup_window",
+)
 
 
 class LoggingService:
@@ -49,10 +112,16 @@ class LoggingService:
         If no configuration is provided, it will be loaded from the config service.
         """
         self.config = config or self._load_config_from_service()
+        self._sinks: List[Union[AsyncLogSink, JsonLogSink]] = []
+        self._deduplicator: Optional[ExceptionDeduplicator] = None
         self._configure_loguru()
 
     def _load_config_from_service(self) -> LogConfig:
         """Load logging configuration from the config service."""
+        # The profile follows the environment unless LOG_PROFILE sets it
+        profile = config_service.get("log_profile") or (
+            LogProfile.PRODUCTION if config_service.is_production() else LogProfile.DEVELOPMENT
+        )
         return LogConfig(
             level=LogLevel(config_service.get("log_level", "INFO").upper()),
             json_format=config_service.get("log_json_format", True),
@@ -62,29 +131,69 @@ class LoggingService:
             rotation=config_service.get("log_rotation", "20 MB"),
             retention=config_service.get("log_retention", "1 week"),
             compression=config_service.get("log_compression", "zip"),
+            async_output=config_service.get("log_async", False),
+            queue_size=config_service.get("log_queue_size", 10000),
+            overflow_policy=OverflowPolicy(config_service.get("log_overflow_policy", "block").lower()),
+            batch_size=config_service.get("log_batch_size", 256),
+            flush_interval=config_service.get("log_flush_interval", 0.5),
+            profile=LogProfile(profile.lower()),
+            exception_dedup_window=config_service.get("log_exception_dedup_window"),
         )
 
     def _configure_loguru(self) -> None:
         """Configure loguru with the current settings."""
+        global _min_level_no
+
         # Remove default handlers
         loguru_logger.remove()
+        self._stop_sinks()
+
+        dedup_window = self.config.dedup_window
+        self._deduplicator = ExceptionDeduplicator(dedup_window) if dedup_window > 0 else None
+        rich_tracebacks = self.config.rich_tracebacks
+        # loguru has a single, global patcher; install this service's along with its handlers
+        loguru_logger.configure(patcher=self._patch_record)
 
         # Define the log format based on configuration
         if self.config.json_format:
-            # For JSON format, we'll use serialize=True and a custom function to format the JSON
-            log_format = "{message}"
+            # JSON sinks render records themselves; the formatted message is only the exception text
+            log_format = exception_format
         else:
             log_format = "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
 
         # Add console handler if enabled
         if self.config.console_output:
+            console_sink = sys.stdout
+            colorize = None
+            if self.config.async_output:
+                # Requests only enqueue; a background thread writes to stdout
+                console_sink = AsyncLogSink(
+                    sys.stdout,
+                    max_size=self.config.queue_size,
+                    overflow_policy=self.config.overflow_policy,
+                    name="console",
+                    render=render_json if self.config.json_format else str,
+                )
+                self._sinks.append(console_sink)
+                colorize = sys.stdout.isatty() and not self.config.json_format
+            elif self.config.json_format:
+                # Records are encoded into a reused buffer and written in batches
+                console_sink = JsonLogSink(
+                    sys.stdout,
+                    batch_size=self.config.batch_size,
+                    flush_interval=self.config.flush_interval,
+                    name="console",
+                )
+                self._sinks.append(console_sink)
+                colorize = False
+
             loguru_logger.add(
-                sys.stdout,
+                console_sink,
+                colorize=colorize,
                 format=log_format,
                 level=self.config.level.value,
-                serialize=self.config.json_format,
-                backtrace=True,
-                diagnose=True,
+                backtrace=rich_tracebacks,
+                diagnose=rich_tracebacks,
             )
 
         # Add file handler if enabled
@@ -94,52 +203,72 @@ class LoggingService:
             # Create directory if it doesn't exist
             log_path.parent.mkdir(parents=True, exist_ok=True)
 
-            loguru_logger.add(
-                str(log_path),
-                format=log_format,
-                level=self.config.level.value,
-                serialize=self.config.json_format,
-                rotation=self.config.rotation,
-                retention=self.config.retention,
-                compression=self.config.compression,
-                backtrace=True,
-                diagnose=True,
-            )
-
-    def _serialize_record(self, record):
-        """Serialize a log record for JSON output.
-
-        This is used by loguru's serialize parameter to convert the record to a dict
-        that can be serialized to JSON.
-        """
-        # Basic log data
-        serialized = {
-            "timestamp": record["time"].strftime("%Y-%m-%d %H:%M:%S.%f"),
-            "level": record["level"].name,
-            "message": record["message"],
-            "module": record["name"],
-            "function": record["function"],
-            "line": record["line"],
-            "process_id": record["process"].id,
-            "thread_id": record["thread"].id,
-        }
-
-        # Add exception info if available
-        if record["exception"] is not None:
-            serialized["exception"] = {
-                "type": record["exception"].type,
-                "value": str(record["exception"].value),
-                "traceback": record["exception"].traceback,
-            }
-
-        # Add all extra fields at the top level
-        if record["extra"]:
-            for key, value in record["extra"].items():
-                # Don't overwrite standard fields
-                if key not in serialized:
-                    serialized[key] = value
-
-        return serialized
+            if self.config.async_output:
+                # Requests only enqueue; a background thread writes, rotates and compresses the file
+                file_sink = AsyncLogSink(
+                    RotatingFileStream(
+                        str(log_path),
+                        rotation=self.config.rotation,
+                        retention=self.config.retention,
+                        compression=self.config.compression,
+                    ),
+                    max_size=self.config.queue_size,
+                    overflow_policy=self.config.overflow_policy,
+                    name="file",
+                    render=render_json if self.config.json_format else str,
+                    close_stream=True,
+                )
+                self._sinks.append(file_sink)
+                loguru_logger.add(
+                    file_sink,
+                    colorize=False,
+                    format=log_format,
+                    level=self.config.level.value,
+                    backtrace=rich_tracebacks,
+                    diagnose=rich_tracebacks,
+                )
+            else:
+                loguru_logger.add(
+                    str(log_path),
+                    format=json_line_format if self.config.json_format else log_format,
+                    level=self.config.level.value,
+                    rotation=self.config.rotation,
+                    retention=self.config.retention,
+                    compression=self.config.compression,
+                    backtrace=rich_tracebacks,
+                    diagnose=rich_tracebacks,
+                )
+
+        has_handlers = self.config.console_output or (self.config.file_output and self.config.log_file_path)
+        _min_level_no = _LEVEL_NOS[self.config.level.value] if has_handlers else _DISABLED_NO
+        self._report_slow_encoder()
+
+    def _report_slow_encoder(self) -> None:
+        """Warn once when JSON logs fall back to the stdlib encoder."""
+        global _slow_encoder_reported
+
+        if self.config.json_format and not FAST_JSON_ENCODER and not _slow_encoder_reported:
+            _slow_encoder_reported = True
+            get_logger(__name__).warning("orjson is not installed; JSON logs are encoded with the slower stdlib json")
+
+    def _stop_sinks(self) -> None:
+        """Write out and stop the buffering sinks of removed handlers."""
+        for sink in self._sinks:
+            sink.stop()
+        self._sinks = []
+
+    def shutdown(self) -> None:
+        """Write out buffered records and stop background threads; later records are written directly."""
+        self._stop_sinks()
+
+    def _patch_record(self, record) -> None:
+        """Loguru patcher applied to every record before any handler sees it."""
+        context = current_request_context()
+        if context is not None:
+            context.merge_into(record["extra"])
+        deduplicator = self._deduplicator
+        if deduplicator is not None:
+            deduplicator(record)
 
     def get_logger(self, name: str) -> "Logger":
         """
@@ -163,10 +292,21 @@ class LoggingService:
         self.config = config
         self._configure_loguru()
 
+    def on_config_change(self, old, new, changed) -> None:
+        """Reconfigure the sinks after a configuration reload changed logging settings."""
+        config = self._load_config_from_service()
+        if config != self.config:
+            self.update_config(config)
+
 
 class Logger:
     """
     Logger class that wraps loguru logger with additional functionality.
+
+    Positional arguments after the message are formatted into its `{}` placeholders only
+    when the record is emitted, so prefer `logger.debug("Got user {}", user_id)` over an
+    f-string. Records below the configured level return before loguru is called at all;
+    guard expensive argument preparation with `is_enabled`.
     """
 
     def __init__(self, name: str, config: LogConfig):
@@ -181,40 +321,59 @@ class Logger:
         self.config = config
         self.logger = loguru_logger.bind(name=name)
 
-    def debug(self, message: str, **kwargs) -> None:
+    @property
+    def logger(self):
+        return self._logger
+
+    @logger.setter
+    def logger(self, value) -> None:
+        self._logger = value
+        # depth=1 attributes records to the caller's frame instead of these methods;
+        # the option is fixed, so build the opt() logger once rather than per call
+        self._caller = value.opt(depth=1)
+
+    @staticmethod
+    def is_enabled(level: Union[str, int]) -> bool:
+        """Whether a record at `level` would be written by any handler."""
+        if isinstance(level, int):
+            return level >= _min_level_no
+        # Custom levels are left to loguru
+        return _LEVEL_NOS.get(level.upper(), _min_level_no) >= _min_level_no
+
+    def debug(self, message: str, *args, **kwargs) -> None:
         """Log a debug message."""
-        # Use depth=1 to capture the caller's frame instead of this method
-        self.logger.opt(depth=1).debug(message, **kwargs)
+        if _DEBUG_NO >= _min_level_no:
+            self._caller.debug(message, *args, **kwargs)
 
-    def info(self, message: str, **kwargs) -> None:
+    def info(self, message: str, *args, **kwargs) -> None:
         """Log an info message."""
-        # Use depth=1 to capture the caller's frame instead of this method
-        self.logger.opt(depth=1).info(message, **kwargs)
+        if _INFO_NO >= _min_level_no:
+            self._caller.info(message, *args, **kwargs)
 
-    def warning(self, message: str, **kwargs) -> None:
+    def warning(self, message: str, *args, **kwargs) -> None:
         """Log a warning message."""
-        # Use depth=1 to capture the caller's frame instead of this method
-        self.logger.opt(depth=1).warning(message, **kwargs)
+        if _WARNING_NO >= _min_level_no:
+            self._caller.warning(message, *args, **kwargs)
 
-    def error(self, message: str, **kwargs) -> None:
+    def error(self, message: str, *args, **kwargs) -> None:
         """Log an error message."""
-        # Use depth=1 to capture the caller's frame instead of this method
-        self.logger.opt(depth=1).error(message, **kwargs)
+        if _ERROR_NO >= _min_level_no:
+            self._caller.error(message, *args, **kwargs)
 
-    def critical(self, message: str, **kwargs) -> None:
+    def critical(self, message: str, *args, **kwargs) -> None:
         """Log a critical message."""
-        # Use depth=1 to capture the caller's frame instead of this method
-        self.logger.opt(depth=1).critical(message, **kwargs)
+        if _CRITICAL_NO >= _min_level_no:
+            self._caller.critical(message, *args, **kwargs)
 
-    def exception(self, message: str, **kwargs) -> None:
+    def exception(self, message: str, *args, **kwargs) -> None:
         """Log an exception message with traceback."""
-        # Use depth=1 to capture the caller's frame instead of this method
-        self.logger.opt(depth=1).exception(message, **kwargs)
+        if _ERROR_NO >= _min_level_no:
+            self._caller.exception(message, *args, **kwargs)
 
-    def log(self, level: Union[str, int], message: str, **kwargs) -> None:
+    def log(self, level: Union[str, int], message: str, *args, **kwargs) -> None:
         """Log a message with the specified level."""
-        # Use depth=1 to capture the caller's frame instead of this method
-        self.logger.opt(depth=1).log(level, message, **kwargs)
+        if self.is_enabled(level):
+            self._caller.log(level, message, *args, **kwargs)
 
     def bind(self, **kwargs) -> "Logger":
         """
@@ -234,6 +393,9 @@ class Logger:
 
 # Create a singleton instance of the logging service
 logging_service = LoggingService()
+config_service.subscribe(logging_service.on_config_change, keys=LOG_CONFIG_KEYS)
+# Records still queued in async sinks are written before the interpreter exits
+atexit.register(logging_service.shutdown)
 
 
 def get_logger(name: str) -> Logger:
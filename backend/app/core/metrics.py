@@ -0,0 +1,85 @@
+"""
+In-process metrics registry.
+Collects counters, gauges and timing summaries that are exposed on the metrics endpoint.
+"""
+import threading
+from typing import Any, Dict, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_name(name: str, labels: LabelKey) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f'{key}="{value}"' for key, value in labels)
+    return f"{name}{{{rendered}}}"
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of named metrics with optional labels.
+    Counters only go up, gauges hold the last value set, and summaries track
+    count, sum and max of observed values.
+    """
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        self._summaries: Dict[Tuple[str, LabelKey], Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Increase a counter"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Set a gauge to the given value"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record an observation (e.g. a latency) in a summary"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = {"count": 0, "sum": 0.0, "max": 0.0}
+            summary["count"] += 1
+            summary["sum"] += value
+            if value > summary["max"]:
+                summary["max"] = value
+
+    def get_counter(self, name: str, **labels: Any) -> float:
+        """Current value of a counter (0 if never incremented)"""
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def get_gauge(self, name: str, **labels: Any) -> float:
+        """Current value of a gauge (0 if never set)"""
+        return self._gauges.get((name, _label_key(labels)), 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """All metrics, keyed by name with labels rendered inline"""
+        with self._lock:
+            return {
+                "counters": {_format_name(n, l): v for (n, l), v in self._counters.items()},
+                "gauges": {_format_name(n, l): v for (n, l), v in self._gauges.items()},
+                "summaries": {_format_name(n, l): dict(v) for (n, l), v in self._summaries.items()},
+            }
+
+    def reset(self) -> None:
+        """Clear all metrics"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+# Global instance
+metrics = MetricsRegistry()
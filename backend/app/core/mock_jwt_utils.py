@@ -3,11 +3,26 @@ Mock JWT utilities for testing purposes.
 Provides token validation without requiring real AWS Cognito.
 """
 import logging
-from typing import Dict, Any
+from typing import Any, Dict, Optional
+from app.core.config_service import config_service
+from app.crud.user import UserDAO
 from app.schemas.auth import TokenData
+from app.utils.ttl_store import TTLStore
 
 logger = logging.getLogger(__name__)
 
+# Tokens issued by MockCognitoService, shared with the validator so there is one registry
+mock_token_store = TTLStore(
+    default_ttl=3600,
+    max_size=config_service.get("mock_token_max_size", 100000)
+)
+
+# Users by Cognito sub, filled in by MockCognitoService at sign in so most token checks skip the database
+mock_user_cache = TTLStore(
+    default_ttl=config_service.get("mock_user_cache_ttl", 300),
+    max_size=config_service.get("mock_user_cache_max_size", 10000)
+)
+
 
 class MockCognitoJWTValidator:
     """
@@ -15,10 +30,39 @@ class MockCognitoJWTValidator:
     Validates mock tokens generated by MockCognitoService.
     """
 
-    def __init__(self):
-        self._valid_tokens: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, token_store: Optional[TTLStore] = None, user_cache: Optional[TTLStore] = None):
+        self._valid_tokens = token_store if token_store is not None else mock_token_store
+        self._users = user_cache if user_cache is not None else mock_user_cache
+        self.user_dao = UserDAO()
         logger.info("Initialized Mock Cognito JWT Validator")
 
+    def _get_user(self, user_sub: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a user by sub, from the cache when possible.
+        Users not seen at sign in (e.g. created directly in the database, or evicted
+        from the cache) are read from the database and cached.
+        """
+        user = self._users.get(user_sub)
+        if user is not None:
+            return user
+
+        from app.db import SessionLocal
+        db = SessionLocal()
+        try:
+            db_user = self.user_dao.get_by_cognito_sub(db, user_sub)
+        finally:
+            db.close()
+        if db_user is None:
+            return None
+
+        user = {
+            "user_sub": db_user.cognito_sub,
+            "email": db_user.email,
+            "full_name": db_user.full_name
+        }
+        self._users.set(user_sub, user)
+        return user
+
     def validate_token(self, token: str) -> TokenData:
         """
         Validate a mock token and return TokenData.
@@ -26,10 +70,10 @@ class MockCognitoJWTValidator:
         """
         try:
             # Check if token is in our registered tokens
-            if token in self._valid_tokens:
-                token_data = self._valid_tokens[token]
+            token_data = self._valid_tokens.get(token)
+            if token_data is not None:
                 return TokenData(
-                    username=token_data.get("username"),
+                    username=token_data.get("username") or token_data.get("email"),
                     user_sub=token_data.get("user_sub"),
                     email=token_data.get("email")
                 )
@@ -53,21 +97,13 @@ class MockCognitoJWTValidator:
                     parts = token.split("-")
                     if len(parts) >= 3:
                         user_sub = "-".join(parts[2:-1])  # Everything between 'access' and timestamp
-                        # Try to find user by user_sub in database
-                        from app.db import SessionLocal
-                        from app.models.user import User
-
-                        db = SessionLocal()
-                        try:
-                            user = db.query(User).filter(User.cognito_sub == user_sub).first()
-                            if user:
-                                return TokenData(
-                                    username=str(user.email),
-                                    user_sub=user_sub,
-                                    email=str(user.email)
-                                )
-                        finally:
-                            db.close()
+                        user = self._get_user(user_sub)
+                        if user is not None:
+                            return TokenData(
+                                username=user["email"],
+                                user_sub=user_sub,
+                                email=user["email"]
+                            )
                     
                     # Fallback for unrecognized mock tokens
                     return TokenData(
@@ -91,17 +127,17 @@ class MockCognitoJWTValidator:
             "user_sub": user_sub,
             "email": email
         }
-        logger.debug(f"Mock JWT: Added valid token for {email}")
+        logger.debug("Mock JWT: Added valid token for %s", email)
 
     def remove_token(self, token: str):
         """Remove a token from the valid tokens registry"""
-        if token in self._valid_tokens:
-            del self._valid_tokens[token]
-            logger.debug(f"Mock JWT: Removed token {token[:20]}...")
+        if self._valid_tokens.pop(token) is not None:
+            logger.debug("Mock JWT: Removed token %s...", token[:20])
 
     def clear_all_tokens(self):
-        """Clear all valid tokens (for testing cleanup)"""
+        """Clear all valid tokens and cached users (for testing cleanup)"""
         self._valid_tokens.clear()
+        self._users.clear()
         logger.info("Mock JWT: Cleared all valid tokens")
 
     def is_token_valid(self, token: str) -> bool:
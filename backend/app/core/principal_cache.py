@@ -0,0 +1,100 @@
+"""
+Short-lived cache of resolved principals for authenticated requests.
+Maps a token subject (Cognito sub or username) to the user's UserResponse so that
+repeated requests from the same user don't hit the database.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from app.core.config_service import config_service
+from app.schemas.user import UserResponse
+
+
+class PrincipalCache:
+    """
+    In-process TTL cache of principals keyed by token subject.
+
+    Entries expire after a short TTL, which bounds staleness across workers.
+    Within a worker, entries are dropped as soon as the user is updated or deleted.
+    """
+
+    def __init__(self, ttl_seconds: float = 30, max_size: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, UserResponse]]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def sub_key(cognito_sub: str) -> str:
+        """Cache key for a Cognito sub"""
+        return f"sub:{cognito_sub}"
+
+    @staticmethod
+    def username_key(username: str) -> str:
+        """Cache key for a username"""
+        return f"username:{username}"
+
+    def get(self, key: str) -> Optional[UserResponse]:
+        """Get a cached principal, or None if missing or expired"""
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                self._remove_key(key)
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, keys: Iterable[str], user: UserResponse) -> None:
+        """Cache a principal under one or more subject keys"""
+        if self.ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key in keys:
+                self._remove_key(key)
+                self._entries[key] = (expires_at, user)
+                self._keys_by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._remove_key(oldest_key)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every cached entry for the given user"""
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, set()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all cached principals"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove_key(self, key: str) -> None:
+        """Remove a key and its reverse index entry. Caller must hold the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry[1].id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry[1].id]
+
+
+# Global instance
+principal_cache = PrincipalCache(
+    ttl_seconds=config_service.get("principal_cache_ttl", 30),
+    max_size=config_service.get("principal_cache_max_size", 10000)
+)
@@ -0,0 +1,59 @@
+"""
+Per-request context for log correlation.
+RequestLoggingMiddleware opens a context for each request and the logging service's
+patcher adds its fields to every record logged while the request is handled, from any
+module, without binding a logger per request.
+"""
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Optional
+
+
+class RequestContext:
+    """
+    Correlation fields of the request being handled.
+
+    The object is shared by everything the request runs, so fields set after the context
+    is opened (e.g. user_sub, once the token is validated in a dependency) are seen by
+    later records of the same request, including the middleware's own.
+    """
+
+    __slots__ = ("request_id", "route", "user_sub")
+
+    def __init__(self, request_id: str, route: Optional[str] = None, user_sub: Optional[str] = None):
+        self.request_id = request_id
+        self.route = route
+        self.user_sub = user_sub
+
+    def merge_into(self, extra: Dict[str, Any]) -> None:
+        """Add the fields that are set to a record's extra fields, keeping explicitly bound values"""
+        if "request_id" not in extra:
+            extra["request_id"] = self.request_id
+        if self.route is not None and "route" not in extra:
+            extra["route"] = self.route
+        if self.user_sub is not None and "user_sub" not in extra:
+            extra["user_sub"] = self.user_sub
+
+
+_current: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+def open_request_context(request_id: str, route: Optional[str] = None) -> Token:
+    """Start the context of a request; pass the returned token to close_request_context"""
+    return _current.set(RequestContext(request_id, route))
+
+
+def close_request_context(token: Token) -> None:
+    """End the context started by open_request_context"""
+    _current.reset(token)
+
+
+def current_request_context() -> Optional[RequestContext]:
+    """The context of the request being handled, or None outside requests"""
+    return _current.get()
+
+
+def set_user_sub(user_sub: Optional[str]) -> None:
+    """Record the authenticated user for the rest of the current request"""
+    context = _current.get()
+    if context is not None:
+        context.user_sub = user_sub
@@ -0,0 +1,101 @@
+"""
+Encrypted on-disk cache for the AWS Secrets Manager payload.
+A cold start inside the TTL reads the secret from disk instead of calling Secrets Manager.
+Entries are Fernet tokens, so they are authenticated and carry their own creation time,
+which is what the TTL is checked against.
+"""
+import json
+import logging
+import os
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EncryptedSecretsCache:
+    """
+    One cached secret payload at `path`, encrypted with a Fernet key.
+    Any failure to read, decrypt or write the cache is treated as a miss.
+    """
+
+    def __init__(self, path: str, key: str, ttl: float = 300):
+        self.path = path
+        self.key = key
+        self.ttl = ttl
+        self._fernet = None
+
+    @classmethod
+    def from_env(cls) -> Optional["EncryptedSecretsCache"]:
+        """The cache described by SECRETS_CACHE_* variables, or None if it is disabled"""
+        key = os.getenv("SECRETS_CACHE_KEY", "")
+        ttl = float(os.getenv("SECRETS_CACHE_TTL", "300"))
+        if not key or ttl <= 0:
+            return None
+        path = os.getenv("SECRETS_CACHE_PATH", "") or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "..", "..", ".cache", "aws_secrets.bin"
+        )
+        return cls(os.path.normpath(path), key, ttl)
+
+    @staticmethod
+    def generate_key() -> str:
+        """A new key for SECRETS_CACHE_KEY"""
+        from cryptography.fernet import Fernet
+        return Fernet.generate_key().decode("ascii")
+
+    @property
+    def fernet(self):
+        if self._fernet is None:
+            from cryptography.fernet import Fernet
+            self._fernet = Fernet(self.key.encode("ascii"))
+        return self._fernet
+
+    def load(self, secret_name: str) -> Optional[str]:
+        """The cached secret string for `secret_name`, or None if missing, stale or unreadable"""
+        try:
+            with open(self.path, "rb") as cache_file:
+                token = cache_file.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read secrets cache {self.path}: {e}")
+            return None
+
+        try:
+            from cryptography.fernet import InvalidToken
+            entry = json.loads(self.fernet.decrypt(token, ttl=int(self.ttl)))
+        except InvalidToken:
+            # Expired, written with another key, or tampered with
+            logger.info("Secrets cache is stale or was written with another key")
+            return None
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable secrets cache: {e}")
+            return None
+
+        if entry.get("secret_name") != secret_name:
+            return None
+        return entry.get("secret_string")
+
+    def store(self, secret_name: str, secret_string: str) -> None:
+        """Encrypt and write the secret, replacing the file atomically with owner-only permissions"""
+        payload = json.dumps({"secret_name": secret_name, "secret_string": secret_string}).encode("utf-8")
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", mode=0o700, exist_ok=True)
+            token = self.fernet.encrypt(payload)
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as cache_file:
+                cache_file.write(token)
+            os.replace(tmp_path, self.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not write secrets cache {self.path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        """Delete the cache file"""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
@@ -1,31 +1,96 @@
 """
 Service factory for choosing between real and mock services based on configuration.
+Providers are resolved once (at startup or on first use) into a small container,
+so request handlers get them without re-reading configuration.
 """
 import logging
+import threading
+from typing import Any, Optional
 from app.core.config_service import config_service
 
 logger = logging.getLogger(__name__)
 
 
+class ServiceContainer:
+    """
+    Container for the authentication service providers.
+    Tests can swap providers with override() and restore them with reset().
+    """
+
+    def __init__(self):
+        self._cognito_service: Optional[Any] = None
+        self._jwt_validator: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    def resolve(self) -> None:
+        """Resolve any provider that hasn't been resolved or overridden yet"""
+        with self._lock:
+            if self._cognito_service is not None and self._jwt_validator is not None:
+                return
+
+            provider = config_service.get_auth_provider()
+            if provider == "mock":
+                logger.info("Using Mock Cognito Service and Mock JWT Validator")
+                from app.services.mock_cognito_service import mock_cognito_service as cognito_service
+                from app.core.mock_jwt_utils import mock_jwt_validator as jwt_validator
+            elif provider == "local":
+                logger.info("Using Local Identity Provider and Real JWT Validator")
+                from app.services.local_identity_service import get_local_identity_service
+                from app.core.jwt_utils import jwt_validator
+                cognito_service = get_local_identity_service()
+                jwt_validator.register_issuer(cognito_service.token_issuer())
+            else:
+                logger.info("Using Real Cognito Service and Real JWT Validator")
+                from app.services.cognito_service import cognito_service
+                from app.core.jwt_utils import jwt_validator
+
+            if self._cognito_service is None:
+                self._cognito_service = cognito_service
+            if self._jwt_validator is None:
+                self._jwt_validator = jwt_validator
+
+    @property
+    def cognito_service(self) -> Any:
+        """The configured Cognito service"""
+        service = self._cognito_service
+        if service is None:
+            self.resolve()
+            service = self._cognito_service
+        return service
+
+    @property
+    def jwt_validator(self) -> Any:
+        """The configured JWT validator"""
+        validator = self._jwt_validator
+        if validator is None:
+            self.resolve()
+            validator = self._jwt_validator
+        return validator
+
+    def override(self, cognito_service: Optional[Any] = None, jwt_validator: Optional[Any] = None) -> None:
+        """Replace providers (for tests)"""
+        with self._lock:
+            if cognito_service is not None:
+                self._cognito_service = cognito_service
+            if jwt_validator is not None:
+                self._jwt_validator = jwt_validator
+
+    def reset(self) -> None:
+        """Forget all providers; they are resolved from configuration again on next use"""
+        with self._lock:
+            self._cognito_service = None
+            self._jwt_validator = None
+
+
+# Global instance
+service_container = ServiceContainer()
+
+
 def get_cognito_service():
     """Factory function to get appropriate Cognito service"""
-    if config_service.use_mock_cognito():
-        logger.info("Using Mock Cognito Service for testing")
-        from app.services.mock_cognito_service import mock_cognito_service
-        return mock_cognito_service
-    else:
-        logger.info("Using Real Cognito Service")
-        from app.services.cognito_service import cognito_service
-        return cognito_service
+    return service_container.cognito_service
 
 
 def get_jwt_validator():
     """Factory function to get appropriate JWT validator"""
-    if config_service.use_mock_cognito():
-        logger.info("Using Mock JWT Validator for testing")
-        from app.core.mock_jwt_utils import mock_jwt_validator
-        return mock_jwt_validator
-    else:
-        logger.info("Using Real JWT Validator")
-        from app.core.jwt_utils import jwt_validator
-        return jwt_validator
+    return service_container.jwt_validator
@@ -2,5 +2,7 @@
 
 from .base import BaseDAO
 from .user import UserCRUD, UserDAO
+from .revoked_token import RevokedTokenDAO
+from .rate_limit_bucket import RateLimitBucketDAO
 
-__all__ = ["BaseDAO", "UserCRUD", "UserDAO"]
\ No newline at end of file
+__all__ = ["BaseDAO", "UserCRUD", "UserDAO", "RevokedTokenDAO", "RateLimitBucketDAO"]
\ No newline at end of file
@@ -0,0 +1,79 @@
+from typing import Tuple
+from sqlalchemy import case, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.models.rate_limit_bucket import RateLimitBucket
+
+
+class RateLimitBucketDAO:
+    """
+    Data Access Object for shared token buckets.
+    Each take() refills and debits a bucket in one atomic upsert, so concurrent
+    workers never read-modify-write the same row.
+    """
+
+    # Dialects with INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+    SUPPORTED_DIALECTS = ("postgresql", "sqlite")
+
+    @classmethod
+    def supports(cls, dialect: str) -> bool:
+        """Whether take() can run on a database dialect"""
+        return dialect in cls.SUPPORTED_DIALECTS
+
+    def take(
+        self,
+        db: Session,
+        key: str,
+        capacity: float,
+        refill_rate: float,
+        cost: float,
+        now: float
+    ) -> Tuple[bool, float]:
+        """
+        Take `cost` tokens from a bucket, creating it full if needed.
+        Returns (allowed, tokens left).
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            insert = postgresql.insert
+        elif dialect == "sqlite":
+            insert = sqlite.insert
+        else:
+            raise NotImplementedError(f"Shared rate limiting is not supported on {dialect}")
+
+        # Both engines evaluate the SET expressions against the row as it was before the update
+        refilled_raw = RateLimitBucket.tokens + (literal(now) - RateLimitBucket.updated_at) * refill_rate
+        refilled = case((refilled_raw > capacity, literal(capacity)), else_=refilled_raw)
+        stmt = insert(RateLimitBucket).values(
+            key=key,
+            tokens=capacity - cost,
+            updated_at=now,
+            allowed=cost <= capacity
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RateLimitBucket.key],
+            set_={
+                "tokens": case((refilled >= cost, refilled - cost), else_=refilled),
+                "updated_at": now,
+                "allowed": refilled >= cost,
+            }
+        ).returning(RateLimitBucket.allowed, RateLimitBucket.tokens)
+
+        row = db.execute(stmt).one()
+        db.commit()
+        return bool(row.allowed), float(row.tokens)
+
+    def purge(self, db: Session, before: float) -> int:
+        """Delete buckets last used before `before`. Returns the number deleted."""
+        deleted = (
+            db.query(RateLimitBucket)
+            .filter(RateLimitBucket.updated_at < before)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+        return deleted
+
+    def reset(self, db: Session) -> None:
+        """Delete all buckets."""
+        db.query(RateLimitBucket).delete(synchronize_session=False)
+        db.commit()
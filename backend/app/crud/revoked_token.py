@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.models.revoked_token import RevokedToken
+
+
+class RevokedTokenDAO:
+    """
+    Data Access Object for the token revocation list.
+    Tokens are only ever referenced by their SHA-256 hash.
+    """
+
+    def add(self, db: Session, token_hash: str, expires_at: datetime, revoked_at: datetime) -> bool:
+        """Record a revoked token. Returns False if it was already revoked."""
+        db.add(RevokedToken(token_hash=token_hash, expires_at=expires_at, revoked_at=revoked_at))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return False
+        return True
+
+    def is_revoked(self, db: Session, token_hash: str, now: datetime) -> bool:
+        """Check whether an unexpired revocation exists for the token hash."""
+        return db.query(
+            db.query(RevokedToken.id)
+            .filter(RevokedToken.token_hash == token_hash, RevokedToken.expires_at > now)
+            .exists()
+        ).scalar()
+
+    def get_revoked_since(
+        self,
+        db: Session,
+        now: datetime,
+        since: Optional[datetime] = None
+    ) -> List[Tuple[str, datetime]]:
+        """Get (token_hash, revoked_at) for unexpired revocations recorded at or after `since`."""
+        query = db.query(RevokedToken.token_hash, RevokedToken.revoked_at).filter(RevokedToken.expires_at > now)
+        if since is not None:
+            query = query.filter(RevokedToken.revoked_at >= since)
+        return [(row.token_hash, row.revoked_at) for row in query.all()]
+
+    def delete_expired(self, db: Session, now: datetime) -> int:
+        """Delete revocations whose tokens have expired anyway."""
+        deleted = db.query(RevokedToken).filter(RevokedToken.expires_at <= now).delete(synchronize_session=False)
+        db.commit()
+        return deleted
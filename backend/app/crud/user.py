@@ -1,7 +1,11 @@
 from typing import List, Optional
+from sqlalchemy import case, cast, exists, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.core.exceptions import UserAlreadyExistsError
 from app.models.user import User, UserRole
-from app.schemas.user import UserResponse, UserCreate, UserUpdate
+from app.schemas.user import UserResponse, UserCreate, UserUpdate, UserInDB
 from app.crud.base import BaseDAO
 
 
@@ -39,6 +43,44 @@ class UserDAO(BaseDAO[User, UserResponse, UserCreate, UserUpdate]):
         user = db.query(User).filter(User.cognito_sub == cognito_sub).first()
         return self._to_schema(user) if user else None
 
+    def get_by_principal(
+        self,
+        db: Session,
+        cognito_sub: Optional[str] = None,
+        username: Optional[str] = None
+    ) -> Optional[UserResponse]:
+        """
+        Resolve a token principal in a single query.
+        Matches on Cognito sub or username, preferring the Cognito sub match.
+        """
+        conditions = []
+        if cognito_sub:
+            conditions.append(User.cognito_sub == cognito_sub)
+        if username:
+            conditions.append(User.username == username)
+        if not conditions:
+            return None
+
+        query = db.query(User).filter(or_(*conditions))
+        if cognito_sub:
+            # CASE rather than ORDER BY (cognito_sub = :sub) so NULL subs sort last on every backend
+            query = query.order_by(case((User.cognito_sub == cognito_sub, 0), else_=1))
+        user = query.limit(1).first()
+        return self._to_schema(user) if user else None
+
+    def backfill_cognito_sub(self, db: Session, user_id: int, cognito_sub: str) -> bool:
+        """
+        Set the Cognito sub on a user that doesn't have one yet.
+        Returns True if the row was updated.
+        """
+        updated = (
+            db.query(User)
+            .filter(User.id == user_id, User.cognito_sub.is_(None))
+            .update({User.cognito_sub: cognito_sub}, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+
     def create(self, db: Session, *, obj_in: UserCreate) -> UserResponse:
         """Create a new user."""
         # Check if this is the first user (make them admin)
@@ -57,6 +99,132 @@ class UserDAO(BaseDAO[User, UserResponse, UserCreate, UserUpdate]):
         db.refresh(user)
         return self._to_schema(user)
 
+    def get_in_db_by_email(self, db: Session, email: str) -> Optional[UserInDB]:
+        """Get a user by email, including stored credentials."""
+        user = db.query(User).filter(User.email == email).first()
+        return UserInDB.model_validate(user) if user else None
+
+    def set_password_hash(self, db: Session, user_id: int, password_hash: Optional[str]) -> bool:
+        """Store a password hash for a user. Returns True if the user exists."""
+        updated = (
+            db.query(User)
+            .filter(User.id == user_id)
+            .update({User.password_hash: password_hash}, synchronize_session=False)
+        )
+        db.commit()
+        return updated > 0
+
+    def upsert_from_identity(
+        self,
+        db: Session,
+        *,
+        email: str,
+        cognito_sub: str,
+        username: Optional[str] = None,
+        full_name: Optional[str] = None
+    ) -> UserResponse:
+        """
+        Create or link the user for an authenticated identity in a single statement:
+        INSERT ... ON CONFLICT (email) DO UPDATE SET cognito_sub = ... RETURNING *.
+        As with create(), the first user in the system becomes an admin.
+
+        Raises:
+            UserAlreadyExistsError: If the username belongs to a user with another email
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            insert = postgresql.insert
+        elif dialect == "sqlite":
+            insert = sqlite.insert
+        else:
+            return self._upsert_from_identity_fallback(
+                db, email=email, cognito_sub=cognito_sub, username=username, full_name=full_name
+            )
+
+        role_type = User.__table__.c.role.type
+        role = case(
+            (exists(select(User.id)), cast(UserRole.USER, role_type)),
+            else_=cast(UserRole.ADMIN, role_type)
+        )
+        stmt = insert(User).values(
+            username=username or email,
+            email=email,
+            full_name=full_name,
+            role=role,
+            cognito_sub=cognito_sub
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[User.email],
+            set_={"cognito_sub": stmt.excluded.cognito_sub}
+        ).returning(User)
+
+        try:
+            # populate_existing so an already-loaded instance picks up the updated sub
+            user = db.execute(stmt, execution_options={"populate_existing": True}).scalar_one()
+            db.commit()
+        except IntegrityError:
+            # ON CONFLICT only covers email; the sub or the username is taken by another row
+            db.rollback()
+            existing = self._resolve_identity_conflict(db, email=email, cognito_sub=cognito_sub, username=username)
+            if existing is None:
+                raise
+            return existing
+        return self._to_schema(user)
+
+    def _resolve_identity_conflict(
+        self,
+        db: Session,
+        *,
+        email: str,
+        cognito_sub: str,
+        username: Optional[str] = None
+    ) -> Optional[UserResponse]:
+        """
+        Resolve an identity upsert that hit a unique column other than email.
+        A sub already linked to another row (e.g. email changed upstream) returns that user;
+        a username taken by another user raises UserAlreadyExistsError. Returns None if
+        neither explains the conflict.
+        """
+        existing = self.get_by_cognito_sub(db, cognito_sub)
+        if existing is not None:
+            return existing
+
+        username = username or email
+        owner = db.query(User.email).filter(User.username == username).first()
+        if owner is not None and owner.email != email:
+            raise UserAlreadyExistsError(f"Username {username} is already taken", field="username")
+        return None
+
+    def _upsert_from_identity_fallback(
+        self,
+        db: Session,
+        *,
+        email: str,
+        cognito_sub: str,
+        username: Optional[str] = None,
+        full_name: Optional[str] = None
+    ) -> UserResponse:
+        """Multi-statement upsert for databases without ON CONFLICT support."""
+        user = self.get_by_cognito_sub(db, cognito_sub)
+        if user:
+            return user
+        db_user = db.query(User).filter(User.email == email).first()
+        if db_user:
+            return self.update(db, db_obj=db_user, obj_in=UserUpdate(cognito_sub=cognito_sub))
+        try:
+            return self.create(db, obj_in=UserCreate(
+                username=username or email,
+                email=email,
+                full_name=full_name,
+                cognito_sub=cognito_sub
+            ))
+        except IntegrityError:
+            db.rollback()
+            existing = self._resolve_identity_conflict(db, email=email, cognito_sub=cognito_sub, username=username)
+            if existing is None:
+                raise
+            return existing
+
     def update(self, db: Session, *, db_obj: User, obj_in: UserUpdate) -> UserResponse:
         """Update an existing user."""
         update_data = obj_in.model_dump(exclude_unset=True)
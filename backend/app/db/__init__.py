@@ -1,3 +1,4 @@
+from typing import Any, Dict
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -7,7 +8,46 @@ from app.core.config_service import config_service
 
 DATABASE_URL = config_service.get_database_url()
 
-engine = create_engine(DATABASE_URL)
+
+def engine_options(database_url: str) -> Dict[str, Any]:
+    """Connection pool settings from configuration (SQLite keeps SQLAlchemy's defaults)"""
+    if database_url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": config_service.get("db_pool_size", 5),
+        "max_overflow": config_service.get("db_max_overflow", 10),
+        "pool_timeout": config_service.get("db_pool_timeout", 30),
+        "pool_recycle": config_service.get("db_pool_recycle", -1),
+        "pool_pre_ping": config_service.get("db_pool_pre_ping", False),
+    }
+
+
+_engine_options = engine_options(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **_engine_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+
+def _on_config_change(old, new, changed) -> None:
+    """
+    Rebuild the engine when the database URL (e.g. a rotated password) or pool settings
+    change. New sessions use the new engine; sessions already open finish on the old
+    pool, whose connections are closed as they are returned.
+    """
+    global DATABASE_URL, _engine_options, engine
+    database_url = config_service.get_database_url()
+    options = engine_options(database_url)
+    if database_url == DATABASE_URL and options == _engine_options:
+        return
+
+    previous = engine
+    engine = create_engine(database_url, **options)
+    DATABASE_URL, _engine_options = database_url, options
+    SessionLocal.configure(bind=engine)
+    previous.dispose()
+
+
+config_service.subscribe(_on_config_change, keys=(
+    "database_url", "db_pool_size", "db_max_overflow", "db_pool_timeout", "db_pool_recycle", "db_pool_pre_ping",
+))
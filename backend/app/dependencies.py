@@ -4,6 +4,9 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from app.core.service_factory import get_jwt_validator
+from app.core.principal_cache import principal_cache
+from app.core.request_context import set_user_sub
+from app.services.token_revocation_service import token_revocation_service
 from app.models.user import UserRole
 from app.crud.user import UserDAO
 from app.services.user_service import UserService
@@ -25,22 +28,30 @@ def get_db() -> Generator:
         db.close()
 
 
+# DAO and service are stateless, so a single instance is shared across requests
+_user_dao = UserDAO()
+_user_service = UserService(_user_dao)
+
+
 def get_user_dao() -> UserDAO:
     """
     Dependency for UserDAO instance.
     """
-    return UserDAO()
+    return _user_dao
 
 
 def get_user_service(user_dao: UserDAO = Depends(get_user_dao)) -> UserService:
     """
     Dependency for UserService instance.
     """
+    if user_dao is _user_dao:
+        return _user_service
     return UserService(user_dao)
 
 
 async def get_current_user_token(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
 ) -> TokenData:
     """
     Dependency to get current user token data from JWT.
@@ -59,6 +70,11 @@ async def get_current_user_token(
         if token_data.username is None and token_data.user_sub is None:
             raise credentials_exception
 
+        if token_revocation_service.is_revoked(db, token):
+            raise credentials_exception
+
+        # Later log records of this request carry the user
+        set_user_sub(token_data.user_sub)
         return token_data
     except Exception:
         raise credentials_exception
@@ -72,15 +88,31 @@ async def get_current_user(
     """
     Dependency to get current user from database.
     Returns UserResponse (Pydantic model) instead of SQLAlchemy model.
+    Resolved users are served from the principal cache when possible.
     """
+    cache_keys = []
+    if token_data.user_sub:
+        cache_keys.append(principal_cache.sub_key(token_data.user_sub))
+    if token_data.username:
+        cache_keys.append(principal_cache.username_key(token_data.username))
+
     user = None
+    for key in cache_keys:
+        user = principal_cache.get(key)
+        if user is not None:
+            break
 
-    # Try to find user by cognito_sub first, then by username
-    if token_data.user_sub:
-        user = user_service.get_user_by_cognito_sub(db, cognito_sub=token_data.user_sub)
+    if user is None:
+        # Single query matching cognito_sub or username, cognito_sub taking precedence
+        user = user_service.get_user_by_principal(
+            db, cognito_sub=token_data.user_sub, username=token_data.username
+        )
 
-    if not user and token_data.username:
-        user = user_service.get_user_by_username(db, username=token_data.username)
+        if user is not None:
+            # Rows matched by username only get their sub recorded for the fast path
+            if token_data.user_sub and user.cognito_sub is None:
+                user = user_service.backfill_cognito_sub(db, user, token_data.user_sub)
+            principal_cache.set(cache_keys, user)
 
     if user is None:
         raise HTTPException(
@@ -4,9 +4,12 @@ from contextlib import asynccontextmanager
 
 from app.routers import router as api_router
 from app.core.config_service import settings
+from app.core.config_reload import config_reloader
 from app.db.init_db import init_db
 from app.core.logging_service import get_logger
+from app.core.service_factory import service_container
 from app.middlewaremiddleware.logging_middleware import RequestLoggingMiddleware
+from app.utils.startup_profiler import startup_timer
 
 # Configure logging
 logger = get_logger(__name__)
@@ -15,17 +18,35 @@ logger = get_logger(__name__)
 async def lifespan(_: FastAPI):
     # Startup logic
     logger.info("Starting application database setup")
-    success = init_db()
+    with startup_timer.phase("init_db"):
+        success = init_db()
     if success:
         logger.info("Database setup completed successfully", service="database", status="initialized")
     else:
         logger.error("Database setup failed", service="database", status="failed")
         raise RuntimeError("Failed to initialize database")
 
+    # Resolve service providers once so requests never touch configuration
+    with startup_timer.phase("resolve_services"):
+        service_container.resolve()
+    # Start background work owned by the identity provider (e.g. mock token sweeping)
+    startup = getattr(service_container.cognito_service, "startup", None)
+    if startup is not None:
+        with startup_timer.phase("provider_startup"):
+            startup()
+    # Pick up configuration and secret changes without restarting workers
+    with startup_timer.phase("config_reloader"):
+        config_reloader.start()
+
     yield
 
     # Shutdown logic
     logger.info("Application shutting down")
+    config_reloader.stop()
+    # Stop worker pools owned by the identity provider (e.g. local IdP password hashing)
+    shutdown = getattr(service_container.cognito_service, "shutdown", None)
+    if shutdown is not None:
+        shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
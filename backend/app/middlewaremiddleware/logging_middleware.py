@@ -3,12 +3,14 @@ Middleware for logging HTTP requests and responses.
 """
 import time
 import uuid
-from typing import Callable
+from typing import Any, Callable, Dict, Optional
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 
+from app.core.log_sampling import LogSampler, log_sampler
 from app.core.logging_service import get_logger
+from app.core.request_context import close_request_context, open_request_context
 
 # Get logger for this module
 logger = get_logger(__name__)
@@ -18,68 +20,115 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
     """
     Middleware for logging HTTP requests and responses.
     Logs request details, response status, and timing information.
+    Records are sampled and repeated failures rate limited by the LogSampler. A started
+    record that a sampling rule could drop is held until the request completes, so it is
+    kept or dropped with the request's status and latency known.
+    Opens the request context, so every record logged while the request is handled
+    carries its request_id and route (and user_sub once authenticated).
     """
 
-    def __init__(self, app: ASGIApp):
+    def __init__(self, app: ASGIApp, sampler: Optional[LogSampler] = None):
         super().__init__(app)
+        self.sampler = sampler or log_sampler
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         # Generate a unique request ID
         request_id = str(uuid.uuid4())
-        
-        # Create a logger with request ID context
-        req_logger = logger.bind(request_id=request_id)
-        
+
         # Extract request details
         client_host = request.client.host if request.client else "unknown"
         request_path = request.url.path
         request_method = request.method
-        
-        # Log the request
-        req_logger.info(
-            f"Request started: {request_method} {request_path}",
-            event="request_started",
-            client_ip=client_host,
-            method=request_method,
-            path=request_path,
-            query_params=str(request.query_params),
-        )
-        
-        # Record start time
-        start_time = time.time()
-        
+
+        context_token = open_request_context(request_id, request_path)
         try:
-            # Process the request
-            response = await call_next(request)
-            
+            # Fields of the started record while its sampling decision waits for the outcome
+            # (building them is skipped when INFO is disabled)
+            started = None
+            if logger.is_enabled("INFO"):
+                started = {
+                    "client_ip": client_host,
+                    "method": request_method,
+                    "path": request_path,
+                    "query_params": str(request.query_params),
+                }
+                if not self.sampler.may_drop("request_started", request_path):
+                    self._log_started(started, 1.0)
+                    started = None
+
+            # Record start time
+            start_time = time.time()
+
+            try:
+                # Process the request
+                response = await call_next(request)
+            except Exception as e:
+                # Calculate processing time
+                process_time = time.time() - start_time
+
+                # Log the error, unless the same failure was already logged too often this window
+                error = str(e)
+                keep, suppressed = self.sampler.allow_repeat(
+                    f"{request_method} {request_path}:{type(e).__name__}:{error}"
+                )
+                if keep:
+                    if started is not None:
+                        self._log_started(started, 1.0)
+                    logger.exception(
+                        "Request failed: {} {}",
+                        request_method,
+                        request_path,
+                        event="request_failed",
+                        method=request_method,
+                        path=request_path,
+                        error=error,
+                        process_time_ms=round(process_time * 1000, 2),
+                        suppressed_repeats=suppressed,
+                    )
+
+                # Re-raise the exception
+                raise
+
             # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Log the response
-            req_logger.info(
-                f"Request completed: {request_method} {request_path} - {response.status_code}",
-                event="request_completed",
-                method=request_method,
-                path=request_path,
-                status_code=response.status_code,
-                process_time_ms=round(process_time * 1000, 2),
-            )
-            
+            process_time_ms = round((time.time() - start_time) * 1000, 2)
+
+            # Log the response; errors and slow requests are always kept
+            if logger.is_enabled("INFO"):
+                if started is not None:
+                    keep, sample_rate = self.sampler.should_log(
+                        "request_started", request_path, request_id, response.status_code, process_time_ms
+                    )
+                    if keep:
+                        self._log_started(started, sample_rate)
+
+                keep, sample_rate = self.sampler.should_log(
+                    "request_completed", request_path, request_id, response.status_code, process_time_ms
+                )
+                if keep:
+                    logger.info(
+                        "Request completed: {} {} - {}",
+                        request_method,
+                        request_path,
+                        response.status_code,
+                        event="request_completed",
+                        method=request_method,
+                        path=request_path,
+                        status_code=response.status_code,
+                        process_time_ms=process_time_ms,
+                        sample_rate=sample_rate,
+                    )
+
             return response
-        except Exception as e:
-            # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Log the error
-            req_logger.error(
-                f"Request failed: {request_method} {request_path}",
-                event="request_failed",
-                method=request_method,
-                path=request_path,
-                error=str(e),
-                process_time_ms=round(process_time * 1000, 2),
-                exc_info=True,
-            )
-            
-            # Re-raise the exception
-            raise
+        finally:
+            close_request_context(context_token)
+
+    @staticmethod
+    def _log_started(fields: Dict[str, Any], sample_rate: float) -> None:
+        logger.info(
+            "Request started: {} {}",
+            fields["method"],
+            fields["path"],
+            event="request_started",
+            sample_rate=sample_rate,
+            **fields,
+        )
@@ -2,5 +2,7 @@
 
 from app.db import Base
 from .user import User
+from .revoked_token import RevokedToken
+from .rate_limit_bucket import RateLimitBucket
 
-__all__ = ["User", "Base"]  # Export your models for easier access
\ No newline at end of file
+__all__ = ["User", "RevokedToken", "RateLimitBucket", "Base"]  # Export your models for easier access
\ No newline at end of file
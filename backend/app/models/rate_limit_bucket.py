@@ -0,0 +1,14 @@
+from sqlalchemy import Boolean, Column, Float, String
+from app.db import Base
+
+
+class RateLimitBucket(Base):
+    """
+    SQLAlchemy model for a token bucket shared by all workers
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(64), primary_key=True)  # SHA-256 of rule name and subject
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False, index=True)  # Unix time of the last refill
+    allowed = Column(Boolean, nullable=False)  # Outcome of the last request against the bucket
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+from app.db import Base
+
+
+class RevokedToken(Base):
+    """
+    SQLAlchemy model for access tokens revoked before their expiry
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)  # SHA-256 of the token
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), index=True, nullable=False)
@@ -23,3 +23,4 @@ class User(Base):
     is_active = Column(Boolean, server_default=expression.true(), nullable=False)
     role = Column(Enum(UserRole), default=UserRole.USER, nullable=False)
     cognito_sub = Column(String, unique=True, index=True, nullable=True)  # Cognito user ID
+    password_hash = Column(String, nullable=True)  # Only set for the local identity provider
@@ -1,10 +1,12 @@
 # backend/app/routers/__init__.py
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from .user import user_router
 from .auth import auth_router
 from .dev import dev_router
 from app.core.config_service import config_service
+from app.core.metrics import metrics
+from app.dependencies import get_current_admin_user
 
 router = APIRouter()
 
@@ -14,27 +16,34 @@ async def health_check():
     """Health check endpoint for monitoring and testing"""
     import os
 
+    config = config_service.snapshot
+
     # Debug print to see what environment is loaded
     env_info = {
         "APP_ENV": os.getenv("APP_ENV"),
         "USE_MOCK_COGNITO": os.getenv("USE_MOCK_COGNITO"),
         "DATABASE_URL": os.getenv("DATABASE_URL"),
-        "config_service_env": config_service._env,
-        "config_service_testing": config_service.is_testing(),
-        "config_service_mock_cognito": config_service.use_mock_cognito(),
-        "database_url": config_service.get_database_url()
+        "config_service_env": config.env,
+        "config_service_testing": config.is_testing,
+        "config_service_mock_cognito": config.use_mock_cognito,
+        "database_url": config.database_url
     }
     print(f"[HEALTH DEBUG] Environment info: {env_info}")
 
     return {
         "status": "healthy",
         "service": "backend",
-        "environment": config_service._env,
-        "use_mock_cognito": config_service.use_mock_cognito(),
-        "is_testing": config_service.is_testing(),
-        "database_type": "sqlite" if config_service.get_database_url().startswith("sqlite") else "postgresql"
+        "environment": config.env,
+        "use_mock_cognito": config.use_mock_cognito,
+        "is_testing": config.is_testing,
+        "database_type": "sqlite" if config.database_url.startswith("sqlite") else "postgresql"
     }
 
+@router.get("/api/v1/metrics", dependencies=[Depends(get_current_admin_user)])
+async def get_metrics():
+    """In-process metrics (counters, gauges and timing summaries) for this worker, admins only"""
+    return metrics.snapshot()
+
 # Include route definitions
 router.include_router(auth_router, prefix="/api/v1/auth", tags=["authentication"])
 router.include_router(user_router, prefix="/api/v1", tags=["users"])
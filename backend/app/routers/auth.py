@@ -1,7 +1,10 @@
 """
 Authentication router for user registration, login, and token management.
 """
-from fastapi import APIRouter, HTTPException, Depends, status
+import hashlib
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.dependencies import get_db, get_current_active_user, get_user_service
 from app.schemas.auth import (
@@ -9,27 +12,88 @@ from app.schemas.auth import (
     SignInRequest, SignInResponse, RefreshTokenRequest, RefreshTokenResponse,
     UserInfo, MessageResponse
 )
-from app.schemas.user import UserResponse, UserUpdate
-from app.core.service_factory import get_cognito_service
+from app.schemas.user import UserResponse
+from app.core.config_service import config_service
+from app.core.service_factory import get_cognito_service, get_jwt_validator
 from app.services.user_service import UserService
+from app.services.rate_limit_service import rate_limit_service
+from app.services.token_revocation_service import token_revocation_service
 from app.core.logging_service import get_logger
+from app.utils.single_flight import SingleFlight
 from app.utils.username_utils import validate_and_normalize_email
-from app.core.exceptions import CognitoError, ValidationError
+from app.core.exceptions import (
+    CognitoError, RateLimitExceededError, ServiceUnavailableError, UserAlreadyExistsError, ValidationError
+)
 
 logger = get_logger(__name__)
 
 auth_router = APIRouter()
 
+# Sign out accepts a missing or expired token so clients can always clear their session
+optional_security = HTTPBearer(auto_error=False)
+
+
+
+def _service_unavailable(e: ServiceUnavailableError) -> HTTPException:
+    """503 telling the client when the auth provider is worth retrying"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=e.message,
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+
+def _client_ip(http_request: Request) -> Optional[str]:
+    """
+    Client address for rate limiting. Behind trusted proxies this is the X-Forwarded-For
+    entry added by the outermost one; entries left of it are client supplied and spoofable.
+    """
+    config = config_service.snapshot
+    if config.rate_limit_trust_forwarded_for:
+        forwarded_for = http_request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+            if hops:
+                return hops[max(len(hops) - config.rate_limit_trusted_proxies, 0)]
+    return http_request.client.host if http_request.client else None
+
+
+def _conflict(e: UserAlreadyExistsError) -> HTTPException:
+    """409 for a user that clashes with an existing one"""
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=e.message)
+
+
+def _enforce_rate_limit(db: Session, http_request: Request, scope: str, email: str) -> None:
+    """Admit the request or answer 429 with Retry-After"""
+    try:
+        rate_limit_service.check(db, scope, client_ip=_client_ip(http_request), email=email)
+    except RateLimitExceededError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+
+# Parallel refreshes with the same refresh token share one Cognito call
+refresh_flight = SingleFlight(
+    "refresh_token",
+    ttl_seconds=config_service.get("refresh_token_coalesce_ttl", 5.0)
+)
+
 
 @auth_router.post("/signup", response_model=SignUpResponse)
 async def sign_up(
     request: SignUpRequest,
+    http_request: Request,
     db: Session = Depends(get_db),
     user_service: UserService = Depends(get_user_service)
 ):
     """
     Register a new user with Cognito and create user record in database.
     """
+    _enforce_rate_limit(db, http_request, "signup", request.email)
+
     try:
         # Validate and normalize email
         try:
@@ -56,13 +120,13 @@ async def sign_up(
             full_name=request.full_name or ""
         )
 
-        # Create user record in database
-        user_service.create_user_from_params(
+        # Create user record in database (or link the one a local identity provider created)
+        user_service.upsert_user_from_identity(
             db=db,
-            username=normalized_email,  # Use email as username
             email=normalized_email,
-            full_name=request.full_name,
-            cognito_sub=cognito_response["user_sub"]
+            cognito_sub=cognito_response["user_sub"],
+            username=normalized_email,  # Use email as username
+            full_name=request.full_name
         )
 
         logger.info(f"User {normalized_email} signed up successfully")
@@ -81,6 +145,12 @@ async def sign_up(
 
     except HTTPException:
         raise
+    except UserAlreadyExistsError as e:
+        logger.warning(f"User conflict during sign up for {request.email}: {e}")
+        raise _conflict(e)
+    except ServiceUnavailableError as e:
+        logger.warning(f"Cognito unavailable during sign up for {request.email}: {e}")
+        raise _service_unavailable(e)
     except CognitoError as e:
         logger.error(f"Cognito error during sign up for {request.email}: {e}")
         raise HTTPException(
@@ -113,6 +183,9 @@ async def confirm_sign_up(request: ConfirmSignUpRequest):
             message="User confirmed successfully. You can now sign in."
         )
 
+    except ServiceUnavailableError as e:
+        logger.warning(f"Cognito unavailable during confirmation for {request.email}: {e}")
+        raise _service_unavailable(e)
     except CognitoError as e:
         logger.error(f"Cognito error during confirmation for {request.email}: {e}")
         raise HTTPException(
@@ -130,12 +203,15 @@ async def confirm_sign_up(request: ConfirmSignUpRequest):
 @auth_router.post("/signin", response_model=SignInResponse)
 async def sign_in(
     request: SignInRequest,
+    http_request: Request,
     db: Session = Depends(get_db),
     user_service: UserService = Depends(get_user_service)
 ):
     """
     Sign in user and return access tokens.
     """
+    _enforce_rate_limit(db, http_request, "signin", request.email)
+
     try:
         # Authenticate with Cognito
         cognito_service = get_cognito_service()
@@ -144,27 +220,17 @@ async def sign_in(
             password=request.password
         )
 
-        # Get user info from Cognito
-        user_info = await cognito_service.get_user_info(tokens["access_token"])
+        # Get user info from the ID token claims (no extra Cognito round trip)
+        user_info = await cognito_service.get_user_info_from_tokens(tokens)
 
-        # Get or update user in database
-        user = user_service.get_user_by_cognito_sub(db, user_info["user_sub"])
-        if not user:
-            # User might exist with email but no cognito_sub
-            user = user_service.get_user_by_email(db, request.email)
-            if user:
-                # Update user with cognito_sub
-                user_update = UserUpdate(cognito_sub=user_info["user_sub"])
-                user = user_service.update_user(db, user.id, user_update)
-            else:
-                # Create new user record
-                user = user_service.create_user_from_params(
-                    db=db,
-                    username=request.email,  # Use email as username
-                    email=user_info["email"],
-                    full_name=user_info["name"],
-                    cognito_sub=user_info["user_sub"]
-                )
+        # Create, link or fetch the user record in one statement
+        user = user_service.upsert_user_from_identity(
+            db=db,
+            email=user_info["email"],
+            cognito_sub=user_info["user_sub"],
+            username=request.email,  # Use email as username
+            full_name=user_info["name"]
+        )
 
         if not user:
             raise HTTPException(
@@ -189,6 +255,12 @@ async def sign_in(
             )
         )
 
+    except UserAlreadyExistsError as e:
+        logger.warning(f"User conflict during sign in for {request.email}: {e}")
+        raise _conflict(e)
+    except ServiceUnavailableError as e:
+        logger.warning(f"Cognito unavailable during sign in for {request.email}: {e}")
+        raise _service_unavailable(e)
     except CognitoError as e:
         logger.error(f"Cognito error during sign in for {request.email}: {e}")
         raise HTTPException(
@@ -210,9 +282,14 @@ async def refresh_token(request: RefreshTokenRequest):
     """
     try:
         cognito_service = get_cognito_service()
-        tokens = await cognito_service.refresh_token(
-            refresh_token=request.refresh_token,
-            email=request.email
+        # Key on a hash so raw refresh tokens are never held as dict keys
+        key = hashlib.sha256(f"{request.email}:{request.refresh_token}".encode("utf-8")).hexdigest()
+        tokens = await refresh_flight.run(
+            key,
+            lambda: cognito_service.refresh_token(
+                refresh_token=request.refresh_token,
+                email=request.email
+            )
         )
 
         logger.info(f"Token refreshed successfully for {request.email}")
@@ -223,6 +300,9 @@ async def refresh_token(request: RefreshTokenRequest):
             expires_in=tokens["expires_in"]
         )
 
+    except ServiceUnavailableError as e:
+        logger.warning(f"Cognito unavailable during token refresh for {request.email}: {e}")
+        raise _service_unavailable(e)
     except Exception as e:
         logger.error(f"Token refresh failed for {request.email}: {e}")
         raise HTTPException(
@@ -231,6 +311,17 @@ async def refresh_token(request: RefreshTokenRequest):
         )
 
 
+@auth_router.get("/.well-known/jwks.json")
+async def get_jwks():
+    """
+    Public signing keys of the local identity provider (only when it is in use).
+    """
+    jwks = getattr(get_cognito_service(), "jwks", None)
+    if jwks is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return jwks
+
+
 @auth_router.get("/me", response_model=UserInfo)
 async def get_current_user_info(current_user: UserResponse = Depends(get_current_active_user)):
     """
@@ -247,10 +338,23 @@ async def get_current_user_info(current_user: UserResponse = Depends(get_current
 
 
 @auth_router.post("/signout", response_model=MessageResponse)
-async def sign_out():
+async def sign_out(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: Session = Depends(get_db)
+):
     """
-    Sign out user (client should discard tokens).
+    Sign out user by revoking the presented access token (client should also discard tokens).
     """
+    if credentials is not None:
+        token = credentials.credentials
+        try:
+            # Only revoke tokens we issued, so the endpoint can't be used to fill the revocation list
+            get_jwt_validator().validate_token(token)
+        except Exception:
+            logger.info("Sign out with an invalid or expired token; nothing to revoke")
+        else:
+            token_revocation_service.revoke(db, token)
+
     return MessageResponse(
         message="Signed out successfully. Please discard your tokens."
     )
@@ -8,7 +8,6 @@ from pydantic import BaseModel
 from typing import Optional
 from app.dependencies import get_db, get_user_service
 from app.core.config_service import config_service
-from app.core.jwt_utils import create_access_token
 from app.services.user_service import UserService
 
 from app.models.user import UserRole
@@ -75,7 +74,9 @@ if dev_router is not None:
                 "user_sub": request.user_sub
             }
 
-            # Create the token
+            # Create the token (imported here so the JWT stack only loads if this is used)
+            from app.core.jwt_utils import create_access_token
+
             access_token = create_access_token(
                 data=token_data,
                 expires_delta=request.expires_in
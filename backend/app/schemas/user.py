@@ -38,4 +38,4 @@ class UserResponse(UserBase):
 
 class UserInDB(UserResponse):
     """Schema for user data as stored in database."""
-    pass
\ No newline at end of file
+    password_hash: Optional[str] = None
\ No newline at end of file
@@ -1,20 +1,38 @@
 """
 Cognito service for handling authentication operations.
 Supports both LocalStack (development) and AWS Cognito (production).
+Blocking boto3 calls run on a dedicated, bounded thread pool (the bulkhead) so they never
+stall the event loop, behind a circuit breaker that fails fast while Cognito is unhealthy.
 """
-import boto3
+import asyncio
+import functools
 import hmac
 import hashlib
 import base64
-from typing import Dict, Optional, Any
-from botocore.exceptions import ClientError
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from botocore.exceptions import BotoCoreError, ClientError
+from app.core.aws_clients import get_aws_client
 from app.core.config_service import config_service
+from app.core.jwt_utils import jwt_validator
 from app.core.logging_service import get_logger
-from app.core.exceptions import CognitoError, get_user_friendly_error_message
+from app.core.metrics import metrics
+from app.core.exceptions import CognitoError, ServiceUnavailableError, get_user_friendly_error_message
+from app.utils.circuit_breaker import CircuitBreaker
 
 
 logger = get_logger(__name__)
 
+# Error codes that mean Cognito itself is struggling, as opposed to a bad request
+BREAKER_ERROR_CODES = {
+    "TooManyRequestsException",
+    "LimitExceededException",
+    "InternalErrorException",
+    "ServiceUnavailable",
+    "ThrottlingException",
+}
+
 
 class CognitoService:
     """Service for handling Cognito authentication operations"""
@@ -23,34 +41,136 @@ class CognitoService:
         self.config = config_service.get_cognito_config()
         self.aws_config = config_service.get_aws_credentials()
         self.is_localstack = config_service.is_localstack_enabled()
-        
-        # Initialize Cognito client
-        self._init_client()
+
+        # Bounded executor for blocking AWS calls
+        self.max_concurrency = config_service.get("cognito_max_concurrency", 10)
+        self.max_queue_depth = config_service.get("cognito_max_queue_depth", 100)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="cognito"
+        )
+        self._pending = 0
+        self.breaker = CircuitBreaker(
+            "cognito",
+            failure_threshold=config_service.get("cognito_breaker_failure_threshold", 5),
+            recovery_timeout=config_service.get("cognito_breaker_recovery_timeout", 30.0)
+        )
+
+        # The boto3 client is created on first use (or at startup), not at import
+        self._client = None
+
+    @property
+    def client(self):
+        """The Cognito client, created on first use"""
+        if self._client is None:
+            self._init_client()
+        return self._client
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
+
+    def startup(self) -> None:
+        """Create the client at application startup so the first request doesn't pay for it"""
+        self.client
+
+    def on_config_change(self, old, new, changed) -> None:
+        """Create a new client after a reload changed the endpoint, region or credentials"""
+        client_settings = (dict(new.cognito_config), config_service.get_aws_credentials(), new.localstack_enabled)
+        if client_settings == (self.config, self.aws_config, self.is_localstack):
+            return
+        self.config, self.aws_config, self.is_localstack = client_settings
+        # Calls in flight keep the client they started with
+        if self._client is not None:
+            self._init_client()
 
     def _init_client(self):
         """Initialize the Cognito client"""
         try:
-            session = boto3.Session(
+            # Use LocalStack endpoint if enabled
+            use_localstack = bool(self.is_localstack and self.config["endpoint_url"])
+            self.client = get_aws_client(
+                "cognito-idp",
+                region_name=self.config["region"],
+                endpoint_url=self.config["endpoint_url"] if use_localstack else None,
                 aws_access_key_id=self.aws_config["access_key_id"] or None,
-                aws_secret_access_key=self.aws_config["secret_access_key"] or None,
-                region_name=self.config["region"]
+                aws_secret_access_key=self.aws_config["secret_access_key"] or None
             )
-            
-            # Use LocalStack endpoint if enabled
-            if self.is_localstack and self.config["endpoint_url"]:
-                self.client = session.client(
-                    "cognito-idp",
-                    endpoint_url=self.config["endpoint_url"]
-                )
+            if use_localstack:
                 logger.info("Initialized Cognito client with LocalStack endpoint")
             else:
-                self.client = session.client("cognito-idp")
                 logger.info("Initialized Cognito client with AWS endpoint")
-                
+
         except Exception as e:
             logger.error(f"Failed to initialize Cognito client: {e}")
             raise
 
+    async def _call(self, operation: str, **params) -> Dict[str, Any]:
+        """
+        Run a Cognito client operation on the executor.
+        Calls beyond max_concurrency queue up to max_queue_depth; past that, or while the
+        circuit is open, they are refused with ServiceUnavailableError.
+        """
+        return await self._run(operation, functools.partial(getattr(self.client, operation), **params))
+
+    async def _run(self, operation: str, call: Callable[[], Any]) -> Any:
+        """
+        Run any blocking Cognito work (a client call, or token verification that may fetch
+        the JWKS) on the executor, behind the same bulkhead and circuit breaker as _call.
+        """
+        if self._pending >= self.max_concurrency + self.max_queue_depth:
+            metrics.increment("cognito_calls_rejected_total", operation=operation, reason="bulkhead")
+            logger.warning(f"Cognito call queue full, rejecting {operation}")
+            raise ServiceUnavailableError(
+                get_user_friendly_error_message("TooManyRequestsException"),
+                retry_after=1,
+                error_code="TooManyRequestsException"
+            )
+
+        if not self.breaker.allow_call():
+            metrics.increment("cognito_calls_rejected_total", operation=operation, reason="circuit_open")
+            raise ServiceUnavailableError(
+                get_user_friendly_error_message("ServiceUnavailable"),
+                retry_after=self.breaker.retry_after(),
+                error_code="ServiceUnavailable"
+            )
+
+        self._pending += 1
+        self._record_pending()
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self._executor, call)
+        except ClientError as e:
+            metrics.increment("cognito_call_errors_total", operation=operation)
+            if e.response.get("Error", {}).get("Code") in BREAKER_ERROR_CODES:
+                self.breaker.record_failure()
+            else:
+                # Cognito answered; the request itself was rejected
+                self.breaker.record_success()
+            raise
+        except (BotoCoreError, OSError):
+            # Connection failures and timeouts
+            metrics.increment("cognito_call_errors_total", operation=operation)
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            metrics.increment("cognito_call_errors_total", operation=operation)
+            raise
+        else:
+            self.breaker.record_success()
+            return response
+        finally:
+            self._pending -= 1
+            self._record_pending()
+            metrics.increment("cognito_calls_total", operation=operation)
+            metrics.observe("cognito_call_seconds", time.perf_counter() - started, operation=operation)
+
+    def _record_pending(self) -> None:
+        """Publish in-flight and queued call counts"""
+        metrics.set_gauge("cognito_calls_in_flight", min(self._pending, self.max_concurrency))
+        metrics.set_gauge("cognito_queue_depth", max(0, self._pending - self.max_concurrency))
+
     def _calculate_secret_hash(self, username: str) -> str:
         """Calculate the secret hash for Cognito client"""
         if not self.config["client_secret"]:
@@ -88,7 +208,7 @@ class CognitoService:
             if self.config["client_secret"]:
                 params["SecretHash"] = self._calculate_secret_hash(cognito_username)
 
-            response = self.client.sign_up(**params)
+            response = await self._call("sign_up", **params)
 
             # In development mode, auto-confirm the user
             user_confirmed = response.get("UserConfirmed", False)
@@ -119,7 +239,8 @@ class CognitoService:
     async def _admin_confirm_sign_up(self, email: str) -> None:
         """Admin confirm sign up for development mode"""
         try:
-            self.client.admin_confirm_sign_up(
+            await self._call(
+                "admin_confirm_sign_up",
                 UserPoolId=self.config["user_pool_id"],
                 Username=email
             )
@@ -146,7 +267,7 @@ class CognitoService:
             if self.config["client_secret"]:
                 params["SecretHash"] = self._calculate_secret_hash(cognito_username)
 
-            self.client.confirm_sign_up(**params)
+            await self._call("confirm_sign_up", **params)
             logger.info(f"User {email} confirmed successfully")
             return True
 
@@ -175,7 +296,7 @@ class CognitoService:
             if self.config["client_secret"]:
                 params["AuthParameters"]["SECRET_HASH"] = self._calculate_secret_hash(cognito_username)
 
-            response = self.client.initiate_auth(**params)
+            response = await self._call("initiate_auth", **params)
 
             auth_result = response["AuthenticationResult"]
             logger.info(f"User {email} signed in successfully")
@@ -199,7 +320,7 @@ class CognitoService:
     async def get_user_info(self, access_token: str) -> Dict[str, Any]:
         """Get user information from access token"""
         try:
-            response = self.client.get_user(AccessToken=access_token)
+            response = await self._call("get_user", AccessToken=access_token)
             
             user_attributes = {}
             for attr in response["UserAttributes"]:
@@ -220,6 +341,38 @@ class CognitoService:
             user_friendly_message = get_user_friendly_error_message(error_code, error_message)
             raise CognitoError(user_friendly_message, error_code=error_code)
 
+    async def get_user_info_from_tokens(self, tokens: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get user information for freshly issued tokens.
+        Reads the verified ID token claims (using the validator's cached signing keys)
+        and only falls back to a GetUser call when they can't be used.
+        """
+        id_token = tokens.get("id_token")
+        if id_token:
+            try:
+                # Verification may need a one-off JWKS fetch, so keep it off the event loop
+                claims = await self._run(
+                    "verify_id_token", functools.partial(jwt_validator.verify_token_claims, id_token)
+                )
+                if claims.get("token_use") == "id" and claims.get("sub") and claims.get("email"):
+                    metrics.increment("cognito_user_info_total", source="id_token")
+                    return {
+                        "username": claims.get("cognito:username", claims["email"]),
+                        "user_sub": claims["sub"],
+                        "email": claims["email"],
+                        "name": claims.get("name", ""),
+                        "email_verified": claims.get("email_verified") in (True, "true")
+                    }
+                logger.warning("ID token is missing user claims, falling back to GetUser")
+            except ServiceUnavailableError:
+                # Refused by the bulkhead or breaker; GetUser would be refused too
+                raise
+            except Exception as e:
+                logger.warning(f"Could not read user info from ID token, falling back to GetUser: {e}")
+
+        metrics.increment("cognito_user_info_total", source="get_user")
+        return await self.get_user_info(tokens["access_token"])
+
     async def refresh_token(self, refresh_token: str, email: str) -> Dict[str, Any]:
         """Refresh access token using refresh token"""
         try:
@@ -237,7 +390,7 @@ class CognitoService:
             if self.config["client_secret"]:
                 params["AuthParameters"]["SECRET_HASH"] = self._calculate_secret_hash(cognito_username)
 
-            response = self.client.initiate_auth(**params)
+            response = await self._call("initiate_auth", **params)
 
             auth_result = response["AuthenticationResult"]
             logger.info(f"Token refreshed successfully for {email}")
@@ -258,3 +411,6 @@ class CognitoService:
 
 # Global instance
 cognito_service = CognitoService()
+config_service.subscribe(
+    cognito_service.on_config_change, keys=("cognito_config", "localstack_enabled", "aws")
+)
@@ -0,0 +1,347 @@
+"""
+Local identity provider: an offline stand-in for Cognito behind the same service interface.
+Users and password hashes live in the users table, passwords are hashed in a process pool,
+and tokens are RS256 JWTs verified through the regular JWTValidator issuer path, so the
+full production validation path can be exercised (and load tested) without AWS.
+"""
+import asyncio
+import base64
+import functools
+import hashlib
+import os
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from jose import JWTError, jwk, jwt as jose_jwt
+from jose.constants import ALGORITHMS
+from sqlalchemy.exc import IntegrityError
+from app.core.config_service import config_service
+from app.core.exceptions import CognitoError, get_user_friendly_error_message
+from app.core.jwt_utils import StaticKeySource, TokenIssuer
+from app.core.logging_service import get_logger
+from app.core.principal_cache import principal_cache
+from app.crud.user import UserDAO
+from app.schemas.user import UserCreate
+from app.utils import password_hashing
+
+logger = get_logger(__name__)
+
+
+class LocalSigningKey:
+    """RSA key pair used to sign local tokens, published as a one-key JWKS"""
+
+    def __init__(self, private_pem: str):
+        self.private_pem = private_pem
+        public_jwk = jwk.construct(private_pem, ALGORITHMS.RS256).public_key().to_dict()
+        # Stable key id: thumbprint of the public modulus and exponent
+        thumbprint = hashlib.sha256(f"{public_jwk['e']}.{public_jwk['n']}".encode("utf-8")).digest()
+        self.kid = base64.urlsafe_b64encode(thumbprint[:16]).decode("ascii").rstrip("=")
+        self.public_jwk = {**public_jwk, "kid": self.kid, "use": "sig"}
+
+    @property
+    def jwks(self) -> Dict[str, Any]:
+        """The public key set served to token consumers"""
+        return {"keys": [self.public_jwk]}
+
+    @staticmethod
+    def generate_private_pem() -> str:
+        """Generate a new 2048-bit RSA private key in PEM format"""
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        return key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode("ascii")
+
+    @classmethod
+    def load_or_create(cls, path: Optional[str] = None) -> "LocalSigningKey":
+        """
+        Load the key at `path`, creating it there on first use.
+        Without a path the key is ephemeral, so tokens don't survive a restart and
+        aren't accepted by other workers.
+        """
+        if not path:
+            logger.warning("No local IdP signing key configured; using an ephemeral key")
+            return cls(cls.generate_private_pem())
+
+        if os.path.exists(path):
+            with open(path, "r") as key_file:
+                return cls(key_file.read())
+
+        private_pem = cls.generate_private_pem()
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w") as key_file:
+            key_file.write(private_pem)
+        logger.info(f"Created local IdP signing key at {path}")
+        return cls(private_pem)
+
+
+class LocalIdentityService:
+    """
+    Identity provider with the CognitoService interface, backed by the users table.
+    """
+
+    def __init__(
+        self,
+        issuer: str,
+        client_id: str,
+        signing_key: LocalSigningKey,
+        session_factory: Optional[Callable[[], Any]] = None,
+        password_scheme: str = "bcrypt",
+        password_rounds: Optional[int] = None,
+        hash_workers: int = 2,
+        access_token_ttl: int = 3600,
+        refresh_token_ttl: int = 30 * 24 * 3600
+    ):
+        self.issuer = issuer
+        self.client_id = client_id
+        self.signing_key = signing_key
+        self._session_factory = session_factory
+        self.user_dao = UserDAO()
+        self.access_token_ttl = access_token_ttl
+        self.refresh_token_ttl = refresh_token_ttl
+
+        self.password_scheme = password_hashing.resolve_scheme(password_scheme)
+        self.password_rounds = password_rounds
+        if self.password_scheme != password_scheme:
+            logger.warning(
+                f"Password scheme '{password_scheme}' is unavailable, hashing with '{self.password_scheme}'"
+            )
+            # Rounds are scheme specific, so use the fallback's defaults
+            self.password_rounds = None
+
+        # Hashing is CPU bound, so it runs in worker processes (or the default thread pool if 0)
+        self._hash_executor: Optional[Executor] = (
+            ProcessPoolExecutor(max_workers=hash_workers) if hash_workers > 0 else None
+        )
+        self._dummy_hash: Optional[str] = None
+
+        logger.info(f"Initialized local identity provider with issuer {issuer}")
+
+    @property
+    def jwks(self) -> Dict[str, Any]:
+        """JWKS document for the local issuer"""
+        return self.signing_key.jwks
+
+    def token_issuer(self) -> TokenIssuer:
+        """Issuer registration for JWTValidator"""
+        return TokenIssuer(
+            issuer=self.issuer,
+            key_source=StaticKeySource(self.jwks),
+            client_id=self.client_id,
+            name="local"
+        )
+
+    def _session(self):
+        if self._session_factory is not None:
+            return self._session_factory()
+        from app.db import SessionLocal
+        return SessionLocal()
+
+    def _error(self, error_code: str) -> CognitoError:
+        return CognitoError(get_user_friendly_error_message(error_code), error_code=error_code)
+
+    async def _run_hashing(self, fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._hash_executor, functools.partial(fn, *args))
+
+    async def _hash_password(self, password: str) -> str:
+        return await self._run_hashing(
+            password_hashing.hash_password, password, self.password_scheme, self.password_rounds
+        )
+
+    async def _verify_password(self, password: str, password_hash: str) -> bool:
+        return await self._run_hashing(
+            password_hashing.verify_password, password, password_hash, self.password_scheme, self.password_rounds
+        )
+
+    def _issue_token(self, claims: Dict[str, Any], ttl: int) -> str:
+        now = int(time.time())
+        payload = {"iss": self.issuer, "iat": now, "exp": now + ttl, "jti": uuid.uuid4().hex, **claims}
+        return jose_jwt.encode(
+            payload, self.signing_key.private_pem, algorithm=ALGORITHMS.RS256, headers={"kid": self.signing_key.kid}
+        )
+
+    def _issue_tokens(self, user_sub: str, email: str, full_name: Optional[str]) -> Dict[str, str]:
+        """Access and ID tokens shaped like Cognito's"""
+        access_token = self._issue_token({
+            "sub": user_sub,
+            "token_use": "access",
+            "client_id": self.client_id,
+            "username": email,
+            "scope": "aws.cognito.signin.user.admin",
+        }, self.access_token_ttl)
+        id_token = self._issue_token({
+            "sub": user_sub,
+            "token_use": "id",
+            "aud": self.client_id,
+            "cognito:username": email,
+            "email": email,
+            "email_verified": True,
+            "name": full_name or "",
+        }, self.access_token_ttl)
+        return {"access_token": access_token, "id_token": id_token}
+
+    def _verify_token(self, token: str, token_use: str) -> Dict[str, Any]:
+        """Verify a token this provider issued"""
+        try:
+            claims = jose_jwt.decode(
+                token,
+                self.signing_key.public_jwk,
+                algorithms=[ALGORITHMS.RS256],
+                issuer=self.issuer,
+                options={"verify_aud": False}
+            )
+        except JWTError as e:
+            logger.warning(f"Local IdP rejected {token_use} token: {e}")
+            raise self._error("NotAuthorizedException")
+        if claims.get("token_use") != token_use:
+            raise self._error("NotAuthorizedException")
+        return claims
+
+    async def sign_up(self, email: str, password: str, full_name: str = "") -> Dict[str, Any]:
+        """
+        Register a new user with a hashed password (confirmed immediately).
+        An email that already has a user, with or without a password, is refused: taking
+        over a row created elsewhere (e.g. an admin-created user) would inherit its role.
+        """
+        db = self._session()
+        try:
+            if self.user_dao.get_by_email(db, email) is not None:
+                raise self._error("UsernameExistsException")
+
+            password_hash = await self._hash_password(password)
+            user_sub = str(uuid.uuid4())
+            try:
+                user = self.user_dao.create(db, obj_in=UserCreate(
+                    username=email, email=email, full_name=full_name or None, cognito_sub=user_sub
+                ))
+            except IntegrityError:
+                # Registered concurrently, or the email is another user's username
+                db.rollback()
+                raise self._error("UsernameExistsException")
+            self.user_dao.set_password_hash(db, user.id, password_hash)
+        finally:
+            db.close()
+        # The row was written through the DAO, so drop any principal cached before sign up
+        principal_cache.invalidate_user(user.id)
+
+        logger.info(f"Local IdP: User {email} signed up")
+        return {
+            "user_sub": user_sub,
+            "user_confirmed": True,
+            "email": email,
+            "cognito_username": email
+        }
+
+    async def confirm_sign_up(self, email: str, confirmation_code: str) -> bool:
+        """Users are confirmed at sign up, so there is nothing to confirm"""
+        return True
+
+    async def sign_in(self, email: str, password: str) -> Dict[str, Any]:
+        """Check a password and issue tokens"""
+        db = self._session()
+        try:
+            user = self.user_dao.get_in_db_by_email(db, email)
+        finally:
+            db.close()
+
+        if user is None or not user.password_hash:
+            # Spend the same hashing time so response times don't reveal which emails exist
+            if self._dummy_hash is None:
+                self._dummy_hash = await self._hash_password(uuid.uuid4().hex)
+            await self._verify_password(password, self._dummy_hash)
+            raise self._error("NotAuthorizedException")
+
+        if not await self._verify_password(password, user.password_hash) or not user.is_active:
+            raise self._error("NotAuthorizedException")
+
+        tokens = self._issue_tokens(user.cognito_sub, user.email, user.full_name)
+        refresh_token = self._issue_token({
+            "sub": user.cognito_sub,
+            "token_use": "refresh",
+            "client_id": self.client_id,
+        }, self.refresh_token_ttl)
+
+        logger.info(f"Local IdP: User {email} signed in")
+        return {
+            **tokens,
+            "refresh_token": refresh_token,
+            "expires_in": self.access_token_ttl,
+            "email": email,
+            "cognito_username": email
+        }
+
+    async def refresh_token(self, refresh_token: str, email: str) -> Dict[str, Any]:
+        """Issue new access and ID tokens for a refresh token"""
+        claims = self._verify_token(refresh_token, "refresh")
+
+        db = self._session()
+        try:
+            user = self.user_dao.get_by_cognito_sub(db, claims["sub"])
+        finally:
+            db.close()
+        if user is None or not user.is_active or user.email != email:
+            raise self._error("NotAuthorizedException")
+
+        return {**self._issue_tokens(user.cognito_sub, user.email, user.full_name), "expires_in": self.access_token_ttl}
+
+    async def get_user_info(self, access_token: str) -> Dict[str, Any]:
+        """Get user information for an access token"""
+        claims = self._verify_token(access_token, "access")
+
+        db = self._session()
+        try:
+            user = self.user_dao.get_by_cognito_sub(db, claims["sub"])
+        finally:
+            db.close()
+        if user is None:
+            raise self._error("UserNotFoundException")
+
+        return {
+            "username": user.email,
+            "user_sub": user.cognito_sub,
+            "email": user.email,
+            "name": user.full_name or "",
+            "email_verified": True
+        }
+
+    async def get_user_info_from_tokens(self, tokens: Dict[str, Any]) -> Dict[str, Any]:
+        """Get user information from the claims of a freshly issued ID token"""
+        claims = self._verify_token(tokens["id_token"], "id")
+        return {
+            "username": claims.get("cognito:username", claims["email"]),
+            "user_sub": claims["sub"],
+            "email": claims["email"],
+            "name": claims.get("name", ""),
+            "email_verified": claims.get("email_verified") is True
+        }
+
+    def shutdown(self) -> None:
+        """Stop the hashing worker processes"""
+        if self._hash_executor is not None:
+            self._hash_executor.shutdown(wait=False, cancel_futures=True)
+
+
+_local_identity_service: Optional[LocalIdentityService] = None
+
+
+def get_local_identity_service() -> LocalIdentityService:
+    """The configured local identity provider, created on first use"""
+    global _local_identity_service
+    if _local_identity_service is None:
+        rounds = config_service.get("local_idp_password_rounds", 0)
+        _local_identity_service = LocalIdentityService(
+            issuer=config_service.get("local_idp_issuer", "http://localhost:9010/api/v1/auth"),
+            client_id=config_service.get("local_idp_client_id", "local-client"),
+            signing_key=LocalSigningKey.load_or_create(config_service.get("local_idp_private_key_path", "")),
+            password_scheme=config_service.get("local_idp_password_scheme", "bcrypt"),
+            password_rounds=rounds or None,
+            hash_workers=config_service.get("local_idp_hash_workers", 2),
+            access_token_ttl=config_service.get("local_idp_access_token_ttl", 3600),
+        )
+    return _local_identity_service
@@ -4,11 +4,14 @@ Provides the same interface as the real Cognito service but checks the database
 """
 import hashlib
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 from sqlalchemy.orm import Session
+from app.core.config_service import config_service
+from app.core.mock_jwt_utils import mock_token_store, mock_user_cache
 from app.db import SessionLocal
 from app.models.user import User
+from app.utils.ttl_store import TTLStore
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +22,44 @@ class MockCognitoService:
     Checks database for users and generates deterministic user_sub values.
     """
 
-    def __init__(self):
-        # Only store tokens in memory, users are in database
-        self._tokens: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, token_store: Optional[TTLStore] = None, user_cache: Optional[TTLStore] = None):
+        # Only store tokens in memory (shared with the mock JWT validator), users are in database
+        self._tokens = token_store if token_store is not None else mock_token_store
+        # Users seen at sign in, by sub, so token lookups don't need a database session
+        self._users = user_cache if user_cache is not None else mock_user_cache
         logger.info("Initialized Mock Cognito Service")
 
+    def startup(self) -> None:
+        """Start sweeping expired tokens and cached users (needs a running event loop)"""
+        interval = config_service.get("mock_token_sweep_interval", 60)
+        self._tokens.start_sweeper(interval)
+        self._users.start_sweeper(interval)
+
+    def shutdown(self) -> None:
+        """Stop the sweepers"""
+        self._tokens.stop_sweeper()
+        self._users.stop_sweeper()
+
+    def _cache_user(self, user: User) -> Dict[str, Any]:
+        """Remember a user by sub for later token lookups"""
+        cached = {
+            "user_sub": user.cognito_sub,
+            "email": user.email,
+            "full_name": user.full_name
+        }
+        self._users.set(user.cognito_sub, cached)
+        return cached
+
+    def _store_token(self, token: str, user_sub: str, email: str, token_type: str, expires_at: int) -> None:
+        """Register an issued token until it expires"""
+        self._tokens.set(token, {
+            "username": email,
+            "user_sub": user_sub,
+            "email": email,
+            "token_type": token_type,
+            "expires_at": expires_at
+        }, expires_at=expires_at)
+
     def _generate_user_sub(self, email: str) -> str:
         """Generate deterministic user_sub based on email"""
         email_hash = hashlib.md5(email.encode()).hexdigest()[:8]
@@ -84,18 +120,9 @@ class MockCognitoService:
                 refresh_token = f"mock-refresh-{user.cognito_sub}"
 
                 # Store tokens for validation
-                self._tokens[access_token] = {
-                    "user_sub": user.cognito_sub,
-                    "email": email,
-                    "token_type": "access",
-                    "expires_at": timestamp + 3600
-                }
-                self._tokens[id_token] = {
-                    "user_sub": user.cognito_sub,
-                    "email": email,
-                    "token_type": "id",
-                    "expires_at": timestamp + 3600
-                }
+                self._store_token(access_token, user.cognito_sub, email, "access", timestamp + 3600)
+                self._store_token(id_token, user.cognito_sub, email, "id", timestamp + 3600)
+                self._cache_user(user)
 
                 logger.info(f"Mock Cognito: User {email} signed in successfully")
 
@@ -131,18 +158,9 @@ class MockCognitoService:
                 id_token = f"mock-id-{user.cognito_sub}-{timestamp}"
 
                 # Store new tokens
-                self._tokens[access_token] = {
-                    "user_sub": user.cognito_sub,
-                    "email": email,
-                    "token_type": "access",
-                    "expires_at": timestamp + 3600
-                }
-                self._tokens[id_token] = {
-                    "user_sub": user.cognito_sub,
-                    "email": email,
-                    "token_type": "id",
-                    "expires_at": timestamp + 3600
-                }
+                self._store_token(access_token, user.cognito_sub, email, "access", timestamp + 3600)
+                self._store_token(id_token, user.cognito_sub, email, "id", timestamp + 3600)
+                self._cache_user(user)
 
                 logger.info(f"Mock Cognito: Token refreshed for {email}")
 
@@ -185,17 +203,12 @@ class MockCognitoService:
 
     def validate_token(self, token: str) -> Dict[str, Any]:
         """Validate a token and return token data"""
-        if token in self._tokens:
-            token_data = self._tokens[token]
-            # Check if token is expired
-            if token_data["expires_at"] > int(time.time()):
-                return token_data
-            else:
-                logger.warning(f"Mock Cognito: Token {token[:20]}... has expired")
-                raise Exception("Token expired")
-        else:
-            logger.warning(f"Mock Cognito: Invalid token {token[:20]}...")
+        # Expired tokens are never returned by the store
+        token_data = self._tokens.get(token)
+        if token_data is None:
+            logger.warning(f"Mock Cognito: Invalid or expired token {token[:20]}...")
             raise Exception("Invalid token")
+        return token_data
 
     async def confirm_sign_up(self, email: str, confirmation_code: str):
         """Confirm user sign up (mock implementation - always succeeds)"""
@@ -207,32 +220,39 @@ class MockCognitoService:
         """Get user info from access token"""
         try:
             token_data = self.validate_token(access_token)
-            email = token_data["email"]
 
-            db = SessionLocal()
-            try:
-                user = db.query(User).filter(User.email == email).first()
-                if user:
-                    return {
-                        "user_sub": user.cognito_sub,
-                        "email": user.email,
-                        "name": user.full_name,  # Use 'name' to match real Cognito response
-                        "full_name": user.full_name,  # Keep both for compatibility
-                        "cognito_username": user.email
-                    }
-                else:
-                    raise Exception("User not found")
-            finally:
-                db.close()
+            user = self._users.get(token_data["user_sub"])
+            if user is None:
+                db = SessionLocal()
+                try:
+                    db_user = db.query(User).filter(User.email == token_data["email"]).first()
+                    if not db_user:
+                        raise Exception("User not found")
+                    user = self._cache_user(db_user)
+                finally:
+                    db.close()
+
+            return {
+                "user_sub": user["user_sub"],
+                "email": user["email"],
+                "name": user["full_name"],  # Use 'name' to match real Cognito response
+                "full_name": user["full_name"],  # Keep both for compatibility
+                "cognito_username": user["email"]
+            }
 
         except Exception as e:
             logger.error(f"Mock Cognito: Failed to get user info: {e}")
             raise Exception("Failed to get user info")
 
+    async def get_user_info_from_tokens(self, tokens: Dict[str, Any]) -> Dict[str, Any]:
+        """Get user info for freshly issued tokens (mock tokens carry no claims)"""
+        return await self.get_user_info(tokens["access_token"])
+
     def clear_all_users(self):
         """Clear all users and tokens (for testing)"""
-        # Only clear tokens, users are in database
+        # Only clear tokens and cached users, users are in database
         self._tokens.clear()
+        self._users.clear()
         logger.info("Mock Cognito: Cleared all tokens")
 
 
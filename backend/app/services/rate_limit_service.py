@@ -0,0 +1,264 @@
+"""
+Token-bucket rate limiting for the authentication endpoints.
+Requests are admitted against per-IP, per-email and global buckets. Buckets live either
+in process (per worker) or in the database, so limits hold across workers. Buckets idle
+long enough to have refilled are purged, since a missing bucket starts full.
+"""
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config_service import config_service
+from app.core.exceptions import RateLimitExceededError
+from app.core.logging_service import get_logger
+from app.core.metrics import metrics
+from app.crud.rate_limit_bucket import RateLimitBucketDAO
+from app.db import engine
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """A bucket of `capacity` tokens refilled at `per_minute` tokens per minute"""
+    name: str
+    capacity: float
+    per_minute: float
+
+    @property
+    def refill_rate(self) -> float:
+        """Tokens per second"""
+        return self.per_minute / 60.0
+
+
+class InMemoryRateLimitBackend:
+    """
+    Token buckets in a bounded LRU dict. Limits apply per worker process.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(
+        self,
+        db: Optional[Session],
+        key: str,
+        capacity: float,
+        refill_rate: float,
+        cost: float,
+        now: float
+    ) -> Tuple[bool, float]:
+        """Take `cost` tokens from a bucket. Returns (allowed, tokens left)."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = capacity
+            else:
+                tokens = min(capacity, bucket[0] + (now - bucket[1]) * refill_rate)
+                self._buckets.move_to_end(key)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+
+            # Evicting the least recently used bucket only ever forgets a partially drained one
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed, tokens
+
+    def purge(self, db: Optional[Session], before: float) -> int:
+        """Drop buckets last used before `before`. Returns the number dropped."""
+        with self._lock:
+            idle = [key for key, (_, updated_at) in self._buckets.items() if updated_at < before]
+            for key in idle:
+                del self._buckets[key]
+            return len(idle)
+
+    def reset(self, db: Optional[Session] = None) -> None:
+        """Drop all buckets"""
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseRateLimitBackend:
+    """
+    Token buckets stored in the rate_limit_buckets table, shared by all workers.
+    """
+
+    def __init__(self, rate_limit_bucket_dao: RateLimitBucketDAO):
+        self.rate_limit_bucket_dao = rate_limit_bucket_dao
+
+    def take(
+        self,
+        db: Optional[Session],
+        key: str,
+        capacity: float,
+        refill_rate: float,
+        cost: float,
+        now: float
+    ) -> Tuple[bool, float]:
+        """Take `cost` tokens from a bucket. Returns (allowed, tokens left)."""
+        return self.rate_limit_bucket_dao.take(db, key, capacity, refill_rate, cost, now)
+
+    def purge(self, db: Optional[Session], before: float) -> int:
+        """Delete buckets last used before `before` (needs a session). Returns the number deleted."""
+        if db is None:
+            return 0
+        return self.rate_limit_bucket_dao.purge(db, before)
+
+    def reset(self, db: Optional[Session] = None) -> None:
+        """Delete all buckets (needs a session)"""
+        if db is not None:
+            self.rate_limit_bucket_dao.reset(db)
+
+
+class RateLimitService:
+    """
+    Admits requests against the IP, email and global rules, in that order, and stops at
+    the first rule that refuses so a blocked client doesn't drain the global bucket.
+    """
+
+    def __init__(
+        self,
+        backend,
+        ip_rule: Optional[RateLimitRule] = None,
+        email_rule: Optional[RateLimitRule] = None,
+        global_rule: Optional[RateLimitRule] = None,
+        enabled: bool = True,
+        purge_interval: float = 300
+    ):
+        self.backend = backend
+        self.ip_rule = ip_rule
+        self.email_rule = email_rule
+        self.global_rule = global_rule
+        self.enabled = enabled
+        self.purge_interval = purge_interval
+        self._next_purge = 0.0
+
+    def _refill_seconds(self) -> Optional[float]:
+        """Seconds after which any bucket is full again, or None if some rule never refills"""
+        seconds = 0.0
+        for rule in (self.ip_rule, self.email_rule, self.global_rule):
+            if rule is None:
+                continue
+            if rule.refill_rate <= 0:
+                return None
+            seconds = max(seconds, rule.capacity / rule.refill_rate)
+        return seconds
+
+    def purge_idle(self, db: Optional[Session], now: Optional[float] = None) -> int:
+        """
+        Delete buckets idle long enough to have refilled completely. A deleted bucket is
+        recreated full, so limits are unchanged. Returns the number deleted.
+        """
+        refill_seconds = self._refill_seconds()
+        if refill_seconds is None:
+            return 0
+        now = time.time() if now is None else now
+        purged = self.backend.purge(db, now - refill_seconds)
+        if purged:
+            metrics.increment("rate_limit_buckets_purged_total", purged)
+        return purged
+
+    @staticmethod
+    def _key(scope: str, rule: RateLimitRule, subject: str) -> str:
+        """Bucket key; hashed so emails and addresses aren't stored in the clear"""
+        return hashlib.sha256(f"{scope}:{rule.name}:{subject}".encode("utf-8")).hexdigest()
+
+    def check(
+        self,
+        db: Optional[Session],
+        scope: str,
+        client_ip: Optional[str] = None,
+        email: Optional[str] = None,
+        cost: float = 1
+    ) -> None:
+        """
+        Admit one request for an endpoint scope (e.g. "signin").
+
+        Raises:
+            RateLimitExceededError: If any rule refuses the request
+        """
+        if not self.enabled:
+            return
+
+        now = time.time()
+        if self.purge_interval > 0 and now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            self.purge_idle(db, now)
+
+        checks = (
+            (self.ip_rule, client_ip),
+            (self.email_rule, email.strip().lower() if email else None),
+            (self.global_rule, "*"),
+        )
+        for rule, subject in checks:
+            if rule is None or subject is None:
+                continue
+            allowed, tokens = self.backend.take(
+                db, self._key(scope, rule, subject), rule.capacity, rule.refill_rate, cost, now
+            )
+            if not allowed:
+                retry_after = max(1, math.ceil((cost - tokens) / rule.refill_rate)) if rule.refill_rate > 0 else 60
+                metrics.increment("rate_limit_rejected_total", scope=scope, rule=rule.name)
+                logger.warning(f"Rate limit '{rule.name}' exceeded for {scope}")
+                raise RateLimitExceededError(
+                    "Too many requests. Please wait a moment and try again.",
+                    retry_after=retry_after,
+                    rule=rule.name
+                )
+
+    def reset(self, db: Optional[Session] = None) -> None:
+        """Refill every bucket"""
+        self.backend.reset(db)
+
+
+def _build_backend(backend_name: str, dialect: str):
+    """
+    Create a bucket backend. The database backend needs upserts the database dialect
+    may not have; without them limits fall back to per worker rather than failing requests.
+    """
+    if backend_name == "database":
+        if RateLimitBucketDAO.supports(dialect):
+            return DatabaseRateLimitBackend(RateLimitBucketDAO())
+        logger.warning(
+            f"Shared rate limiting is not supported on {dialect}, falling back to per-worker rate limits"
+        )
+    return InMemoryRateLimitBackend()
+
+
+def _build_rate_limit_service() -> RateLimitService:
+    """Create the rate limiter described by configuration"""
+    backend = _build_backend(config_service.get("rate_limit_backend", "memory"), engine.dialect.name)
+
+    return RateLimitService(
+        backend,
+        ip_rule=RateLimitRule(
+            "ip",
+            config_service.get("rate_limit_ip_burst", 20),
+            config_service.get("rate_limit_ip_per_minute", 10),
+        ),
+        email_rule=RateLimitRule(
+            "email",
+            config_service.get("rate_limit_email_burst", 5),
+            config_service.get("rate_limit_email_per_minute", 5),
+        ),
+        global_rule=RateLimitRule(
+            "global",
+            config_service.get("rate_limit_global_burst", 200),
+            config_service.get("rate_limit_global_per_minute", 600),
+        ),
+        enabled=config_service.get("rate_limit_enabled", True),
+        purge_interval=config_service.get("rate_limit_purge_interval", 300),
+    )
+
+
+# Global instance
+rate_limit_service = _build_rate_limit_service()
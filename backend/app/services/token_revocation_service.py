@@ -0,0 +1,154 @@
+"""
+Token revocation service backing /auth/signout.
+Revocations are persisted in the database and fronted by an in-process Bloom filter,
+so the common "not revoked" answer never needs a database round trip.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config_service import config_service
+from app.core.logging_service import get_logger
+from app.crud.revoked_token import RevokedTokenDAO
+from app.utils.bloom_filter import BloomFilter
+
+logger = get_logger(__name__)
+
+
+class TokenRevocationService:
+    """
+    Revocation list with a two-level in-process front:
+    an exact set of tokens revoked recently by this worker, and a Bloom filter of
+    every unexpired revocation. Only Bloom positives are confirmed against the store.
+    The filter is refreshed from the store periodically so revocations made by other
+    workers are picked up within sync_interval seconds.
+
+    revoked_at is stamped by the revoking worker before it commits, so a row can become
+    visible after another worker has synced past its timestamp. Each sync therefore
+    re-reads the last sync_overlap seconds (the longest expected commit lag plus clock
+    skew between workers); rows read twice are simply added to the filter again.
+    """
+
+    def __init__(
+        self,
+        revoked_token_dao: RevokedTokenDAO,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        recent_size: int = 10000,
+        sync_interval: float = 5.0,
+        sync_overlap: float = 60.0,
+        default_ttl: int = 3600
+    ):
+        self.revoked_token_dao = revoked_token_dao
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.recent_size = recent_size
+        self.sync_interval = sync_interval
+        self.sync_overlap = sync_overlap
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self.reset()
+
+    @staticmethod
+    def hash_token(token: str) -> str:
+        """Hash a token so raw tokens are never stored"""
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def _token_expiry(self, token: str) -> datetime:
+        """Expiry of a token from its 'exp' claim, or now + default_ttl for opaque tokens"""
+        try:
+            from jose import jwt as jose_jwt
+            exp = jose_jwt.get_unverified_claims(token).get("exp")
+            if exp:
+                return datetime.fromtimestamp(exp, tz=timezone.utc)
+        except Exception:
+            pass
+        return datetime.now(timezone.utc) + timedelta(seconds=self.default_ttl)
+
+    def revoke(self, db: Session, token: str, expires_at: Optional[datetime] = None) -> None:
+        """Revoke a token until it expires"""
+        token_hash = self.hash_token(token)
+        expires_at = expires_at or self._token_expiry(token)
+        now = datetime.now(timezone.utc)
+        if expires_at <= now:
+            return
+
+        self.revoked_token_dao.add(db, token_hash, expires_at, now)
+        with self._lock:
+            self._remember(token_hash, expires_at.timestamp())
+            self._bloom.add(token_hash)
+        logger.info("Token revoked", expires_at=expires_at.isoformat())
+
+    def is_revoked(self, db: Session, token: str) -> bool:
+        """Check whether a token has been revoked"""
+        token_hash = self.hash_token(token)
+
+        if time.monotonic() >= self._next_sync:
+            self._sync(db)
+
+        recent_expiry = self._recent.get(token_hash)
+        if recent_expiry is not None:
+            return recent_expiry > time.time()
+
+        if token_hash not in self._bloom:
+            return False
+
+        # Possible false positive: confirm against the store
+        return self.revoked_token_dao.is_revoked(db, token_hash, datetime.now(timezone.utc))
+
+    def _sync(self, db: Session) -> None:
+        """Pull revocations recorded since the last sync into the Bloom filter"""
+        with self._lock:
+            if time.monotonic() < self._next_sync:
+                return
+            self._next_sync = time.monotonic() + self.sync_interval
+
+            now = datetime.now(timezone.utc)
+            try:
+                if self._bloom.is_saturated():
+                    # Rebuild from scratch, dropping revocations that have since expired
+                    self.revoked_token_dao.delete_expired(db, now)
+                    self._synced_until = None
+                if self._synced_until is None:
+                    # Size the filter from the row count, so more unexpired revocations than
+                    # capacity don't leave it saturated and force a full reload every sync
+                    rows = self.revoked_token_dao.get_revoked_since(db, now)
+                    self._bloom = BloomFilter(max(self.capacity, 2 * len(rows)), self.error_rate)
+                else:
+                    since = self._synced_until - timedelta(seconds=self.sync_overlap)
+                    rows = self.revoked_token_dao.get_revoked_since(db, now, since=since)
+            except Exception as e:
+                logger.error(f"Failed to sync token revocation list: {e}")
+                return
+
+            for token_hash, revoked_at in rows:
+                self._bloom.add(token_hash)
+                if self._synced_until is None or revoked_at > self._synced_until:
+                    self._synced_until = revoked_at
+
+    def _remember(self, token_hash: str, expires_at: float) -> None:
+        """Track a recent revocation in the bounded exact set. Caller must hold the lock."""
+        self._recent[token_hash] = expires_at
+        self._recent.move_to_end(token_hash)
+        while len(self._recent) > self.recent_size:
+            self._recent.popitem(last=False)
+
+    def reset(self) -> None:
+        """Drop all in-process state; it is rebuilt from the store on the next check"""
+        with self._lock:
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+            self._recent: "OrderedDict[str, float]" = OrderedDict()
+            self._synced_until: Optional[datetime] = None
+            self._next_sync = 0.0
+
+
+# Global instance
+token_revocation_service = TokenRevocationService(
+    RevokedTokenDAO(),
+    capacity=config_service.get("token_revocation_capacity", 100000),
+    sync_interval=config_service.get("token_revocation_sync_interval", 5.0),
+    sync_overlap=config_service.get("token_revocation_sync_overlap", 60.0),
+)
@@ -7,6 +7,7 @@ from app.crud.user import UserDAO
 from app.schemas.user import UserResponse, UserCreate, UserUpdate
 from app.models.user import UserRole
 from app.core.logging_service import get_logger
+from app.core.principal_cache import principal_cache
 
 logger = get_logger(__name__)
 
@@ -37,7 +38,7 @@ class UserService:
         Returns:
             UserResponse if found, None otherwise
         """
-        logger.info(f"Getting user by ID: {user_id}")
+        logger.debug("Getting user by ID: {}", user_id)
         return self.user_dao.get(db, user_id)
 
     def get_users(self, db: Session, skip: int = 0, limit: int = 100) -> List[UserResponse]:
@@ -52,7 +53,7 @@ class UserService:
         Returns:
             List of UserResponse objects
         """
-        logger.info(f"Getting users with skip={skip}, limit={limit}")
+        logger.debug("Getting users with skip={}, limit={}", skip, limit)
         return self.user_dao.get_multi(db, skip=skip, limit=limit)
 
     def get_user_by_email(self, db: Session, email: str) -> Optional[UserResponse]:
@@ -66,7 +67,7 @@ class UserService:
         Returns:
             UserResponse if found, None otherwise
         """
-        logger.info(f"Getting user by email: {email}")
+        logger.debug("Getting user by email: {}", email)
         return self.user_dao.get_by_email(db, email)
 
     def get_user_by_username(self, db: Session, username: str) -> Optional[UserResponse]:
@@ -80,7 +81,7 @@ class UserService:
         Returns:
             UserResponse if found, None otherwise
         """
-        logger.info(f"Getting user by username: {username}")
+        logger.debug("Getting user by username: {}", username)
         return self.user_dao.get_by_username(db, username)
 
     def get_user_by_cognito_sub(self, db: Session, cognito_sub: str) -> Optional[UserResponse]:
@@ -94,9 +95,47 @@ class UserService:
         Returns:
             UserResponse if found, None otherwise
         """
-        logger.info(f"Getting user by Cognito sub: {cognito_sub}")
+        logger.debug("Getting user by Cognito sub: {}", cognito_sub)
         return self.user_dao.get_by_cognito_sub(db, cognito_sub)
 
+    def get_user_by_principal(
+        self,
+        db: Session,
+        cognito_sub: Optional[str] = None,
+        username: Optional[str] = None
+    ) -> Optional[UserResponse]:
+        """
+        Get a user by token principal, preferring the Cognito sub over the username.
+        
+        Args:
+            db: Database session
+            cognito_sub: Cognito user ID from the token (optional)
+            username: Username from the token (optional)
+            
+        Returns:
+            UserResponse if found, None otherwise
+        """
+        logger.debug("Getting user by principal: sub={}, username={}", cognito_sub, username)
+        return self.user_dao.get_by_principal(db, cognito_sub=cognito_sub, username=username)
+
+    def backfill_cognito_sub(self, db: Session, user: UserResponse, cognito_sub: str) -> UserResponse:
+        """
+        Record the Cognito sub on a user that was resolved by username.
+        
+        Args:
+            db: Database session
+            user: User resolved without a Cognito sub
+            cognito_sub: Cognito user ID from the token
+            
+        Returns:
+            UserResponse with the Cognito sub set if the backfill applied
+        """
+        logger.info("Backfilling Cognito sub for user: {}", user.id)
+        if not self.user_dao.backfill_cognito_sub(db, user.id, cognito_sub):
+            return user
+        principal_cache.invalidate_user(user.id)
+        return user.model_copy(update={"cognito_sub": cognito_sub})
+
     def create_user(self, db: Session, user_create: UserCreate) -> UserResponse:
         """
         Create a new user.
@@ -108,7 +147,7 @@ class UserService:
         Returns:
             Created UserResponse
         """
-        logger.info(f"Creating user: {user_create.username}")
+        logger.info("Creating user: {}", user_create.username)
         return self.user_dao.create(db, obj_in=user_create)
 
     def create_user_from_params(
@@ -134,11 +173,43 @@ class UserService:
         Returns:
             Created UserResponse
         """
-        logger.info(f"Creating user from params: {username}")
+        logger.info("Creating user from params: {}", username)
         return self.user_dao.create_user_legacy(
             db, username, email, full_name, role, cognito_sub
         )
 
+    def upsert_user_from_identity(
+        self,
+        db: Session,
+        email: str,
+        cognito_sub: str,
+        username: Optional[str] = None,
+        full_name: Optional[str] = None
+    ) -> UserResponse:
+        """
+        Create the user for an authenticated identity, or link an existing user to it.
+        
+        Args:
+            db: Database session
+            email: Email address from the identity provider
+            cognito_sub: Cognito user ID
+            username: Username (defaults to the email)
+            full_name: Full name (optional, only used when creating)
+            
+        Returns:
+            The created or linked UserResponse
+
+        Raises:
+            UserAlreadyExistsError: If the username belongs to another user
+        """
+        logger.info("Upserting user from identity: {}", email)
+        user = self.user_dao.upsert_from_identity(
+            db, email=email, cognito_sub=cognito_sub, username=username, full_name=full_name
+        )
+        # The Cognito sub may have changed, so cached principals are stale
+        principal_cache.invalidate_user(user.id)
+        return user
+
     def update_user(self, db: Session, user_id: int, user_update: UserUpdate) -> Optional[UserResponse]:
         """
         Update a user by ID.
@@ -151,8 +222,10 @@ class UserService:
         Returns:
             Updated UserResponse if found, None otherwise
         """
-        logger.info(f"Updating user: {user_id}")
-        return self.user_dao.update_by_id(db, user_id, user_update)
+        logger.info("Updating user: {}", user_id)
+        user = self.user_dao.update_by_id(db, user_id, user_update)
+        principal_cache.invalidate_user(user_id)
+        return user
 
     def delete_user(self, db: Session, user_id: int) -> bool:
         """
@@ -165,8 +238,10 @@ class UserService:
         Returns:
             True if deleted, False if not found
         """
-        logger.info(f"Deleting user: {user_id}")
-        return self.user_dao.delete(db, id=user_id)
+        logger.info("Deleting user: {}", user_id)
+        deleted = self.user_dao.delete(db, id=user_id)
+        principal_cache.invalidate_user(user_id)
+        return deleted
 
     def get_user_count(self, db: Session) -> int:
         """
@@ -178,7 +253,7 @@ class UserService:
         Returns:
             Total number of users
         """
-        logger.info("Getting user count")
+        logger.debug("Getting user count")
         return self.user_dao.get_count(db)
 
     def is_first_user(self, db: Session) -> bool:
@@ -0,0 +1,55 @@
+"""
+Bloom filter for fast, allocation-free negative membership checks.
+"""
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over string keys.
+    Never returns a false negative; false positives occur at roughly error_rate
+    while fewer than capacity keys have been added.
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        """Bit positions for a key, using double hashing over one SHA-256 digest"""
+        digest = hashlib.sha256(key.encode("utf-8")).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        """Add a key to the filter"""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        for position in self._positions(key):
+            if not self._bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def is_saturated(self) -> bool:
+        """True once more keys were added than the filter was sized for"""
+        return self.count >= self.capacity
+
+    def clear(self) -> None:
+        """Remove all keys"""
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
@@ -0,0 +1,116 @@
+"""
+Circuit breaker for calls to an external dependency.
+"""
+import math
+import threading
+import time
+from app.core.logging_service import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker.
+
+    closed: calls pass through; failure_threshold consecutive failures open the circuit.
+    open: calls are refused until recovery_timeout seconds have passed.
+    half_open: up to half_open_max_calls probe calls are let through; a successful probe
+    closes the circuit, a failed one opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    # Gauge values for the breaker state
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the recovery timeout has passed"""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def retry_after(self) -> int:
+        """Whole seconds until the circuit will allow a probe call (at least 1)"""
+        with self._lock:
+            remaining = self._opened_at + self.recovery_timeout - time.monotonic()
+        return max(1, math.ceil(remaining))
+
+    def allow_call(self) -> bool:
+        """Reserve permission for a call; False means fail fast"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls and time.monotonic() >= self._probe_deadline:
+                    # Probes that never reported back (e.g. cancelled) must not wedge the circuit
+                    self._probes = 0
+                if self._probes < self.half_open_max_calls:
+                    self._probes += 1
+                    self._probe_deadline = time.monotonic() + self.recovery_timeout
+                    return True
+            return False
+
+    def record_success(self) -> None:
+        """Report a call that reached a healthy dependency"""
+        with self._lock:
+            self._failures = 0
+            if self._state == self.HALF_OPEN:
+                self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        """Report a call that failed because the dependency is unhealthy"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or (
+                self._state == self.CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._transition(self.OPEN)
+
+    def _maybe_half_open(self) -> None:
+        """Caller must hold the lock"""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._transition(self.HALF_OPEN)
+
+    def _transition(self, state: str) -> None:
+        """Move to a new state and publish it. Caller must hold the lock."""
+        previous = self._state
+        self._state = state
+        self._probes = 0
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == self.CLOSED:
+            self._failures = 0
+
+        metrics.increment("circuit_breaker_transitions_total", breaker=self.name, from_state=previous, to_state=state)
+        metrics.set_gauge("circuit_breaker_state", self.STATE_VALUES[state], breaker=self.name)
+        logger.warning(f"Circuit breaker '{self.name}' {previous} -> {state}")
+
+    def reset(self) -> None:
+        """Close the circuit and forget past failures"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+            self._probe_deadline = 0.0
+            self._opened_at = 0.0
+        metrics.set_gauge("circuit_breaker_state", self.STATE_VALUES[self.CLOSED], breaker=self.name)
@@ -0,0 +1,50 @@
+"""
+Password hashing with passlib.
+Only depends on passlib so the functions can run in a process pool without
+pulling in the rest of the application.
+"""
+from functools import lru_cache
+from typing import Optional
+from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
+
+# Pure-Python scheme used when the preferred one has no working backend
+FALLBACK_SCHEME = "pbkdf2_sha256"
+SUPPORTED_SCHEMES = ("argon2", "bcrypt", FALLBACK_SCHEME)
+
+
+def scheme_available(scheme: str) -> bool:
+    """Check whether a passlib scheme has a usable backend in this environment"""
+    try:
+        handler = get_crypt_handler(scheme)
+        return handler.has_backend() if hasattr(handler, "has_backend") else True
+    except Exception:
+        # e.g. passlib 1.7 with bcrypt >= 4.1, whose backend self-test fails
+        return False
+
+
+def resolve_scheme(preferred: str) -> str:
+    """The preferred scheme if it works here, otherwise the fallback scheme"""
+    return preferred if scheme_available(preferred) else FALLBACK_SCHEME
+
+
+@lru_cache(maxsize=8)
+def get_password_context(scheme: str, rounds: Optional[int] = None) -> CryptContext:
+    """CryptContext hashing with `scheme`; the other supported schemes stay verifiable"""
+    settings = {f"{scheme}__rounds": rounds} if rounds else {}
+    schemes = [scheme] + [other for other in SUPPORTED_SCHEMES if other != scheme]
+    return CryptContext(schemes=schemes, default=scheme, **settings)
+
+
+def hash_password(password: str, scheme: str, rounds: Optional[int] = None) -> str:
+    """Hash a password"""
+    return get_password_context(scheme, rounds).hash(password)
+
+
+def verify_password(password: str, password_hash: str, scheme: str, rounds: Optional[int] = None) -> bool:
+    """Check a password against a stored hash"""
+    try:
+        return get_password_context(scheme, rounds).verify(password, password_hash)
+    except (ValueError, TypeError):
+        # Malformed hash or a scheme without a backend here
+        return False
@@ -0,0 +1,61 @@
+"""
+Single-flight request coalescing for async calls.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from app.core.metrics import metrics
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Concurrent callers with the same key
+    await the call already in flight, and successful results are reused for
+    ttl_seconds afterwards. Failures are shared with the callers that were waiting
+    but never cached.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float = 5.0, max_size: int = 1000):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._in_flight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return fn()'s result for this key, sharing it with concurrent and recent callers"""
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                metrics.increment(f"{self.name}_single_flight_total", outcome="cached")
+                return cached[1]
+            self._results.pop(key, None)
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            metrics.increment(f"{self.name}_single_flight_total", outcome="coalesced")
+        else:
+            metrics.increment(f"{self.name}_single_flight_total", outcome="executed")
+            # A separate task so one caller being cancelled doesn't cancel the others
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._complete(key, done))
+
+        return await asyncio.shield(task)
+
+    def _complete(self, key: str, task: "asyncio.Future[Any]") -> None:
+        """Move a finished call out of the in-flight table, caching it if it succeeded"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if self.ttl_seconds > 0:
+            self._results[key] = (time.monotonic() + self.ttl_seconds, task.result())
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget cached results (in-flight calls are left to finish)"""
+        self._results.clear()
@@ -0,0 +1,86 @@
+"""
+Startup profiling: per-module import times and lifespan phase durations.
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+from app.core.metrics import metrics
+
+# "import time:       self [us] |  cumulative |     imported package"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ImportTiming:
+    """One line of `python -X importtime` output"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse `-X importtime` output (stderr) into timings, in import completion order"""
+    timings = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            # The first level is indented by one space, each nested level by two more
+            timings.append(ImportTiming(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return timings
+
+
+def profile_imports(module: str = "app.main", env: Optional[Dict[str, str]] = None) -> List[ImportTiming]:
+    """Import `module` in a fresh interpreter and return its import timings"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def package_totals(timings: List[ImportTiming]) -> Dict[str, int]:
+    """Self time (us) summed per top-level package, largest first"""
+    totals: Dict[str, int] = {}
+    for timing in timings:
+        package = timing.module.split(".", 1)[0]
+        totals[package] = totals.get(package, 0) + timing.self_us
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+class StartupTimer:
+    """Records how long each named startup phase took"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the enclosed block as phase `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self.phases[name] = seconds
+            metrics.set_gauge("startup_phase_seconds", seconds, phase=name)
+
+    def reset(self) -> None:
+        """Forget recorded phases"""
+        self.phases.clear()
+
+
+# Global instance, filled in by the application lifespan
+startup_timer = StartupTimer()
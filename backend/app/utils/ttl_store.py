@@ -0,0 +1,130 @@
+"""
+In-memory key/value store with per-entry expiry.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class TTLStore:
+    """
+    Dict-like store whose entries expire.
+
+    Expiry times are kept in a min-heap, so sweeping expired entries and evicting the
+    soonest-to-expire entry when max_size is exceeded only touch the entries involved.
+    Overwritten and deleted keys leave stale heap nodes behind; they are skipped when
+    popped and compacted away once they outnumber live entries.
+    Expired entries are never returned, even before a sweep removes them.
+    """
+
+    def __init__(self, default_ttl: float = 3600, max_size: int = 100000):
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self._entries: Dict[Any, Tuple[float, Any]] = {}
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None, expires_at: Optional[float] = None) -> None:
+        """Store a value until `expires_at` (Unix time), or for `ttl` seconds"""
+        if expires_at is None:
+            expires_at = time.time() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            heapq.heappush(self._heap, (expires_at, next(self._counter), key))
+            while len(self._entries) > self.max_size:
+                self._pop_soonest()
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._compact()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """The live value for a key, or default"""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            return default
+        return entry[1]
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        """Remove a key and return its live value, or default"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None or entry[0] <= time.time():
+            return default
+        return entry[1]
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Remove expired entries. Returns how many were removed."""
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, _, key = heapq.heappop(self._heap)
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == expires_at:
+                    del self._entries[key]
+                    removed += 1
+        return removed
+
+    def _pop_soonest(self) -> None:
+        """Evict the live entry that expires first. Caller must hold the lock."""
+        while self._heap:
+            expires_at, _, key = heapq.heappop(self._heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                del self._entries[key]
+                return
+
+    def _compact(self) -> None:
+        """Rebuild the heap from live entries. Caller must hold the lock."""
+        self._heap = [(expires_at, next(self._counter), key) for key, (expires_at, _) in self._entries.items()]
+        heapq.heapify(self._heap)
+
+    async def _sweep_periodically(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def start_sweeper(self, interval: float = 60) -> None:
+        """Sweep expired entries every `interval` seconds on the running event loop"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_periodically(interval))
+
+    def stop_sweeper(self) -> None:
+        """Cancel the periodic sweep"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+
+    def __getitem__(self, key: Any) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.time():
+            raise KeyError(key)
+        return entry[1]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        with self._lock:
+            del self._entries[key]
+
+    def __contains__(self, key: Any) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.time()
+
+    def __len__(self) -> int:
+        """Number of stored entries, including expired ones not yet swept"""
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._entries))
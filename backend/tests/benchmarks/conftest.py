@@ -0,0 +1,19 @@
+"""
+Shared fixtures for the benchmark suite.
+Benchmarks run with the regular test suite, so they use small iteration counts and
+only assert generous upper bounds; the printed timings are the interesting output
+(run with `pytest tests/benchmarks -s`).
+"""
+from typing import Optional
+import pytest
+
+
+@pytest.fixture
+def report():
+    """Print a benchmark result line, with the throughput when `rate_unit` names what an op is"""
+    def _report(name: str, seconds: float, rate_unit: Optional[str] = None) -> None:
+        line = f"\n[benchmark] {name}: {seconds * 1e6:.2f} us/op"
+        if rate_unit:
+            line += f" ({1 / seconds:,.0f} {rate_unit}/s)"
+        print(line)
+    return _report
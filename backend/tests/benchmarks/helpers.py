@@ -0,0 +1,14 @@
+"""
+Timing helpers for the benchmark suite.
+"""
+import time
+
+
+def measure(fn, iterations: int = 2000, warmup: int = 100) -> float:
+    """Mean seconds per call of fn()"""
+    for _ in range(warmup):
+        fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations
@@ -0,0 +1,63 @@
+"""
+Benchmarks for configuration lookups on request paths.
+"""
+import os
+import pytest
+from app.core.config_service import ConfigService
+from tests.benchmarks.helpers import measure
+
+pytestmark = pytest.mark.benchmark
+
+
+def _nested_lookup(config, aws_secrets, secrets, key, default=None):
+    """Lookup as ConfigService.get did before the flattened snapshot, for comparison"""
+    if key in config:
+        return config[key]
+    if aws_secrets and "." in key:
+        value = aws_secrets
+        for part in key.split("."):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                break
+        else:
+            return value
+    if aws_secrets and key in aws_secrets:
+        return aws_secrets[key]
+    if "." in key:
+        value = secrets
+        for part in key.split("."):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            else:
+                return default
+        return value
+    return secrets.get(key, default)
+
+
+@pytest.fixture(scope="module")
+def service():
+    service = ConfigService()
+    service.snapshot
+    return service
+
+
+def test_dotted_lookup(service, report):
+    nested = measure(lambda: _nested_lookup(
+        service._config, service._aws_secrets, service._secrets, "database.port", 5432
+    ), iterations=20000)
+    flattened = measure(lambda: service.get("database.port", 5432), iterations=20000)
+
+    report("config dotted lookup (nested walk)", nested)
+    report("config dotted lookup (snapshot)", flattened)
+    assert flattened < 20e-6
+
+
+def test_hot_path_check(service, report):
+    getenv = measure(lambda: os.getenv("USE_MOCK_COGNITO", "false").lower() == "true", iterations=20000)
+    snapshot = service.snapshot
+    attribute = measure(lambda: snapshot.use_mock_cognito, iterations=20000)
+
+    report("use_mock_cognito (os.getenv)", getenv)
+    report("use_mock_cognito (snapshot attribute)", attribute)
+    assert attribute < 20e-6
@@ -0,0 +1,85 @@
+"""
+Import-time budget for the modules every entry point loads.
+Each measurement runs in a fresh interpreter so nothing is already imported.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Generous enough for slow CI machines; IMPORT_TIME_BUDGET / STARTUP_TIME_BUDGET override them (seconds)
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "2.0"))
+STARTUP_TIME_BUDGET = float(os.getenv("STARTUP_TIME_BUDGET", "4.0"))
+
+# Modules that must only be imported when they are actually used
+HEAVY_MODULES = ("boto3", "botocore", "fastapi", "jose", "requests", "yaml")
+
+MEASURE_IMPORT = """
+import sys, time
+started = time.perf_counter()
+import {module}
+heavy = ",".join(sorted(name for name in {heavy!r} if name in sys.modules))
+print(f"{{time.perf_counter() - started}};{{heavy}}")
+"""
+
+
+def _import_in_subprocess(module: str):
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_IMPORT.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "APP_ENV": "test", "USE_MOCK_COGNITO": "true"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    seconds, heavy_modules = result.stdout.strip().splitlines()[-1].split(";")
+    return float(seconds), set(filter(None, heavy_modules.split(",")))
+
+
+def test_import_app_db_within_budget(report):
+    """CLI commands, migrations and test collection all import app.db"""
+    seconds, heavy_modules = _import_in_subprocess("app.db")
+
+    report("import app.db", seconds)
+    # Secret sources, AWS clients and the web app are only loaded when used
+    assert heavy_modules == set()
+    assert seconds < IMPORT_TIME_BUDGET
+
+
+def test_import_config_service_within_budget(report):
+    seconds, heavy_modules = _import_in_subprocess("app.core.config_service")
+
+    report("import app.core.config_service", seconds)
+    assert heavy_modules == set()
+    assert seconds < IMPORT_TIME_BUDGET
+
+
+def test_import_app_main_within_budget(report):
+    """Worker cold start with the mock provider; the secrets file is read for Settings"""
+    seconds, heavy_modules = _import_in_subprocess("app.main")
+
+    report("import app.main", seconds)
+    assert heavy_modules <= {"fastapi", "yaml"}
+    assert seconds < STARTUP_TIME_BUDGET
+
+
+def test_import_db_commands_within_budget(report):
+    seconds, heavy_modules = _import_in_subprocess("app.commands.db_commands")
+
+    report("import app.commands.db_commands", seconds)
+    assert heavy_modules & {"boto3", "jose", "requests"} == set()
+    assert seconds < STARTUP_TIME_BUDGET
+
+
+def test_import_cognito_service_does_not_load_boto3(report):
+    """The Cognito client (and boto3) is created on first use or at startup"""
+    seconds, heavy_modules = _import_in_subprocess("app.services.cognito_service")
+
+    report("import app.services.cognito_service", seconds)
+    assert "boto3" not in heavy_modules
+    assert "requests" not in heavy_modules
@@ -0,0 +1,167 @@
+"""
+Benchmarks for logging overhead on request paths.
+"""
+import io
+import os
+import sys
+import pytest
+from loguru import logger as loguru_logger
+from app.core.log_sinks import FAST_JSON_ENCODER, JsonLogSink, exception_format
+from app.core.logging_service import LogConfig, LogLevel, LogProfile, LoggingService, logging_service, get_logger
+from app.core.request_context import close_request_context, open_request_context
+from tests.benchmarks.helpers import measure
+
+pytestmark = pytest.mark.benchmark
+
+
+class NullStream(io.TextIOBase):
+    """Stream that discards output, so only the logging work is measured"""
+
+    def write(self, text):
+        return len(text)
+
+
+@pytest.fixture
+def info_logging():
+    """JSON console logging at INFO into a discarding stream"""
+    original_stdout = sys.stdout
+    sys.stdout = NullStream()
+    try:
+        LoggingService(LogConfig(level=LogLevel.INFO, json_format=True))
+    finally:
+        sys.stdout = original_stdout
+    yield
+    logging_service.update_config(logging_service.config)
+
+
+def test_request_logging_overhead(info_logging, report):
+    """The records one authenticated user lookup request writes, before and after"""
+    legacy = loguru_logger.bind(name="benchmark")
+    logger = get_logger("benchmark")
+    method, path, user_id, username = "GET", "/api/v1/users/42", 42, "alice"
+
+    def eager_request():
+        # Every message was an f-string behind opt(depth=1), built whether emitted or not
+        legacy.opt(depth=1).info(f"Request started: {method} {path}", event="request_started")
+        legacy.opt(depth=1).debug(f"Cognito token validated successfully for user: {username}")
+        legacy.opt(depth=1).debug(f"Getting user by ID: {user_id}")
+        legacy.opt(depth=1).info(f"Request completed: {method} {path} - 200", event="request_completed")
+
+    def lazy_request():
+        logger.info("Request started: {} {}", method, path, event="request_started")
+        logger.debug("Cognito token validated successfully for user: {}", username)
+        logger.debug("Getting user by ID: {}", user_id)
+        logger.info("Request completed: {} {} - {}", method, path, 200, event="request_completed")
+
+    # Both emit the same two INFO records; only the disabled DEBUG calls differ
+    eager = measure(eager_request, iterations=2000)
+    lazy = measure(lazy_request, iterations=2000)
+
+    report("request logging (eager f-strings, lookups at DEBUG)", eager)
+    report("request logging (lazy, lookups at DEBUG)", lazy)
+    assert lazy < 0.01
+
+
+def test_disabled_level(info_logging, report):
+    logger = get_logger("benchmark")
+    user_id = 42
+
+    eager = measure(lambda: loguru_logger.opt(depth=1).debug(f"Getting user by ID: {user_id}"), iterations=20000)
+    lazy = measure(lambda: logger.debug("Getting user by ID: {}", user_id), iterations=20000)
+
+    report("disabled debug (loguru opt + f-string)", eager)
+    report("disabled debug (Logger fast path)", lazy)
+    assert lazy < 0.001
+
+
+@pytest.fixture
+def devnull():
+    """A text stream over os.devnull, like a redirected stdout; loguru handlers are restored after"""
+    stream = open(os.devnull, "w")
+    loguru_logger.remove()
+    yield stream
+    loguru_logger.remove()
+    stream.close()
+    logging_service.update_config(logging_service.config)
+
+
+def test_json_records_per_second(devnull, report):
+    record_logger = loguru_logger.bind(name="benchmark", request_id="0f8fad5b-d9cb-469f-a165-70867728950e")
+
+    def log_record():
+        record_logger.info("Request completed: {} {} - {}", "GET", "/api/v1/users/42", 200,
+                           event="request_completed", status_code=200, process_time_ms=3.2)
+
+    handler_id = loguru_logger.add(devnull, format="{message}", serialize=True)
+    builtin = measure(log_record, iterations=5000)
+    loguru_logger.remove(handler_id)
+
+    sink = JsonLogSink(devnull)
+    handler_id = loguru_logger.add(sink, format=exception_format)
+    flat = measure(log_record, iterations=5000)
+    loguru_logger.remove(handler_id)
+    sink.stop()
+
+    report("JSON record (loguru serialize=True)", builtin, rate_unit="records")
+    encoder = "orjson" if FAST_JSON_ENCODER else "stdlib json"
+    report(f"JSON record (JsonLogSink, {encoder})", flat, rate_unit="records")
+    assert flat < 0.01
+
+
+def _raise_nested(depth: int, request_payload: dict) -> str:
+    if depth:
+        return _raise_nested(depth - 1, request_payload)
+    return request_payload["missing_field"]
+
+
+@pytest.mark.parametrize("profile", [LogProfile.DEVELOPMENT, LogProfile.PRODUCTION])
+def test_exception_logging(profile, report):
+    """Logging a caught exception from a few frames deep, as request handlers do"""
+    original_stdout = sys.stdout
+    sys.stdout = NullStream()
+    try:
+        LoggingService(LogConfig(level=LogLevel.INFO, json_format=True, profile=profile))
+    finally:
+        sys.stdout = original_stdout
+    logger = get_logger("benchmark")
+    payload = {"email": "alice@example.com", "fields": list(range(20))}
+
+    def log_failure():
+        try:
+            _raise_nested(5, payload)
+        except KeyError:
+            logger.exception("Request failed")
+
+    try:
+        seconds = measure(log_failure, iterations=300, warmup=10)
+    finally:
+        logging_service.update_config(logging_service.config)
+
+    report(f"logged exception ({profile.value} profile)", seconds)
+    assert seconds < 0.05
+
+
+def test_request_correlation(info_logging, report):
+    """Attaching the request ID to a request's records: bound logger vs request context"""
+    logger = get_logger("benchmark")
+    request_id = "0f8fad5b-d9cb-469f-a165-70867728950e"
+
+    def bound_logger():
+        req_logger = logger.bind(request_id=request_id)
+        req_logger.info("Request started")
+        req_logger.info("Request completed")
+
+    def request_context():
+        token = open_request_context(request_id, "/api/v1/users/42")
+        try:
+            logger.info("Request started")
+            logger.info("Request completed")
+        finally:
+            close_request_context(token)
+
+    bound = measure(bound_logger, iterations=2000)
+    context = measure(request_context, iterations=2000)
+
+    report("request correlation (Logger.bind per request)", bound)
+    report("request correlation (request context)", context)
+    assert context < 0.001
@@ -0,0 +1,43 @@
+"""
+Benchmarks for the overhead the rate limiter adds to sign in / sign up.
+"""
+import itertools
+import pytest
+from app.crud.rate_limit_bucket import RateLimitBucketDAO
+from app.services.rate_limit_service import (
+    DatabaseRateLimitBackend, InMemoryRateLimitBackend, RateLimitRule, RateLimitService
+)
+from tests.benchmarks.helpers import measure
+
+pytestmark = pytest.mark.benchmark
+
+
+def _service(backend):
+    # Rules generous enough that nothing is rejected while measuring
+    return RateLimitService(
+        backend,
+        ip_rule=RateLimitRule("ip", 1e9, 1e9),
+        email_rule=RateLimitRule("email", 1e9, 1e9),
+        global_rule=RateLimitRule("global", 1e9, 1e9),
+    )
+
+
+def test_in_memory_limiter_overhead(report):
+    """All three buckets checked in process"""
+    service = _service(InMemoryRateLimitBackend())
+    emails = itertools.cycle([f"user{i}@example.com" for i in range(1000)])
+
+    seconds = measure(lambda: service.check(None, "signin", client_ip="10.0.0.1", email=next(emails)))
+    report("rate limit check (memory)", seconds)
+    assert seconds < 200e-6
+
+
+def test_database_limiter_overhead(report, db):
+    """All three buckets checked with one upsert each against SQLite"""
+    service = _service(DatabaseRateLimitBackend(RateLimitBucketDAO()))
+    emails = itertools.cycle([f"user{i}@example.com" for i in range(100)])
+
+    seconds = measure(lambda: service.check(db, "signin", client_ip="10.0.0.1", email=next(emails)),
+                      iterations=200, warmup=20)
+    report("rate limit check (database, sqlite)", seconds)
+    assert seconds < 50e-3
@@ -20,6 +20,10 @@ from app.services.user_service import UserService
 from app.core.service_factory import get_cognito_service, get_jwt_validator
 from app.services.mock_cognito_service import mock_cognito_service
 from app.core.mock_jwt_utils import mock_jwt_validator
+from app.core.principal_cache import principal_cache
+from app.services.token_revocation_service import token_revocation_service
+from app.routers.auth import refresh_flight
+from app.services.rate_limit_service import rate_limit_service
 
 # Set test environment - must be done before importing app modules
 os.environ["APP_ENV"] = "test"
@@ -79,6 +83,38 @@ def override_get_db():
 test_app.dependency_overrides[get_db] = override_get_db
 
 
+@pytest.fixture(autouse=True)
+def reset_principal_cache():
+    """Drop cached principals so users don't leak between tests sharing a database."""
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_token_revocations():
+    """Drop in-process revocation state; the revoked_tokens table is recreated per test."""
+    token_revocation_service.reset()
+    yield
+    token_revocation_service.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_refresh_flight():
+    """Drop refresh results cached for coalescing so they don't leak between tests."""
+    refresh_flight.clear()
+    yield
+    refresh_flight.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Refill in-process rate limit buckets so tests don't throttle each other."""
+    rate_limit_service.reset()
+    yield
+    rate_limit_service.reset()
+
+
 @pytest.fixture
 def db():
     """Create a test database session."""
@@ -115,8 +151,8 @@ def client():
 @pytest.fixture
 def mock_cognito():
     """Create a clean mock Cognito service for testing."""
-    # Clear tokens only, users are in database
-    mock_cognito_service._tokens.clear()
+    # Clear tokens and cached users only, users are in database
+    mock_cognito_service.clear_all_users()
 
     # Patch the SessionLocal to use the test database session
     import app.services.mock_cognito_service as mock_cognito_module
@@ -133,7 +169,7 @@ def mock_cognito():
     # Restore original SessionLocal
     mock_cognito_module.SessionLocal = original_cognito_session_local
     db_module.SessionLocal = original_db_session_local
-    mock_cognito_service._tokens.clear()
+    mock_cognito_service.clear_all_users()
 
 
 @pytest.fixture
@@ -183,6 +219,31 @@ def test_user(db):
     }
 
 
+@pytest.fixture
+def make_rsa_keypair():
+    """Factory for an RSA private key PEM and the matching public JWKS, for signing test JWTs."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from jose import jwk
+
+    def _make(kid):
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        private_pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode("utf-8")
+        public_pem = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode("utf-8")
+        public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+        public_jwk["kid"] = kid
+        return private_pem, {"keys": [public_jwk]}
+
+    return _make
+
+
 @pytest.fixture
 def event_loop():
     """Create an instance of the default event loop for the test session."""
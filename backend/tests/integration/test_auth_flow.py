@@ -104,3 +104,25 @@ class TestAuthFlow:
 
 
 
+
+    def test_signout_revokes_token(self, client: TestClient, test_user, mock_cognito):
+        """Test that a signed-out access token can no longer be used"""
+        signin_response = client.post("/api/v1/auth/signin", json={
+            "email": test_user["email"],
+            "password": test_user["password"]
+        })
+        assert signin_response.status_code == 200
+        headers = {"Authorization": f"Bearer {signin_response.json()['access_token']}"}
+
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+        response = client.post("/api/v1/auth/signout", headers=headers)
+        assert response.status_code == 200
+
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+
+    def test_signout_without_token(self, client: TestClient):
+        """Test that signout succeeds even without a token"""
+        response = client.post("/api/v1/auth/signout")
+
+        assert response.status_code == 200
@@ -86,3 +86,22 @@ class TestAuthEndpoints:
         assert response.status_code == 500
         data = response.json()
         assert "detail" in data
+
+    def test_signup_with_username_taken_returns_409(self, client, mock_cognito):
+        """Test that an email already used as another user's username is a 409, not a 500."""
+        from app.models.user import User
+
+        db = TestingSessionLocal()
+        try:
+            db.add(User(username="taken@example.com", email="owner@example.com", role=UserRole.USER))
+            db.commit()
+        finally:
+            db.close()
+
+        response = client.post("/api/v1/auth/signup", json={
+            "email": "taken@example.com",
+            "password": "TestPass123!"
+        })
+
+        assert response.status_code == 409
+        assert "already taken" in response.json()["detail"]
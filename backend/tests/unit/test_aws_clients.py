@@ -0,0 +1,73 @@
+"""
+Unit tests for the shared AWS client factory.
+"""
+import threading
+from app.core.aws_clients import AWSClientFactory, build_client_config
+
+
+class TestAWSClientFactory:
+    """Test cases for AWSClientFactory"""
+
+    def test_client_cached_per_service_and_region(self):
+        factory = AWSClientFactory()
+
+        first = factory.get_client("cognito-idp", region_name="us-east-1")
+        second = factory.get_client("cognito-idp", region_name="us-east-1")
+        other_region = factory.get_client("cognito-idp", region_name="eu-west-1")
+        other_service = factory.get_client("secretsmanager", region_name="us-east-1")
+
+        assert first is second
+        assert first is not other_region
+        assert first is not other_service
+
+    def test_client_cached_per_secret(self):
+        factory = AWSClientFactory()
+        credentials = {"region_name": "us-east-1", "aws_access_key_id": "AKIDEXAMPLE"}
+
+        first = factory.get_client("cognito-idp", aws_secret_access_key="secret-1", **credentials)
+        same = factory.get_client("cognito-idp", aws_secret_access_key="secret-1", **credentials)
+        rotated = factory.get_client("cognito-idp", aws_secret_access_key="secret-2", **credentials)
+        other_token = factory.get_client(
+            "cognito-idp", aws_secret_access_key="secret-1", aws_session_token="token-1", **credentials
+        )
+
+        assert first is same
+        assert first is not rotated
+        assert first is not other_token
+        assert all("secret-1" not in str(key) for key in factory._clients)
+
+    def test_clients_share_tuned_config(self, monkeypatch):
+        monkeypatch.setenv("AWS_MAX_POOL_CONNECTIONS", "64")
+        factory = AWSClientFactory()
+
+        client = factory.get_client("cognito-idp", region_name="us-east-1")
+        config = client.meta.config
+
+        assert config.max_pool_connections == 64
+        assert config.retries["mode"] == "adaptive"
+        assert config.tcp_keepalive is True
+        assert config.connect_timeout == 2
+        assert config.read_timeout == 5
+
+    def test_concurrent_get_creates_single_client(self):
+        factory = AWSClientFactory(config=build_client_config())
+        results = []
+
+        def get_client():
+            results.append(factory.get_client("secretsmanager", region_name="us-east-1"))
+
+        threads = [threading.Thread(target=get_client) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(client) for client in results}) == 1
+
+    def test_clear_drops_cached_clients(self):
+        factory = AWSClientFactory()
+        first = factory.get_client("cognito-idp", region_name="us-east-1")
+
+        factory.clear()
+
+        assert factory.get_client("cognito-idp", region_name="us-east-1") is not first
@@ -0,0 +1,151 @@
+"""
+Unit tests for the circuit breaker and its use around Cognito calls.
+"""
+import pytest
+from unittest.mock import Mock
+from botocore.exceptions import ClientError
+import app.utils.circuit_breaker as breaker_module
+from app.core.exceptions import CognitoError, ServiceUnavailableError
+from app.core.metrics import MetricsRegistry
+from app.core.service_factory import service_container
+from app.services.cognito_service import CognitoService
+from app.utils.circuit_breaker import CircuitBreaker
+
+
+def _client_error(code, operation="InitiateAuth"):
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(breaker_module, "metrics", registry)
+    return registry
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker state transitions"""
+
+    def test_opens_after_consecutive_failures(self, registry):
+        breaker = CircuitBreaker("test", failure_threshold=3, recovery_timeout=30)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_call()
+        assert 1 <= breaker.retry_after() <= 30
+        assert registry.get_gauge("circuit_breaker_state", breaker="test") == 2
+        assert registry.get_counter(
+            "circuit_breaker_transitions_total", breaker="test", from_state="closed", to_state="open"
+        ) == 1
+
+    def test_half_open_probe_closes_on_success(self, registry, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(breaker_module.time, "monotonic", lambda: now[0])
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=10)
+
+        breaker.record_failure()
+        now[0] += 10
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        # Only one probe at a time
+        assert breaker.allow_call()
+        assert not breaker.allow_call()
+
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow_call()
+        assert registry.get_gauge("circuit_breaker_state", breaker="test") == 0
+
+    def test_half_open_probe_reopens_on_failure(self, registry, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(breaker_module.time, "monotonic", lambda: now[0])
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=10)
+
+        breaker.record_failure()
+        now[0] += 10
+        assert breaker.allow_call()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.retry_after() == 10
+        assert registry.get_counter(
+            "circuit_breaker_transitions_total", breaker="test", from_state="half_open", to_state="open"
+        ) == 1
+
+    def test_lost_probe_does_not_wedge_circuit(self, registry, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(breaker_module.time, "monotonic", lambda: now[0])
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=10)
+
+        breaker.record_failure()
+        now[0] += 10
+        assert breaker.allow_call()  # probe never reports back
+        now[0] += 10
+        assert breaker.allow_call()
+
+
+class TestCognitoCircuitBreaker:
+    """Test cases for the breaker wrapped around CognitoService calls"""
+
+    @pytest.fixture
+    def cognito_service(self, registry):
+        service = CognitoService()
+        service.client = Mock()
+        service.config = {
+            "user_pool_id": "test_pool_id",
+            "client_id": "test_client_id",
+            "client_secret": "",
+            "region": "us-east-1"
+        }
+        service.breaker = CircuitBreaker("cognito", failure_threshold=2, recovery_timeout=30)
+        return service
+
+    @pytest.mark.asyncio
+    async def test_throttling_opens_circuit_and_fails_fast(self, cognito_service):
+        """Test that throttled calls open the circuit and later calls skip Cognito"""
+        cognito_service.client.initiate_auth.side_effect = _client_error("TooManyRequestsException")
+
+        for _ in range(2):
+            with pytest.raises(CognitoError):
+                await cognito_service.sign_in("user@example.com", "password")
+
+        with pytest.raises(ServiceUnavailableError) as exc_info:
+            await cognito_service.sign_in("user@example.com", "password")
+        assert exc_info.value.retry_after >= 1
+        assert cognito_service.client.initiate_auth.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_client_errors_do_not_open_circuit(self, cognito_service):
+        """Test that bad credentials count as a healthy Cognito response"""
+        cognito_service.client.initiate_auth.side_effect = _client_error("NotAuthorizedException")
+
+        for _ in range(5):
+            with pytest.raises(CognitoError) as exc_info:
+                await cognito_service.sign_in("user@example.com", "wrong")
+            assert not isinstance(exc_info.value, ServiceUnavailableError)
+
+        assert cognito_service.breaker.state == CircuitBreaker.CLOSED
+
+    def test_open_circuit_returns_503_with_retry_after(self, client, cognito_service):
+        """Test that the sign in endpoint maps an open circuit to 503"""
+        cognito_service.breaker.record_failure()
+        cognito_service.breaker.record_failure()
+        service_container.override(cognito_service=cognito_service)
+        try:
+            response = client.post("/api/v1/auth/signin", json={
+                "email": "user@example.com",
+                "password": "TestPass123!"
+            })
+        finally:
+            service_container.reset()
+
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        cognito_service.client.initiate_auth.assert_not_called()
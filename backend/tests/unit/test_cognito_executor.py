@@ -0,0 +1,119 @@
+"""
+Unit tests for running CognitoService calls on its bounded executor.
+"""
+import asyncio
+import threading
+import pytest
+from unittest.mock import Mock
+from app.core.exceptions import CognitoError
+from app.core.metrics import MetricsRegistry
+from app.services.cognito_service import CognitoService
+
+
+class TestCognitoExecutor:
+    """Test cases for CognitoService._call"""
+
+    @pytest.fixture
+    def cognito_service(self):
+        service = CognitoService()
+        service.client = Mock()
+        service.config = {
+            "user_pool_id": "test_pool_id",
+            "client_id": "test_client_id",
+            "client_secret": "",
+            "region": "us-east-1"
+        }
+        return service
+
+    @pytest.mark.asyncio
+    async def test_client_calls_run_off_the_event_loop(self, cognito_service):
+        """Test that blocking boto3 calls execute on the Cognito thread pool"""
+        thread_names = []
+
+        def get_user(**kwargs):
+            thread_names.append(threading.current_thread().name)
+            return {"Username": "user", "UserAttributes": [{"Name": "sub", "Value": "abc"}]}
+
+        cognito_service.client.get_user.side_effect = get_user
+
+        result = await cognito_service.get_user_info("access-token")
+
+        assert result["user_sub"] == "abc"
+        assert thread_names[0].startswith("cognito")
+        assert thread_names[0] != threading.current_thread().name
+
+    @pytest.mark.asyncio
+    async def test_event_loop_not_blocked_during_call(self, cognito_service):
+        """Test that other coroutines progress while a Cognito call is in flight"""
+        release = threading.Event()
+        cognito_service.client.get_user.side_effect = lambda **kwargs: (
+            release.wait(5) and {"Username": "user", "UserAttributes": []}
+        )
+
+        call = asyncio.create_task(cognito_service.get_user_info("access-token"))
+        await asyncio.sleep(0.05)
+        assert not call.done()
+        release.set()
+
+        assert (await call)["username"] == "user"
+
+    @pytest.mark.asyncio
+    async def test_calls_beyond_queue_depth_are_rejected(self, cognito_service, monkeypatch):
+        """Test that a full queue fails fast instead of piling up"""
+        import app.services.cognito_service as cognito_module
+        registry = MetricsRegistry()
+        monkeypatch.setattr(cognito_module, "metrics", registry)
+        cognito_service.max_concurrency = 1
+        cognito_service.max_queue_depth = 0
+
+        release = threading.Event()
+        cognito_service.client.get_user.side_effect = lambda **kwargs: (
+            release.wait(5) and {"Username": "user", "UserAttributes": []}
+        )
+
+        first = asyncio.create_task(cognito_service.get_user_info("token-1"))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(CognitoError) as exc_info:
+            await cognito_service.get_user_info("token-2")
+        assert exc_info.value.error_code == "TooManyRequestsException"
+        assert registry.get_counter("cognito_calls_rejected_total", operation="get_user", reason="bulkhead") == 1
+        assert registry.get_gauge("cognito_calls_in_flight") == 1
+
+        release.set()
+        await first
+        assert registry.get_gauge("cognito_calls_in_flight") == 0
+        assert registry.get_counter("cognito_calls_total", operation="get_user") == 1
+
+    @pytest.mark.asyncio
+    async def test_id_token_verification_shares_the_bulkhead(self, cognito_service, monkeypatch):
+        """Test that ID token verification is admitted, counted and rejected like client calls"""
+        import app.services.cognito_service as cognito_module
+        registry = MetricsRegistry()
+        monkeypatch.setattr(cognito_module, "metrics", registry)
+        cognito_service.max_concurrency = 1
+        cognito_service.max_queue_depth = 0
+
+        release = threading.Event()
+        validator = Mock()
+        validator.verify_token_claims.side_effect = lambda token: (
+            release.wait(5) and {"token_use": "id", "sub": "abc", "email": "user@example.com"}
+        )
+        monkeypatch.setattr(cognito_module, "jwt_validator", validator)
+
+        first = asyncio.create_task(cognito_service.get_user_info_from_tokens({"id_token": "id-1"}))
+        await asyncio.sleep(0.01)
+        assert registry.get_gauge("cognito_calls_in_flight") == 1
+
+        with pytest.raises(CognitoError) as exc_info:
+            await cognito_service.get_user_info_from_tokens({"id_token": "id-2", "access_token": "access-2"})
+        assert exc_info.value.error_code == "TooManyRequestsException"
+        assert registry.get_counter(
+            "cognito_calls_rejected_total", operation="verify_id_token", reason="bulkhead"
+        ) == 1
+        cognito_service.client.get_user.assert_not_called()
+
+        release.set()
+        assert (await first)["user_sub"] == "abc"
+        assert registry.get_gauge("cognito_calls_in_flight") == 0
+        assert registry.get_counter("cognito_calls_total", operation="verify_id_token") == 1
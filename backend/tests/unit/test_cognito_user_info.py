@@ -0,0 +1,87 @@
+"""
+Unit tests for deriving sign-in user info from the Cognito ID token.
+"""
+import time
+import pytest
+from unittest.mock import Mock
+from jose import jwt as jose_jwt
+from app.core.jwt_utils import JWTValidator, StaticKeySource, TokenIssuer
+from app.services.cognito_service import CognitoService
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/test_pool_id"
+
+
+class TestCognitoUserInfoFromTokens:
+    """Test cases for CognitoService.get_user_info_from_tokens"""
+
+    @pytest.fixture
+    def signing_key(self, make_rsa_keypair, monkeypatch):
+        """Register a test issuer on a fresh validator used by the Cognito service"""
+        import app.services.cognito_service as cognito_module
+        private_pem, jwks = make_rsa_keypair("test-kid")
+        validator = JWTValidator()
+        validator._issuers.clear()
+        validator.register_issuer(TokenIssuer(ISSUER, StaticKeySource(jwks), client_id="test_client_id"))
+        monkeypatch.setattr(cognito_module, "jwt_validator", validator)
+        return private_pem
+
+    @pytest.fixture
+    def cognito_service(self):
+        service = CognitoService()
+        service.client = Mock()
+        service.client.get_user.return_value = {
+            "Username": "from-get-user",
+            "UserAttributes": [
+                {"Name": "sub", "Value": "get-user-sub"},
+                {"Name": "email", "Value": "user@example.com"},
+            ]
+        }
+        return service
+
+    def _id_token(self, private_pem, **overrides):
+        claims = {
+            "iss": ISSUER,
+            "aud": "test_client_id",
+            "token_use": "id",
+            "sub": "id-token-sub",
+            "email": "user@example.com",
+            "email_verified": True,
+            "name": "Test User",
+            "cognito:username": "user@example.com",
+            "exp": int(time.time()) + 300,
+        }
+        claims.update(overrides)
+        return jose_jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": "test-kid"})
+
+    @pytest.mark.asyncio
+    async def test_user_info_read_from_id_token(self, cognito_service, signing_key):
+        """Test that a valid ID token avoids the GetUser round trip"""
+        tokens = {"access_token": "access", "id_token": self._id_token(signing_key)}
+
+        user_info = await cognito_service.get_user_info_from_tokens(tokens)
+
+        cognito_service.client.get_user.assert_not_called()
+        assert user_info["user_sub"] == "id-token-sub"
+        assert user_info["email"] == "user@example.com"
+        assert user_info["name"] == "Test User"
+        assert user_info["email_verified"] is True
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_claims_missing(self, cognito_service, signing_key):
+        """Test that GetUser is used when the ID token lacks the email claim"""
+        tokens = {"access_token": "access", "id_token": self._id_token(signing_key, email=None)}
+
+        user_info = await cognito_service.get_user_info_from_tokens(tokens)
+
+        cognito_service.client.get_user.assert_called_once_with(AccessToken="access")
+        assert user_info["user_sub"] == "get-user-sub"
+
+    @pytest.mark.asyncio
+    async def test_falls_back_when_id_token_invalid(self, cognito_service, signing_key):
+        """Test that an unverifiable ID token is never trusted"""
+        tokens = {"access_token": "access", "id_token": self._id_token(signing_key, aud="other-client")}
+
+        user_info = await cognito_service.get_user_info_from_tokens(tokens)
+
+        cognito_service.client.get_user.assert_called_once()
+        assert user_info["user_sub"] == "get-user-sub"
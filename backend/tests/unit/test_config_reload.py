@@ -0,0 +1,191 @@
+"""
+Unit tests for configuration hot reload.
+"""
+import asyncio
+import os
+import signal
+import pytest
+from app.core.config_reload import ConfigReloader
+from app.core.config_service import ConfigService
+from app.core.jwt_utils import JWTValidator
+
+
+@pytest.fixture
+def secrets():
+    """Contents served by the patched secrets file loader"""
+    return {"database": {"password": "first"}, "security": {"secret_key": "key-1"}}
+
+
+@pytest.fixture
+def service(monkeypatch, secrets):
+    def load_secrets(self):
+        if secrets.get("broken"):
+            return
+        self._secrets = {key: value for key, value in secrets.items()}
+
+    monkeypatch.setattr(ConfigService, "_load_secrets", load_secrets)
+    service = ConfigService()
+    service.snapshot
+    return service
+
+
+class TestConfigServiceReload:
+    """Test cases for ConfigService.reload"""
+
+    def test_reload_swaps_snapshot_and_reports_changes(self, service, secrets):
+        before = service.snapshot
+        secrets["database"] = {"password": "rotated"}
+
+        changed = service.reload()
+
+        assert {"database", "database.password"} <= changed
+        assert service.get("database.password") == "rotated"
+        assert service.snapshot is not before
+        assert before.get("database.password") == "first"
+
+    def test_unchanged_reload_notifies_nobody(self, service):
+        calls = []
+        service.subscribe(lambda old, new, changed: calls.append(changed))
+
+        assert service.reload() == frozenset()
+        assert calls == []
+
+    def test_subscribers_filtered_by_keys(self, service, secrets):
+        security_calls, logging_calls = [], []
+        service.subscribe(lambda old, new, changed: security_calls.append(new), keys=("secret_key",))
+        service.subscribe(lambda old, new, changed: logging_calls.append(new), keys=("log_level",))
+        secrets["security"] = {"secret_key": "key-2"}
+
+        service.reload()
+
+        assert [snapshot.secret_key for snapshot in security_calls] == ["key-2"]
+        assert logging_calls == []
+
+    def test_failing_subscriber_does_not_block_others(self, service, secrets):
+        calls = []
+
+        def broken(old, new, changed):
+            raise RuntimeError("boom")
+
+        service.subscribe(broken)
+        service.subscribe(lambda old, new, changed: calls.append(changed))
+        secrets["security"] = {"secret_key": "key-2"}
+
+        service.reload()
+
+        assert len(calls) == 1
+        assert service.get_secret_key() == "key-2"
+
+    def test_failed_source_keeps_previous_values(self, service, secrets):
+        secrets["broken"] = True
+
+        service.reload()
+
+        assert service.get("database.password") == "first"
+
+    def test_env_file_reload_respects_process_environment(self, service, tmp_path, monkeypatch):
+        monkeypatch.setenv("LOG_LEVEL", "INFO")
+        env_file = tmp_path / ".env"
+        env_file.write_text("LOG_LEVEL=DEBUG\nCONFIG_TEST_RELOAD_FLAG=on\n")
+        service._env_file = env_file
+
+        try:
+            service.reload()
+            assert os.environ["CONFIG_TEST_RELOAD_FLAG"] == "on"
+            assert service.get("log_level") == "INFO"
+        finally:
+            os.environ.pop("CONFIG_TEST_RELOAD_FLAG", None)
+
+
+class FakeConfigService:
+    """Records reloads triggered by ConfigReloader"""
+
+    def __init__(self, paths):
+        self.paths = paths
+        self.reloads = []
+
+    def watched_files(self):
+        return self.paths
+
+    def reload(self, refresh_aws_secrets=True):
+        self.reloads.append(refresh_aws_secrets)
+        return frozenset({"log_level"})
+
+
+class TestConfigReloader:
+    """Test cases for ConfigReloader triggers"""
+
+    @pytest.mark.asyncio
+    async def test_file_change_triggers_reload(self, tmp_path):
+        watched = tmp_path / "secrets.yaml"
+        watched.write_text("a: 1\n")
+        fake = FakeConfigService([watched])
+        reloader = ConfigReloader(fake, watch_interval=0.01, secrets_poll_interval=0)
+        reloader.start()
+        try:
+            await asyncio.sleep(0.05)
+            assert fake.reloads == []
+
+            watched.write_text("a: 2\n")
+            os.utime(watched, ns=(0, 10 ** 18))
+            for _ in range(50):
+                if fake.reloads:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            reloader.stop()
+
+        # File edits reuse the Secrets Manager payload already loaded
+        assert fake.reloads == [False]
+
+    @pytest.mark.asyncio
+    async def test_sighup_triggers_full_reload(self, tmp_path):
+        fake = FakeConfigService([])
+        reloader = ConfigReloader(fake, watch_interval=0, secrets_poll_interval=0)
+        reloader.start()
+        try:
+            if not reloader._sighup_installed:
+                pytest.skip("SIGHUP handlers are not available here")
+            os.kill(os.getpid(), signal.SIGHUP)
+            for _ in range(50):
+                if fake.reloads:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            reloader.stop()
+
+        assert fake.reloads == [True]
+
+    @pytest.mark.asyncio
+    async def test_failed_reload_is_contained(self):
+        fake = FakeConfigService([])
+
+        def fail(refresh_aws_secrets=True):
+            raise OSError("unreadable")
+
+        fake.reload = fail
+        reloader = ConfigReloader(fake, watch_interval=0, secrets_poll_interval=0)
+
+        assert await reloader.reload("test") == frozenset()
+
+
+class TestReloadSubscribers:
+    """Test cases for components that react to reloads"""
+
+    def test_jwt_validator_reregisters_cognito_issuer(self, service, monkeypatch):
+        monkeypatch.setenv("COGNITO_USER_POOL_ID", "us-east-1_old")
+        monkeypatch.setenv("COGNITO_CLIENT_ID", "client")
+        monkeypatch.setenv("COGNITO_REGION", "us-east-1")
+        service.reload()
+        validator = JWTValidator()
+        validator.on_config_change(None, service.snapshot, frozenset())
+        old_issuer = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_old"
+        assert validator.get_issuer(old_issuer) is not None
+
+        monkeypatch.setenv("COGNITO_USER_POOL_ID", "us-east-1_new")
+        changed = service.reload()
+        validator.on_config_change(None, service.snapshot, changed)
+
+        assert "cognito_config" in changed
+        assert validator.get_issuer(old_issuer) is None
+        assert validator.get_issuer("https://cognito-idp.us-east-1.amazonaws.com/us-east-1_new") is not None
@@ -0,0 +1,125 @@
+"""
+Unit tests for JWTValidator header-based dispatch and the issuer registry.
+"""
+import time
+import pytest
+from jose import jwt as jose_jwt
+from app.core.config_service import config_service
+from app.core.jwt_utils import JWTValidator, KeySource, StaticKeySource, TokenIssuer
+from app.schemas.auth import TokenData
+
+
+class ExplodingKeySource(KeySource):
+    """Key source that fails the test if it is ever consulted."""
+
+    def _load_jwks(self):
+        raise AssertionError("Key source should not have been used")
+
+
+class TestJWTValidatorDispatch:
+    """Test cases for JWTValidator token routing"""
+
+    @pytest.fixture
+    def validator(self):
+        validator = JWTValidator()
+        # Drop any issuer registered from environment configuration
+        validator._issuers.clear()
+        return validator
+
+    def _issue(self, private_pem, kid, issuer, sub="user-sub-1", **claims):
+        payload = {
+            "iss": issuer,
+            "sub": sub,
+            "token_use": "access",
+            "client_id": "client-a",
+            "username": f"{sub}@example.com",
+            "exp": int(time.time()) + 300,
+        }
+        payload.update(claims)
+        return jose_jwt.encode(payload, private_pem, algorithm="RS256", headers={"kid": kid})
+
+    def test_validates_token_from_registered_issuer(self, validator, make_rsa_keypair):
+        """Test that a token is verified with its issuer's key source"""
+        private_pem, jwks = make_rsa_keypair("kid-a")
+        validator.register_issuer(TokenIssuer("https://issuer-a", StaticKeySource(jwks), client_id="client-a"))
+
+        token_data = validator.validate_token(self._issue(private_pem, "kid-a", "https://issuer-a"))
+
+        assert isinstance(token_data, TokenData)
+        assert token_data.user_sub == "user-sub-1"
+        assert token_data.username == "user-sub-1@example.com"
+
+    def test_mixed_issuers_use_their_own_keys(self, validator, make_rsa_keypair):
+        """Test that each issuer's tokens are verified against that issuer only"""
+        pem_a, jwks_a = make_rsa_keypair("kid-a")
+        pem_b, jwks_b = make_rsa_keypair("kid-b")
+        validator.register_issuer(TokenIssuer("https://issuer-a", StaticKeySource(jwks_a), client_id="client-a"))
+        validator.register_issuer(TokenIssuer("https://issuer-b", StaticKeySource(jwks_b), client_id="client-a"))
+
+        assert validator.validate_token(self._issue(pem_a, "kid-a", "https://issuer-a", sub="a")).user_sub == "a"
+        assert validator.validate_token(self._issue(pem_b, "kid-b", "https://issuer-b", sub="b")).user_sub == "b"
+
+        # A token claiming issuer B but signed with A's key must not validate
+        forged = self._issue(pem_a, "kid-a", "https://issuer-b")
+        with pytest.raises(Exception, match="Invalid Cognito token"):
+            validator.validate_token(forged)
+
+    def test_unknown_issuer_is_rejected_without_key_lookup(self, validator, make_rsa_keypair):
+        """Test that tokens from unregistered issuers never reach a key source"""
+        private_pem, _ = make_rsa_keypair("kid-a")
+        validator.register_issuer(TokenIssuer("https://issuer-a", ExplodingKeySource()))
+
+        with pytest.raises(Exception, match="Invalid Cognito token"):
+            validator.validate_token(self._issue(private_pem, "kid-a", "https://unknown"))
+
+    def test_wrong_audience_is_rejected(self, validator, make_rsa_keypair):
+        """Test that tokens issued for another app client are rejected"""
+        private_pem, jwks = make_rsa_keypair("kid-a")
+        validator.register_issuer(TokenIssuer("https://issuer-a", StaticKeySource(jwks), client_id="client-a"))
+
+        token = self._issue(private_pem, "kid-a", "https://issuer-a", client_id="client-b")
+        with pytest.raises(Exception, match="Invalid Cognito token"):
+            validator.validate_token(token)
+
+    def test_local_token_skips_issuer_validation(self, validator):
+        """Test that HMAC tokens go straight to local validation in development"""
+        validator.is_development = True
+        validator.register_issuer(TokenIssuer("https://issuer-a", ExplodingKeySource()))
+
+        token = jose_jwt.encode(
+            {"username": "dev@example.com", "user_sub": "dev-sub", "exp": int(time.time()) + 300},
+            config_service.get_secret_key(),
+            algorithm="HS256"
+        )
+        token_data = validator.validate_token(token)
+
+        assert token_data.username == "dev@example.com"
+        assert token_data.user_sub == "dev-sub"
+
+    def test_local_token_rejected_outside_development(self, validator):
+        """Test that HMAC tokens are refused when not in development mode"""
+        validator.is_development = False
+
+        token = jose_jwt.encode(
+            {"username": "dev@example.com", "exp": int(time.time()) + 300},
+            config_service.get_secret_key(),
+            algorithm="HS256"
+        )
+        with pytest.raises(Exception, match="Token validation failed"):
+            validator.validate_token(token)
+
+    def test_malformed_token_is_rejected(self, validator):
+        """Test that garbage input fails on header decoding"""
+        with pytest.raises(Exception, match="Invalid token format"):
+            validator.validate_token("not-a-jwt")
+
+
+class TestKeySource:
+    """Test cases for the KeySource base class"""
+
+    def test_key_source_requires_load_jwks(self):
+        class IncompleteKeySource(KeySource):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteKeySource()
@@ -0,0 +1,190 @@
+"""
+Unit tests for the offline local identity provider.
+"""
+import pytest
+from jose import jwt as jose_jwt
+from app.core.exceptions import CognitoError
+from app.core.jwt_utils import JWTValidator
+from app.core.principal_cache import principal_cache
+from app.models.user import UserRole
+from app.schemas.user import UserCreate
+from app.services.local_identity_service import LocalIdentityService, LocalSigningKey
+from app.utils import password_hashing
+from tests.conftest import TestingSessionLocal
+
+ISSUER = "http://localhost/api/v1/auth"
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    return LocalSigningKey(LocalSigningKey.generate_private_pem())
+
+
+@pytest.fixture
+def local_idp(db, signing_key):
+    # Cheap hashing on the thread pool keeps unit tests fast
+    service = LocalIdentityService(
+        issuer=ISSUER,
+        client_id="local-client",
+        signing_key=signing_key,
+        session_factory=TestingSessionLocal,
+        password_scheme="pbkdf2_sha256",
+        password_rounds=1000,
+        hash_workers=0
+    )
+    yield service
+    service.shutdown()
+
+
+@pytest.fixture
+def validator(local_idp):
+    validator = JWTValidator()
+    validator._issuers.clear()
+    validator.register_issuer(local_idp.token_issuer())
+    return validator
+
+
+class TestLocalIdentityService:
+    """Test cases for LocalIdentityService"""
+
+    @pytest.mark.asyncio
+    async def test_sign_up_stores_hashed_password(self, local_idp, db, user_dao):
+        result = await local_idp.sign_up("new@example.com", "Secret123!", "New User")
+
+        assert result["user_confirmed"] is True
+        stored = user_dao.get_in_db_by_email(db, "new@example.com")
+        assert stored.cognito_sub == result["user_sub"]
+        assert stored.full_name == "New User"
+        assert stored.password_hash.startswith("$pbkdf2-sha256$")
+        assert "Secret123!" not in stored.password_hash
+
+        with pytest.raises(CognitoError) as exc_info:
+            await local_idp.sign_up("new@example.com", "Other123!")
+        assert exc_info.value.error_code == "UsernameExistsException"
+
+    @pytest.mark.asyncio
+    async def test_sign_up_refuses_existing_user_without_password(self, local_idp, db, user_dao, test_user):
+        # A user created by an admin or through another provider has no password
+        test_user["db_user"].role = UserRole.ADMIN
+        db.commit()
+
+        with pytest.raises(CognitoError) as exc_info:
+            await local_idp.sign_up(test_user["email"], "Secret123!", "Intruder")
+        assert exc_info.value.error_code == "UsernameExistsException"
+
+        stored = user_dao.get_in_db_by_email(db, test_user["email"])
+        assert stored.password_hash is None
+        assert stored.full_name == "Test User"
+
+    @pytest.mark.asyncio
+    async def test_sign_up_refuses_email_used_as_username(self, local_idp, db, user_dao):
+        user_dao.create(db, obj_in=UserCreate(username="taken@example.com", email="owner@example.com"))
+
+        with pytest.raises(CognitoError) as exc_info:
+            await local_idp.sign_up("taken@example.com", "Secret123!")
+        assert exc_info.value.error_code == "UsernameExistsException"
+
+    @pytest.mark.asyncio
+    async def test_sign_in_issues_tokens_accepted_by_jwt_validator(self, local_idp, validator):
+        signed_up = await local_idp.sign_up("user@example.com", "Secret123!", "User")
+
+        tokens = await local_idp.sign_in("user@example.com", "Secret123!")
+
+        token_data = validator.validate_token(tokens["access_token"])
+        assert token_data.user_sub == signed_up["user_sub"]
+        assert token_data.username == "user@example.com"
+        id_claims = validator.verify_token_claims(tokens["id_token"])
+        assert id_claims["email"] == "user@example.com"
+        assert jose_jwt.get_unverified_header(tokens["access_token"])["kid"] == local_idp.signing_key.kid
+
+        # Refresh tokens are not accepted as API credentials
+        with pytest.raises(Exception):
+            validator.validate_token(tokens["refresh_token"])
+
+    @pytest.mark.asyncio
+    async def test_sign_in_rejects_bad_credentials(self, local_idp):
+        await local_idp.sign_up("user@example.com", "Secret123!")
+
+        for email, password in [("user@example.com", "Wrong123!"), ("nobody@example.com", "Secret123!")]:
+            with pytest.raises(CognitoError) as exc_info:
+                await local_idp.sign_in(email, password)
+            assert exc_info.value.error_code == "NotAuthorizedException"
+
+    @pytest.mark.asyncio
+    async def test_refresh_and_user_info(self, local_idp, validator):
+        signed_up = await local_idp.sign_up("user@example.com", "Secret123!", "User")
+        tokens = await local_idp.sign_in("user@example.com", "Secret123!")
+
+        refreshed = await local_idp.refresh_token(tokens["refresh_token"], "user@example.com")
+        assert validator.validate_token(refreshed["access_token"]).user_sub == signed_up["user_sub"]
+
+        info = await local_idp.get_user_info(refreshed["access_token"])
+        assert info["user_sub"] == signed_up["user_sub"]
+        assert info["name"] == "User"
+        assert await local_idp.get_user_info_from_tokens(tokens) == info
+
+        with pytest.raises(CognitoError):
+            await local_idp.refresh_token(tokens["access_token"], "user@example.com")
+        with pytest.raises(CognitoError):
+            await local_idp.refresh_token(tokens["refresh_token"], "someone-else@example.com")
+
+    @pytest.mark.asyncio
+    async def test_hashing_runs_in_process_pool(self, db, signing_key):
+        service = LocalIdentityService(
+            issuer=ISSUER,
+            client_id="local-client",
+            signing_key=signing_key,
+            session_factory=TestingSessionLocal,
+            password_scheme="pbkdf2_sha256",
+            password_rounds=1000,
+            hash_workers=1
+        )
+        try:
+            await service.sign_up("pool@example.com", "Secret123!")
+            tokens = await service.sign_in("pool@example.com", "Secret123!")
+            assert tokens["access_token"]
+        finally:
+            service.shutdown()
+
+    def test_signing_key_is_persisted(self, tmp_path):
+        path = str(tmp_path / "local-idp.pem")
+
+        created = LocalSigningKey.load_or_create(path)
+        loaded = LocalSigningKey.load_or_create(path)
+
+        assert loaded.kid == created.kid
+        assert loaded.jwks == created.jwks
+
+
+class TestPasswordHashing:
+    """Test cases for scheme selection"""
+
+    def test_unavailable_scheme_falls_back(self, monkeypatch):
+        monkeypatch.setattr(password_hashing, "scheme_available", lambda scheme: scheme == "pbkdf2_sha256")
+        assert password_hashing.resolve_scheme("argon2") == password_hashing.FALLBACK_SCHEME
+
+    def test_hash_and_verify(self):
+        password_hash = password_hashing.hash_password("Secret123!", "pbkdf2_sha256", 1000)
+        assert password_hashing.verify_password("Secret123!", password_hash, "pbkdf2_sha256", 1000)
+        assert not password_hashing.verify_password("Wrong", password_hash, "pbkdf2_sha256", 1000)
+        assert not password_hashing.verify_password("Secret123!", "not-a-hash", "pbkdf2_sha256", 1000)
+
+
+class TestJWKSEndpoint:
+    """Test cases for the JWKS endpoint"""
+
+    def test_serves_local_keys(self, client, local_idp):
+        from app.core.service_factory import service_container
+
+        service_container.override(cognito_service=local_idp)
+        try:
+            response = client.get("/api/v1/auth/.well-known/jwks.json")
+        finally:
+            service_container.reset()
+
+        assert response.status_code == 200
+        assert response.json() == local_idp.jwks
+
+    def test_not_found_for_other_providers(self, client):
+        response = client.get("/api/v1/auth/.well-known/jwks.json")
+        assert response.status_code == 404
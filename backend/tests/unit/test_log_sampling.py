@@ -0,0 +1,233 @@
+"""
+Unit tests for request log sampling and repeat suppression.
+"""
+import io
+import sys
+import uuid
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from app.core.log_sampling import LogSampler, SamplingRule, parse_rules
+from app.core.logging_service import LogConfig, LogLevel, LoggingService, logging_service, get_logger
+from app.core.metrics import metrics
+from app.middlewaremiddleware.logging_middleware import RequestLoggingMiddleware
+
+
+class TestParseRules:
+    """Test cases for parse_rules"""
+
+    def test_parses_rules(self):
+        rules = parse_rules("route=/health,status=2xx,rate=0.01; event=request_started,route=/api/*,rate=0.5")
+
+        assert rules[0] == SamplingRule(
+            rate=0.01, route="/health", status_class="2xx", name="route=/health,status=2xx,rate=0.01"
+        )
+        assert rules[1].event == "request_started"
+        assert rules[1].route == "/api/*"
+        assert rules[1].rate == 0.5
+
+    def test_empty_spec(self):
+        assert parse_rules("") == []
+
+    @pytest.mark.parametrize("spec", [
+        "route=/health",
+        "route=/health,rate=2",
+        "route=/health,rate=0.1,colour=red",
+        "status=200,rate=0.1",
+        "route,rate=0.1",
+    ])
+    def test_invalid_rules(self, spec):
+        with pytest.raises(ValueError):
+            parse_rules(spec)
+
+
+class TestLogSampler:
+    """Test cases for LogSampler"""
+
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics.reset()
+        yield
+        metrics.reset()
+
+    def test_first_matching_rule_sets_rate(self):
+        sampler = LogSampler(parse_rules("route=/health,status=2xx,rate=0.01;route=/api/*,rate=0.5"))
+
+        assert sampler.sample_rate("request_completed", "/health", 200, 3.0)[0] == 0.01
+        assert sampler.sample_rate("request_completed", "/health", 404, 3.0)[0] == 1.0
+        assert sampler.sample_rate("request_completed", "/api/v1/users", 200, 3.0)[0] == 0.5
+        assert sampler.sample_rate("request_completed", "/docs", 200, 3.0)[0] == 1.0
+
+    def test_records_without_status_do_not_match_status_rules(self):
+        sampler = LogSampler(parse_rules("route=/health,status=2xx,rate=0;route=/health,event=request_started,rate=0.1"))
+
+        assert sampler.sample_rate("request_started", "/health")[0] == 0.1
+
+    def test_errors_and_slow_requests_always_kept(self):
+        sampler = LogSampler(parse_rules("route=/health,rate=0"), slow_ms=500)
+
+        assert sampler.sample_rate("request_completed", "/health", 503, 3.0)[0] == 1.0
+        assert sampler.sample_rate("request_completed", "/health", 200, 750.0)[0] == 1.0
+        assert sampler.sample_rate("request_completed", "/health", 200, 3.0)[0] == 0.0
+
+    def test_latency_bound(self):
+        sampler = LogSampler(parse_rules("route=/api/*,max_latency_ms=100,rate=0"))
+
+        assert sampler.sample_rate("request_completed", "/api/users", 200, 50.0)[0] == 0.0
+        assert sampler.sample_rate("request_completed", "/api/users", 200, 150.0)[0] == 1.0
+
+    def test_may_drop(self):
+        sampler = LogSampler(parse_rules("route=/health,status=2xx,rate=0.01;route=/api/*,rate=1"))
+
+        assert sampler.may_drop("request_started", "/health")
+        assert not sampler.may_drop("request_started", "/api/v1/users")
+        assert not sampler.may_drop("request_started", "/docs")
+
+    def test_keeps_about_the_rate_and_counts_the_rest(self):
+        sampler = LogSampler(parse_rules("route=/health,rate=0.1"))
+        keys = [str(uuid.uuid4()) for _ in range(5000)]
+
+        kept = sum(sampler.should_log("request_completed", "/health", key, 200, 1.0)[0] for key in keys)
+
+        assert 350 < kept < 650
+        assert metrics.get_counter(
+            "log_records_sampled_out_total", event="request_completed", rule="route=/health,rate=0.1"
+        ) == 5000 - kept
+
+    def test_decision_is_stable_per_key(self):
+        sampler = LogSampler(parse_rules("route=/health,rate=0.5"))
+        key = str(uuid.uuid4())
+
+        started = sampler.should_log("request_started", "/health", key)
+        completed = sampler.should_log("request_completed", "/health", key, 200, 1.0)
+
+        assert started == completed
+        assert started[1] == 0.5
+
+    def test_repeated_errors_rate_limited_per_key(self):
+        sampler = LogSampler(error_repeat_limit=2, error_repeat_window=60)
+
+        assert sampler.allow_repeat("GET /a:ValueError:boom", now=0) == (True, 0)
+        assert sampler.allow_repeat("GET /a:ValueError:boom", now=1) == (True, 0)
+        assert sampler.allow_repeat("GET /a:ValueError:boom", now=2) == (False, 0)
+        assert sampler.allow_repeat("GET /a:ValueError:boom", now=3) == (False, 0)
+        assert sampler.allow_repeat("GET /b:ValueError:boom", now=3) == (True, 0)
+        assert metrics.get_counter("log_records_suppressed_total") == 2
+
+        # The first record of the next window reports what was suppressed
+        assert sampler.allow_repeat("GET /a:ValueError:boom", now=61) == (True, 2)
+        assert sampler.allow_repeat("GET /a:ValueError:boom", now=62) == (True, 0)
+
+    def test_repeat_limit_disabled(self):
+        sampler = LogSampler(error_repeat_limit=0)
+
+        assert all(sampler.allow_repeat("key", now=i)[0] for i in range(100))
+
+
+class TestRequestLoggingMiddleware:
+    """Test cases for sampling in RequestLoggingMiddleware"""
+
+    @pytest.fixture
+    def output(self):
+        buffer = io.StringIO()
+        original_stdout = sys.stdout
+        sys.stdout = buffer
+        try:
+            LoggingService(LogConfig(level=LogLevel.INFO, json_format=False))
+        finally:
+            sys.stdout = original_stdout
+        yield buffer
+        logging_service.update_config(logging_service.config)
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        sampler = LogSampler(parse_rules("route=/health,rate=0"), error_repeat_limit=1)
+        app.add_middleware(RequestLoggingMiddleware, sampler=sampler)
+
+        @app.get("/health")
+        def health():
+            return {"status": "ok"}
+
+        @app.get("/boom")
+        def boom():
+            raise RuntimeError("boom")
+
+        return TestClient(app, raise_server_exceptions=False)
+
+    def test_sampled_out_requests_not_logged(self, client, output):
+        assert client.get("/health").status_code == 200
+
+        assert "/health" not in output.getvalue()
+
+    def test_repeated_failures_suppressed(self, client, output):
+        for _ in range(3):
+            assert client.get("/boom").status_code == 500
+
+        assert output.getvalue().count("Request failed: GET /boom") == 1
+
+
+class TestDeferredStartedRecords:
+    """Test cases for request_started records decided with the request's outcome"""
+
+    @pytest.fixture
+    def output(self):
+        buffer = io.StringIO()
+        original_stdout = sys.stdout
+        sys.stdout = buffer
+        try:
+            LoggingService(LogConfig(level=LogLevel.INFO, json_format=False))
+        finally:
+            sys.stdout = original_stdout
+        yield buffer
+        logging_service.update_config(logging_service.config)
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        sampler = LogSampler(parse_rules("route=/health*,status=2xx,rate=0"))
+        app.add_middleware(RequestLoggingMiddleware, sampler=sampler)
+        handler_logger = get_logger("app.routers.example")
+
+        @app.get("/health")
+        def health(response: Response, status: int = 200):
+            handler_logger.info("Checking health")
+            response.status_code = status
+            return {"status": "ok"}
+
+        @app.get("/users")
+        def users():
+            handler_logger.info("Listing users")
+            return []
+
+        @app.get("/health/boom")
+        def boom():
+            raise RuntimeError("boom")
+
+        return TestClient(app, raise_server_exceptions=False)
+
+    def test_health_example_drops_started_and_completed(self, client, output):
+        assert client.get("/health").status_code == 200
+
+        logged = output.getvalue()
+        assert "Request started: GET /health" not in logged
+        assert "Request completed: GET /health" not in logged
+
+    def test_health_error_keeps_started(self, client, output):
+        assert client.get("/health?status=503").status_code == 503
+
+        lines = output.getvalue().splitlines()
+        assert any("Request started: GET /health" in line for line in lines)
+        assert any("Request completed: GET /health - 503" in line for line in lines)
+
+    def test_failed_request_keeps_started(self, client, output):
+        client.get("/health/boom")
+
+        logged = output.getvalue()
+        assert logged.index("Request started: GET /health/boom") < logged.index("Request failed: GET /health/boom")
+
+    def test_unsampled_route_logs_started_first(self, client, output):
+        assert client.get("/users").status_code == 200
+
+        logged = output.getvalue()
+        assert logged.index("Request started: GET /users") < logged.index("Listing users")
@@ -0,0 +1,295 @@
+"""
+Unit tests for the log sinks.
+"""
+import io
+import json
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from loguru import logger as loguru_logger
+from app.core.log_sinks import AsyncLogSink, JsonLogSink, OverflowPolicy, exception_format, render_json
+from app.core.logging_service import LogConfig, LoggingService, logging_service
+
+
+def _message(text: str, level_no: int = 20) -> str:
+    """A formatted record the way loguru hands it to a sink"""
+    class Message(str):
+        pass
+
+    message = Message(text + "\n")
+    message.record = {"level": SimpleNamespace(no=level_no)}
+    return message
+
+
+class CountingStream(io.StringIO):
+    """Text stream without a binary buffer that counts write calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+class BlockingStream(io.StringIO):
+    """Stream whose writes wait until released, like a stalled stdout pipe"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.writing = threading.Event()
+
+    def write(self, text):
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(text)
+
+
+class TestAsyncLogSink:
+    """Test cases for AsyncLogSink"""
+
+    def test_records_written_in_order(self):
+        stream = io.StringIO()
+        sink = AsyncLogSink(stream)
+
+        for i in range(100):
+            sink(_message(f"line {i}"))
+        assert sink.flush(timeout=5)
+        sink.stop()
+
+        assert stream.getvalue().splitlines() == [f"line {i}" for i in range(100)]
+        assert sink.queued == 100
+        assert sink.dropped == 0
+
+    def test_slow_stream_does_not_block_callers(self):
+        stream = BlockingStream()
+        sink = AsyncLogSink(stream, max_size=1000)
+        sink(_message("first"))
+        stream.writing.wait(5)
+
+        started = time.perf_counter()
+        for i in range(500):
+            sink(_message(f"line {i}"))
+        elapsed = time.perf_counter() - started
+
+        stream.release.set()
+        sink.stop()
+        assert elapsed < 1
+        assert len(stream.getvalue().splitlines()) == 501
+
+    def test_drop_oldest_keeps_newest_records(self):
+        stream = BlockingStream()
+        sink = AsyncLogSink(stream, max_size=3, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        sink(_message("in flight"))
+        stream.writing.wait(5)
+
+        for i in range(5):
+            sink(_message(f"line {i}"))
+        stream.release.set()
+        sink.stop()
+
+        assert stream.getvalue().splitlines() == ["in flight", "line 2", "line 3", "line 4"]
+        assert sink.dropped == 2
+
+    def test_drop_debug_only_drops_debug(self):
+        stream = BlockingStream()
+        sink = AsyncLogSink(stream, max_size=2, overflow_policy=OverflowPolicy.DROP_DEBUG)
+        sink(_message("in flight"))
+        stream.writing.wait(5)
+
+        sink(_message("info 1"))
+        sink(_message("info 2"))
+        sink(_message("debug", level_no=10))
+        blocked = threading.Thread(target=sink, args=(_message("error", level_no=40),))
+        blocked.start()
+        blocked.join(0.1)
+
+        assert blocked.is_alive()
+        stream.release.set()
+        blocked.join(5)
+        sink.stop()
+        assert stream.getvalue().splitlines() == ["in flight", "info 1", "info 2", "error"]
+        assert sink.dropped == 1
+
+    def test_block_waits_for_room(self):
+        stream = BlockingStream()
+        sink = AsyncLogSink(stream, max_size=1, overflow_policy=OverflowPolicy.BLOCK)
+        sink(_message("in flight"))
+        stream.writing.wait(5)
+        sink(_message("queued"))
+
+        blocked = threading.Thread(target=sink, args=(_message("waiting", level_no=10),))
+        blocked.start()
+        blocked.join(0.1)
+
+        assert blocked.is_alive()
+        stream.release.set()
+        blocked.join(5)
+        sink.stop()
+        assert stream.getvalue().splitlines() == ["in flight", "queued", "waiting"]
+        assert sink.dropped == 0
+
+    def test_records_after_stop_are_written_directly(self):
+        stream = io.StringIO()
+        sink = AsyncLogSink(stream)
+        sink.stop()
+
+        sink(_message("late"))
+
+        assert stream.getvalue() == "late\n"
+
+    def test_works_as_loguru_sink(self):
+        stream = io.StringIO()
+        sink = AsyncLogSink(stream)
+        handler_id = loguru_logger.add(sink, format="{level} {message}", level="DEBUG")
+        try:
+            loguru_logger.debug("hello")
+            assert sink.flush(timeout=5)
+        finally:
+            loguru_logger.remove(handler_id)
+            sink.stop()
+
+        assert stream.getvalue() == "DEBUG hello\n"
+
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            AsyncLogSink(io.StringIO(), overflow_policy="drop-everything")
+
+
+class TestJsonLogSink:
+    """Test cases for JsonLogSink"""
+
+    @pytest.fixture
+    def add_sink(self):
+        handler_ids = []
+        sinks = []
+
+        def add(sink):
+            sinks.append(sink)
+            handler_ids.append(loguru_logger.add(sink, format=exception_format, level="DEBUG"))
+            return sink
+
+        yield add
+        for handler_id in handler_ids:
+            loguru_logger.remove(handler_id)
+        for sink in sinks:
+            sink.stop()
+
+    def test_flat_schema(self, add_sink):
+        stream = io.StringIO()
+        sink = add_sink(JsonLogSink(stream))
+
+        loguru_logger.bind(name="users", request_id="abc", level="ignored").info("Getting user {}", 42)
+        sink.flush()
+
+        record = json.loads(stream.getvalue())
+        assert record["message"] == "Getting user 42"
+        assert record["level"] == "INFO"
+        assert record["function"] == "test_flat_schema"
+        assert record["name"] == "users"
+        assert record["request_id"] == "abc"
+        assert "exception" not in record
+        assert {"timestamp", "module", "line", "process_id", "thread_id"} <= set(record)
+
+    def test_writes_in_batches(self, add_sink):
+        stream = CountingStream()
+        sink = add_sink(JsonLogSink(stream, batch_size=10, flush_interval=60))
+
+        for i in range(25):
+            loguru_logger.info("line {}", i)
+
+        assert stream.writes == 2
+        assert len(stream.getvalue().splitlines()) == 20
+        sink.flush()
+        assert [json.loads(line)["message"] for line in stream.getvalue().splitlines()] == [
+            f"line {i}" for i in range(25)
+        ]
+
+    def test_errors_written_immediately(self, add_sink):
+        stream = io.StringIO()
+        add_sink(JsonLogSink(stream, batch_size=100, flush_interval=60))
+
+        loguru_logger.info("before")
+        try:
+            raise ValueError("bad value")
+        except ValueError:
+            loguru_logger.exception("failed")
+
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["message"] for line in lines] == ["before", "failed"]
+        exception = lines[1]["exception"]
+        assert exception["type"] == "ValueError"
+        assert exception["value"] == "bad value"
+        assert "Traceback" in exception["traceback"]
+
+    def test_pending_records_flushed_after_interval(self, add_sink):
+        stream = io.StringIO()
+        add_sink(JsonLogSink(stream, batch_size=100, flush_interval=0.05))
+
+        loguru_logger.info("quiet period")
+        deadline = time.monotonic() + 5
+        while not stream.getvalue() and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert json.loads(stream.getvalue())["message"] == "quiet period"
+
+    def test_binary_stream(self, add_sink):
+        raw = io.BytesIO()
+        stream = io.TextIOWrapper(raw, encoding="utf-8")
+        sink = add_sink(JsonLogSink(stream))
+
+        stream.write("plain text first\n")
+        loguru_logger.info("caf\u00e9 {}", object)
+        sink.flush()
+
+        first, second = raw.getvalue().decode("utf-8").splitlines()
+        assert first == "plain text first"
+        assert json.loads(second)["message"] == "caf\u00e9 <class 'object'>"
+
+    def test_unserializable_extra_written_as_text(self, add_sink):
+        stream = io.StringIO()
+        sink = add_sink(JsonLogSink(stream))
+
+        loguru_logger.bind(payload={1: object}).info("odd extra")
+        sink.flush()
+
+        assert json.loads(stream.getvalue())["payload"] == {"1": "<class 'object'>"}
+
+    def test_large_records_do_not_keep_buffer_grown(self, add_sink):
+        stream = io.StringIO()
+        sink = add_sink(JsonLogSink(stream, buffer_size=1024))
+
+        loguru_logger.info("x" * 100000)
+        sink.flush()
+
+        assert len(sink._buffer) == 1024
+        assert len(json.loads(stream.getvalue())["message"]) == 100000
+
+    def test_async_sink_renders_json(self, add_sink):
+        stream = io.StringIO()
+        sink = add_sink(AsyncLogSink(stream, render=render_json))
+
+        loguru_logger.warning("queued json")
+        assert sink.flush(timeout=5)
+
+        assert json.loads(stream.getvalue())["message"] == "queued json"
+
+
+class TestJsonFileOutput:
+    """Test cases for JSON file output"""
+
+    def test_file_lines_use_flat_schema(self, tmp_path):
+        log_path = tmp_path / "app.log"
+        LoggingService(LogConfig(console_output=False, file_output=True, log_file_path=str(log_path)))
+        try:
+            loguru_logger.bind(name="files").warning("to {}", "disk")
+        finally:
+            logging_service.update_config(logging_service.config)
+
+        record = json.loads(log_path.read_text())
+        assert record["message"] == "to disk"
+        assert record["name"] == "files"
+        assert "_json_line" not in record
@@ -0,0 +1,319 @@
+"""
+Unit tests for the logging service and its Logger wrapper.
+"""
+import io
+import json
+import sys
+import threading
+from types import SimpleNamespace
+import pytest
+from app.core.log_sampling import ExceptionDeduplicator
+from app.core.log_sinks import OverflowPolicy
+from app.core.logging_service import LogConfig, LogLevel, LogProfile, LoggingService, logging_service, get_logger
+from app.core.metrics import metrics
+
+
+class ExplodingFormat:
+    """Argument that fails the test if it is ever formatted into a message"""
+
+    def __format__(self, spec):
+        raise AssertionError("argument was formatted for a disabled level")
+
+
+@pytest.fixture
+def capture():
+    """Configure plain-text console logging into a buffer; yields (configure, buffer)"""
+    buffer = io.StringIO()
+    original_stdout = sys.stdout
+
+    def configure(level: LogLevel = LogLevel.INFO, **overrides) -> LoggingService:
+        sys.stdout = buffer
+        try:
+            overrides.setdefault("json_format", False)
+            return LoggingService(LogConfig(level=level, **overrides))
+        finally:
+            sys.stdout = original_stdout
+
+    yield configure, buffer
+    logging_service.update_config(logging_service.config)
+
+
+class TestLogger:
+    """Test cases for Logger"""
+
+    def test_is_enabled_follows_configured_level(self, capture):
+        configure, _ = capture
+        logger = get_logger("test")
+
+        configure(LogLevel.INFO)
+        assert logger.is_enabled("INFO")
+        assert logger.is_enabled("error")
+        assert logger.is_enabled(40)
+        assert not logger.is_enabled("DEBUG")
+
+        configure(LogLevel.DEBUG)
+        assert logger.is_enabled("DEBUG")
+
+    def test_is_enabled_false_without_handlers(self, capture):
+        configure, _ = capture
+        configure(LogLevel.DEBUG, console_output=False)
+
+        assert not get_logger("test").is_enabled("CRITICAL")
+
+    def test_disabled_level_does_not_format_arguments(self, capture):
+        configure, buffer = capture
+        configure(LogLevel.INFO)
+
+        get_logger("test").debug("Getting user by ID: {}", ExplodingFormat())
+
+        assert buffer.getvalue() == ""
+
+    def test_arguments_formatted_when_enabled(self, capture):
+        configure, buffer = capture
+        configure(LogLevel.DEBUG)
+
+        get_logger("test").debug("Getting user by ID: {}", 42)
+
+        assert "Getting user by ID: 42" in buffer.getvalue()
+
+    def test_arguments_with_extra_fields(self, capture):
+        configure, buffer = capture
+        configure(LogLevel.INFO)
+
+        get_logger("test").info("Request started: {} {}", "GET", "/users/{id}", event="request_started")
+
+        assert "Request started: GET /users/{id}" in buffer.getvalue()
+
+    def test_records_attributed_to_caller(self, capture):
+        configure, buffer = capture
+        configure(LogLevel.INFO)
+
+        def lookup_user():
+            get_logger("test").info("looked up")
+
+        lookup_user()
+        get_logger("test").bind(request_id="abc").warning("bound")
+
+        output = buffer.getvalue()
+        assert ":lookup_user:" in output
+        assert ":test_records_attributed_to_caller:" in output
+
+
+class TestJsonEncoder:
+    """Test cases for reporting the JSON encoder in use"""
+
+    def test_stdlib_fallback_reported_once(self, capture, monkeypatch):
+        from app.core import logging_service as module
+
+        configure, buffer = capture
+        monkeypatch.setattr(module, "FAST_JSON_ENCODER", False)
+        monkeypatch.setattr(module, "_slow_encoder_reported", False)
+
+        configure(json_format=True).shutdown()
+        configure(json_format=True).shutdown()
+
+        assert buffer.getvalue().count("orjson is not installed") == 1
+
+    def test_no_warning_with_orjson(self, capture, monkeypatch):
+        from app.core import logging_service as module
+
+        configure, buffer = capture
+        monkeypatch.setattr(module, "FAST_JSON_ENCODER", True)
+        monkeypatch.setattr(module, "_slow_encoder_reported", False)
+
+        configure(json_format=True).shutdown()
+
+        assert "orjson" not in buffer.getvalue()
+
+
+class TestFileOutput:
+    """Test cases for the file handler"""
+
+    @pytest.fixture
+    def write_threads(self, monkeypatch):
+        """Names of the threads that write to log files"""
+        from loguru._file_sink import FileSink
+
+        threads = []
+        original_write = FileSink.write
+
+        def write(self, message):
+            threads.append(threading.current_thread().name)
+            return original_write(self, message)
+
+        monkeypatch.setattr(FileSink, "write", write)
+        yield threads
+        logging_service.update_config(logging_service.config)
+
+    @staticmethod
+    def _configure(log_file, **overrides) -> LoggingService:
+        return LoggingService(LogConfig(
+            console_output=False, file_output=True, log_file_path=str(log_file), **overrides
+        ))
+
+    @pytest.mark.parametrize("async_output", [False, True])
+    def test_file_writes_follow_async_output(self, tmp_path, write_threads, async_output):
+        log_file = tmp_path / "app.log"
+        service = self._configure(log_file, async_output=async_output)
+
+        get_logger("test").info("Request started: {} {}", "GET", "/users")
+        service.shutdown()
+
+        records = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert [record["message"] for record in records] == ["Request started: GET /users"]
+        expected = [threading.current_thread().name] if not async_output else ["log-writer-file"]
+        assert write_threads == expected
+
+    def test_async_file_output_keeps_unpicklable_extras(self, tmp_path, write_threads):
+        log_file = tmp_path / "app.log"
+        service = self._configure(log_file, async_output=True)
+
+        get_logger("test").bind(lock=threading.Lock()).info("Holding a lock")
+        service.shutdown()
+
+        records = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert [record["message"] for record in records] == ["Holding a lock"]
+        assert "lock" in records[0]["lock"]
+
+    def test_async_file_output_uses_bounded_queue(self, tmp_path, write_threads):
+        metrics.reset()
+        service = self._configure(
+            tmp_path / "app.log", async_output=True, queue_size=5, overflow_policy=OverflowPolicy.DROP_OLDEST
+        )
+        file_sink = service._sinks[0]
+        assert file_sink.name == "file" and file_sink.max_size == 5
+
+        for i in range(3):
+            get_logger("test").info("record {}", i)
+        service.shutdown()
+
+        assert file_sink.queued == 3
+        assert metrics.get_counter("log_records_queued_total", sink="file") == 3
+        metrics.reset()
+
+    def test_async_file_output_rotates(self, tmp_path, write_threads):
+        service = self._configure(tmp_path / "app.log", async_output=True, rotation="1 KB")
+        file_sink = service._sinks[0]
+
+        for i in range(20):
+            get_logger("test").info("record {} {}", i, "x" * 200)
+            file_sink.flush()
+        service.shutdown()
+
+        assert list(tmp_path.glob("app.*.log.zip"))
+
+
+def _lookup(token: str, value: str) -> None:
+    raise ValueError(value)
+
+
+def _log_failure(logger, value: str) -> None:
+    secret_token = "do-not-log-me"
+    try:
+        _lookup(secret_token, value)
+    except ValueError:
+        logger.exception("Lookup failed")
+
+
+class TestLogProfiles:
+    """Test cases for development and production logging profiles"""
+
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics.reset()
+        yield
+        metrics.reset()
+
+    def test_profile_defaults(self):
+        development = LogConfig()
+        production = LogConfig(profile=LogProfile.PRODUCTION)
+
+        assert development.rich_tracebacks and development.dedup_window == 0
+        assert not production.rich_tracebacks and production.dedup_window == 60
+        assert LogConfig(profile=LogProfile.PRODUCTION, exception_dedup_window=5).dedup_window == 5
+
+    def test_profile_follows_environment(self, monkeypatch):
+        from app.core import logging_service as module
+
+        monkeypatch.setattr(module.config_service, "is_production", lambda: True)
+        assert logging_service._load_config_from_service().profile == LogProfile.PRODUCTION
+
+        monkeypatch.setattr(module.config_service, "is_production", lambda: False)
+        assert logging_service._load_config_from_service().profile == LogProfile.DEVELOPMENT
+
+    def test_development_shows_local_variables(self, capture):
+        configure, buffer = capture
+        configure(profile=LogProfile.DEVELOPMENT)
+
+        _log_failure(get_logger("test"), "bad id")
+
+        assert "do-not-log-me" in buffer.getvalue()
+
+    def test_production_omits_local_variables(self, capture):
+        configure, buffer = capture
+        configure(profile=LogProfile.PRODUCTION)
+
+        _log_failure(get_logger("test"), "bad id")
+
+        output = buffer.getvalue()
+        assert "ValueError: bad id" in output
+        assert "do-not-log-me" not in output
+
+    def test_production_dedups_tracebacks_per_type(self, capture):
+        configure, buffer = capture
+        service = configure(profile=LogProfile.PRODUCTION, json_format=True)
+        logger = get_logger("test")
+
+        for value in ("first", "second", "third"):
+            _log_failure(logger, value)
+        service.shutdown()
+
+        records = [json.loads(line) for line in buffer.getvalue().splitlines()]
+        assert len(records) == 3
+        assert records[0]["exception"]["value"] == "first"
+        assert "traceback_suppressed" not in records[0]
+        for record, value in zip(records[1:], ("second", "third")):
+            assert "exception" not in record
+            assert record["traceback_suppressed"] is True
+            assert record["exception_type"] == "ValueError"
+            assert record["exception_value"] == value
+        assert metrics.get_counter("log_tracebacks_suppressed_total", exception_type="ValueError") == 2
+
+
+class TestExceptionDeduplicator:
+    """Test cases for ExceptionDeduplicator"""
+
+    @staticmethod
+    def _record(exception: Exception) -> dict:
+        return {"exception": SimpleNamespace(type=type(exception), value=exception, traceback=None), "extra": {}}
+
+    def test_window_per_type(self, monkeypatch):
+        from app.core import log_sampling
+
+        now = [0.0]
+        monkeypatch.setattr(log_sampling.time, "monotonic", lambda: now[0])
+        deduplicator = ExceptionDeduplicator(window=10)
+
+        first = self._record(ValueError("a"))
+        deduplicator(first)
+        repeat = self._record(ValueError("b"))
+        deduplicator(repeat)
+        other_type = self._record(KeyError("c"))
+        deduplicator(other_type)
+
+        assert first["exception"] is not None
+        assert repeat["exception"] is None
+        assert other_type["exception"] is not None
+
+        now[0] = 11.0
+        next_window = self._record(ValueError("d"))
+        deduplicator(next_window)
+        assert next_window["exception"] is not None
+        assert next_window["extra"]["tracebacks_suppressed"] == 1
+
+    def test_records_without_exception_untouched(self):
+        record = {"exception": None, "extra": {}}
+
+        ExceptionDeduplicator(window=10)(record)
+
+        assert record == {"exception": None, "extra": {}}
@@ -0,0 +1,32 @@
+"""
+Unit tests for the metrics endpoint.
+"""
+from app.models.user import UserRole
+
+
+class TestMetricsEndpoint:
+    """Test cases for access to /api/v1/metrics"""
+
+    def _login(self, mock_jwt, test_user):
+        token = "metrics-test-token"
+        mock_jwt.add_valid_token(token, test_user["email"], test_user["user_sub"], test_user["email"])
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_requires_authentication(self, client):
+        response = client.get("/api/v1/metrics")
+
+        assert response.status_code in (401, 403)
+
+    def test_forbidden_for_regular_users(self, client, test_user, mock_jwt):
+        response = client.get("/api/v1/metrics", headers=self._login(mock_jwt, test_user))
+
+        assert response.status_code == 403
+
+    def test_available_to_admins(self, client, db, test_user, mock_jwt):
+        test_user["db_user"].role = UserRole.ADMIN
+        db.commit()
+
+        response = client.get("/api/v1/metrics", headers=self._login(mock_jwt, test_user))
+
+        assert response.status_code == 200
+        assert "counters" in response.json()
@@ -117,6 +117,15 @@ class TestMockCognitoJWTValidator:
         mock_jwt_validator.remove_token(token)
         assert token not in mock_jwt_validator._valid_tokens
 
+    def test_token_registry_debug_messages(self, mock_jwt_validator, caplog):
+        """Test registry debug messages are formatted by the stdlib logger"""
+        with caplog.at_level("DEBUG", logger="app.core.mock_jwt_utils"):
+            mock_jwt_validator.add_valid_token("test-token", "test@example.com", "test-sub", "test@example.com")
+            mock_jwt_validator.remove_token("test-token")
+
+        assert "Mock JWT: Added valid token for test@example.com" in caplog.messages
+        assert "Mock JWT: Removed token test-token..." in caplog.messages
+
     def test_clear_all_tokens(self, mock_jwt_validator):
         """Test clearing all tokens"""
         # Add some tokens
@@ -136,3 +145,65 @@ class TestMockCognitoJWTValidator:
 
         assert mock_jwt_validator.is_token_valid(valid_token) is True
         assert mock_jwt_validator.is_token_valid(invalid_token) is False
+
+
+class TestMockUserCache:
+    """Test cases for the sub -> user cache used instead of per-token database sessions"""
+
+    @staticmethod
+    def _block_database(monkeypatch):
+        """Fail the test if a database session is opened"""
+        import app.db as db_module
+        import app.services.mock_cognito_service as mock_cognito_module
+
+        def fail():
+            raise AssertionError("Database session should not be opened")
+
+        monkeypatch.setattr(db_module, "SessionLocal", fail)
+        monkeypatch.setattr(mock_cognito_module, "SessionLocal", fail)
+
+    @pytest.mark.asyncio
+    async def test_lookups_after_sign_in_use_the_cache(self, test_user, mock_cognito, monkeypatch):
+        from app.utils.ttl_store import TTLStore
+        from app.services.mock_cognito_service import MockCognitoService
+        import app.services.mock_cognito_service as mock_cognito_module
+
+        user_cache = TTLStore()
+        service = MockCognitoService(token_store=TTLStore(), user_cache=user_cache)
+        validator = MockCognitoJWTValidator(token_store=TTLStore(), user_cache=user_cache)
+        tokens = await service.sign_in("test@example.com", "TestPassword123!")
+
+        self._block_database(monkeypatch)
+        # A token the validator never saw is resolved from the sub embedded in it
+        token_data = validator.validate_token(tokens["access_token"])
+        assert token_data.user_sub == test_user["user_sub"]
+        assert token_data.email == "test@example.com"
+
+        user_info = await service.get_user_info(tokens["access_token"])
+        assert user_info["user_sub"] == test_user["user_sub"]
+        assert user_info["name"] == "Test User"
+
+    def test_cache_miss_falls_back_to_database(self, test_user, mock_cognito, monkeypatch):
+        from app.utils.ttl_store import TTLStore
+
+        user_cache = TTLStore()
+        validator = MockCognitoJWTValidator(token_store=TTLStore(), user_cache=user_cache)
+
+        token_data = validator.validate_token(f"mock-access-{test_user['user_sub']}-1234567890")
+
+        assert token_data.user_sub == test_user["user_sub"]
+        assert token_data.email == "test@example.com"
+        assert user_cache.get(test_user["user_sub"])["email"] == "test@example.com"
+
+        # The user is cached now, so the next lookup skips the database
+        self._block_database(monkeypatch)
+        assert validator.validate_token(f"mock-access-{test_user['user_sub']}-1234567891").email == "test@example.com"
+
+    def test_unknown_sub_falls_back_to_default(self, db, mock_cognito):
+        from app.utils.ttl_store import TTLStore
+
+        validator = MockCognitoJWTValidator(token_store=TTLStore(), user_cache=TTLStore())
+
+        token_data = validator.validate_token("mock-access-unknown-sub-1234567890")
+
+        assert token_data.user_sub == "mock-user-default"
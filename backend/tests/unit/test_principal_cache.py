@@ -0,0 +1,139 @@
+"""
+Unit tests for the principal cache and its use in get_current_user.
+"""
+import pytest
+from app.core.principal_cache import PrincipalCache, principal_cache
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+from app.schemas.user import UserCreate, UserUpdate, UserResponse
+from app.models.user import UserRole
+
+
+def _user(user_id=1, **overrides):
+    data = {
+        "id": user_id,
+        "username": f"user{user_id}@example.com",
+        "email": f"user{user_id}@example.com",
+        "is_active": True,
+        "role": UserRole.USER,
+        "cognito_sub": f"sub-{user_id}",
+    }
+    data.update(overrides)
+    return UserResponse(**data)
+
+
+class TestPrincipalCache:
+    """Test cases for PrincipalCache"""
+
+    def test_get_returns_cached_user(self):
+        cache = PrincipalCache(ttl_seconds=30)
+        user = _user()
+        cache.set([cache.sub_key("sub-1"), cache.username_key("user1@example.com")], user)
+
+        assert cache.get(cache.sub_key("sub-1")) == user
+        assert cache.get(cache.username_key("user1@example.com")) == user
+        assert cache.get(cache.sub_key("other")) is None
+
+    def test_entries_expire(self, monkeypatch):
+        cache = PrincipalCache(ttl_seconds=30)
+        cache.set([cache.sub_key("sub-1")], _user())
+
+        import app.core.principal_cache as module
+        real_monotonic = module.time.monotonic
+        monkeypatch.setattr(module.time, "monotonic", lambda: real_monotonic() + 31)
+
+        assert cache.get(cache.sub_key("sub-1")) is None
+        assert len(cache) == 0
+
+    def test_invalidate_user_drops_all_keys(self):
+        cache = PrincipalCache(ttl_seconds=30)
+        cache.set([cache.sub_key("sub-1"), cache.username_key("user1@example.com")], _user(1))
+        cache.set([cache.sub_key("sub-2")], _user(2))
+
+        cache.invalidate_user(1)
+
+        assert cache.get(cache.sub_key("sub-1")) is None
+        assert cache.get(cache.username_key("user1@example.com")) is None
+        assert cache.get(cache.sub_key("sub-2")) is not None
+
+    def test_max_size_evicts_least_recently_used(self):
+        cache = PrincipalCache(ttl_seconds=30, max_size=2)
+        cache.set([cache.sub_key("sub-1")], _user(1))
+        cache.set([cache.sub_key("sub-2")], _user(2))
+        cache.get(cache.sub_key("sub-1"))
+        cache.set([cache.sub_key("sub-3")], _user(3))
+
+        assert cache.get(cache.sub_key("sub-1")) is not None
+        assert cache.get(cache.sub_key("sub-2")) is None
+        assert cache.get(cache.sub_key("sub-3")) is not None
+
+    def test_zero_ttl_disables_cache(self):
+        cache = PrincipalCache(ttl_seconds=0)
+        cache.set([cache.sub_key("sub-1")], _user())
+        assert cache.get(cache.sub_key("sub-1")) is None
+
+
+class CountingUserService:
+    """Wraps a UserService and counts lookups that reach the database."""
+
+    def __init__(self, user_service):
+        self.user_service = user_service
+        self.lookups = 0
+
+    def get_user_by_principal(self, db, cognito_sub=None, username=None):
+        self.lookups += 1
+        return self.user_service.get_user_by_principal(db, cognito_sub=cognito_sub, username=username)
+
+    def backfill_cognito_sub(self, db, user, cognito_sub):
+        return self.user_service.backfill_cognito_sub(db, user, cognito_sub)
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_uses_cache(db, user_service):
+    """Test that repeated resolution of the same subject skips the database"""
+    created = user_service.create_user(db, UserCreate(
+        username="cached@example.com", email="cached@example.com", cognito_sub="cached-sub"
+    ))
+    counting = CountingUserService(user_service)
+    token_data = TokenData(username="cached@example.com", user_sub="cached-sub")
+
+    first = await get_current_user(token_data=token_data, db=db, user_service=counting)
+    second = await get_current_user(token_data=token_data, db=db, user_service=counting)
+
+    assert first.id == second.id == created.id
+    assert counting.lookups == 1
+
+
+@pytest.mark.asyncio
+async def test_update_invalidates_cached_principal(db, user_service):
+    """Test that deactivating a user is visible on the next request"""
+    from fastapi import HTTPException
+
+    created = user_service.create_user(db, UserCreate(
+        username="deactivate@example.com", email="deactivate@example.com", cognito_sub="deactivate-sub"
+    ))
+    token_data = TokenData(username="deactivate@example.com", user_sub="deactivate-sub")
+    await get_current_user(token_data=token_data, db=db, user_service=user_service)
+    assert principal_cache.get(principal_cache.sub_key("deactivate-sub")) is not None
+
+    user_service.update_user(db, created.id, UserUpdate(is_active=False))
+
+    assert principal_cache.get(principal_cache.sub_key("deactivate-sub")) is None
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(token_data=token_data, db=db, user_service=user_service)
+    assert exc_info.value.detail == "Inactive user"
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_backfills_missing_sub(db, user_service):
+    """Test that a user resolved by username gets the token's sub recorded"""
+    created = user_service.create_user(db, UserCreate(
+        username="legacy@example.com", email="legacy@example.com"
+    ))
+    token_data = TokenData(username="legacy@example.com", user_sub="legacy-sub")
+
+    user = await get_current_user(token_data=token_data, db=db, user_service=user_service)
+
+    assert user.id == created.id
+    assert user.cognito_sub == "legacy-sub"
+    assert user_service.get_user_by_cognito_sub(db, "legacy-sub").id == created.id
@@ -0,0 +1,203 @@
+"""
+Unit tests for token-bucket rate limiting of the authentication endpoints.
+"""
+from types import SimpleNamespace
+import pytest
+from app.core.exceptions import RateLimitExceededError
+from app.crud.rate_limit_bucket import RateLimitBucketDAO
+from app.routers import auth as auth_module
+from app.services.rate_limit_service import (
+    DatabaseRateLimitBackend, InMemoryRateLimitBackend, RateLimitRule, RateLimitService, _build_backend,
+    rate_limit_service
+)
+
+
+class TestTokenBucketBackends:
+    """Test cases shared by the in-process and database backends"""
+
+    @pytest.fixture(params=["memory", "database"])
+    def backend(self, request, db):
+        if request.param == "memory":
+            return InMemoryRateLimitBackend()
+        return DatabaseRateLimitBackend(RateLimitBucketDAO())
+
+    def test_burst_then_refill(self, backend, db):
+        """Test that a full bucket allows a burst and then refills over time"""
+        results = [backend.take(db, "key", 3, 1.0, 1, 1000.0)[0] for _ in range(4)]
+        assert results == [True, True, True, False]
+
+        # Half a token is not enough, a full one is
+        assert backend.take(db, "key", 3, 1.0, 1, 1000.5)[0] is False
+        allowed, tokens = backend.take(db, "key", 3, 1.0, 1, 1001.0)
+        assert allowed is True
+        assert tokens == pytest.approx(0)
+
+    def test_refill_is_capped_at_capacity(self, backend, db):
+        """Test that an idle bucket never holds more than its capacity"""
+        backend.take(db, "key", 2, 1.0, 1, 1000.0)
+        allowed, tokens = backend.take(db, "key", 2, 1.0, 1, 5000.0)
+        assert allowed is True
+        assert tokens == pytest.approx(1)
+
+    def test_buckets_are_independent(self, backend, db):
+        assert backend.take(db, "a", 1, 1.0, 1, 1000.0)[0] is True
+        assert backend.take(db, "a", 1, 1.0, 1, 1000.0)[0] is False
+        assert backend.take(db, "b", 1, 1.0, 1, 1000.0)[0] is True
+
+    def test_purge_deletes_idle_buckets(self, backend, db):
+        backend.take(db, "idle", 2, 1.0, 2, 1000.0)
+        backend.take(db, "active", 2, 1.0, 2, 2000.0)
+
+        assert backend.purge(db, 1500.0) == 1
+
+        # The purged bucket starts full again, the other one is still drained
+        assert backend.take(db, "idle", 2, 1.0, 1, 2000.0) == (True, pytest.approx(1))
+        assert backend.take(db, "active", 2, 1.0, 1, 2000.0)[0] is False
+
+
+class TestRateLimitService:
+    """Test cases for RateLimitService rules"""
+
+    @pytest.fixture
+    def service(self):
+        return RateLimitService(
+            InMemoryRateLimitBackend(),
+            ip_rule=RateLimitRule("ip", 3, 1),
+            email_rule=RateLimitRule("email", 2, 1),
+            global_rule=RateLimitRule("global", 5, 1),
+        )
+
+    def test_per_email_limit_ignores_case(self, service):
+        service.check(None, "signin", client_ip="1.1.1.1", email="User@example.com")
+        service.check(None, "signin", client_ip="2.2.2.2", email="user@example.com")
+
+        with pytest.raises(RateLimitExceededError) as exc_info:
+            service.check(None, "signin", client_ip="3.3.3.3", email="USER@example.com ")
+        assert exc_info.value.rule == "email"
+        assert exc_info.value.retry_after >= 1
+
+    def test_per_ip_limit(self, service):
+        for i in range(3):
+            service.check(None, "signin", client_ip="1.1.1.1", email=f"user{i}@example.com")
+
+        with pytest.raises(RateLimitExceededError) as exc_info:
+            service.check(None, "signin", client_ip="1.1.1.1", email="other@example.com")
+        assert exc_info.value.rule == "ip"
+
+    def test_global_limit(self, service):
+        for i in range(5):
+            service.check(None, "signin", client_ip=f"10.0.0.{i}", email=f"user{i}@example.com")
+
+        with pytest.raises(RateLimitExceededError) as exc_info:
+            service.check(None, "signin", client_ip="10.0.0.9", email="user9@example.com")
+        assert exc_info.value.rule == "global"
+
+    def test_blocked_ip_does_not_drain_global_bucket(self, service):
+        for _ in range(10):
+            try:
+                service.check(None, "signin", client_ip="1.1.1.1")
+            except RateLimitExceededError:
+                pass
+
+        # Only the three admitted requests took global tokens
+        service.check(None, "signin", client_ip="2.2.2.2")
+        service.check(None, "signin", client_ip="3.3.3.3")
+
+    def test_scopes_are_limited_separately(self, service):
+        service.check(None, "signin", email="user@example.com")
+        service.check(None, "signin", email="user@example.com")
+        service.check(None, "signup", email="user@example.com")
+
+    def test_disabled_service_admits_everything(self, service):
+        service.enabled = False
+        for _ in range(10):
+            service.check(None, "signin", client_ip="1.1.1.1", email="user@example.com")
+
+
+class TestBucketPurge:
+    """Test cases for purging buckets idle long enough to have refilled"""
+
+    def test_purge_idle_uses_slowest_refill(self):
+        backend = InMemoryRateLimitBackend()
+        # Refills in 60s and 120s
+        service = RateLimitService(
+            backend, ip_rule=RateLimitRule("ip", 1, 1), email_rule=RateLimitRule("email", 2, 1)
+        )
+        backend.take(None, "old", 1, 1.0, 1, 1000.0)
+        backend.take(None, "recent", 1, 1.0, 1, 1100.0)
+
+        assert service.purge_idle(None, now=1200.0) == 1
+        assert backend.purge(None, 1200.0) == 1
+
+    def test_no_purge_when_a_rule_never_refills(self):
+        backend = InMemoryRateLimitBackend()
+        service = RateLimitService(backend, ip_rule=RateLimitRule("ip", 1, 0))
+        backend.take(None, "old", 1, 0.0, 1, 0.0)
+
+        assert service.purge_idle(None, now=1e9) == 0
+
+    def test_check_purges_once_per_interval(self, monkeypatch):
+        service = RateLimitService(InMemoryRateLimitBackend(), ip_rule=RateLimitRule("ip", 5, 60), purge_interval=60)
+        calls = []
+        monkeypatch.setattr(service, "purge_idle", lambda db, now=None: calls.append(now))
+
+        for i in range(3):
+            service.check(None, "signin", client_ip=f"10.0.0.{i}")
+
+        assert len(calls) == 1
+
+
+class TestBackendSelection:
+    """Test cases for choosing the bucket backend at startup"""
+
+    def test_database_backend_on_supported_dialect(self):
+        assert isinstance(_build_backend("database", "postgresql"), DatabaseRateLimitBackend)
+
+    def test_unsupported_dialect_falls_back_to_memory(self):
+        assert isinstance(_build_backend("database", "mssql"), InMemoryRateLimitBackend)
+
+    def test_memory_backend(self):
+        assert isinstance(_build_backend("memory", "postgresql"), InMemoryRateLimitBackend)
+
+
+class TestClientIp:
+    """Test cases for the client address used by the per-IP limit"""
+
+    @staticmethod
+    def _client_ip(monkeypatch, forwarded_for, trust=True, trusted_proxies=1):
+        snapshot = SimpleNamespace(rate_limit_trust_forwarded_for=trust, rate_limit_trusted_proxies=trusted_proxies)
+        monkeypatch.setattr(auth_module, "config_service", SimpleNamespace(snapshot=snapshot))
+        request = SimpleNamespace(
+            headers={"x-forwarded-for": forwarded_for} if forwarded_for else {},
+            client=SimpleNamespace(host="10.0.0.1")
+        )
+        return auth_module._client_ip(request)
+
+    def test_spoofed_leftmost_entry_is_ignored(self, monkeypatch):
+        assert self._client_ip(monkeypatch, "1.2.3.4, 203.0.113.7") == "203.0.113.7"
+
+    def test_entry_added_by_outermost_trusted_proxy(self, monkeypatch):
+        forwarded_for = "1.2.3.4, 203.0.113.7, 10.0.0.2"
+        assert self._client_ip(monkeypatch, forwarded_for, trusted_proxies=2) == "203.0.113.7"
+
+    def test_short_header_uses_leftmost_entry(self, monkeypatch):
+        assert self._client_ip(monkeypatch, "203.0.113.7", trusted_proxies=3) == "203.0.113.7"
+
+    def test_header_ignored_unless_trusted(self, monkeypatch):
+        assert self._client_ip(monkeypatch, "1.2.3.4", trust=False) == "10.0.0.1"
+        assert self._client_ip(monkeypatch, None) == "10.0.0.1"
+
+
+class TestRateLimitedEndpoints:
+    """Test cases for rate limiting on the auth endpoints"""
+
+    def test_signin_returns_429_with_retry_after(self, client, mock_cognito, monkeypatch):
+        monkeypatch.setattr(rate_limit_service, "email_rule", RateLimitRule("email", 1, 1))
+        payload = {"email": "limited@example.com", "password": "WrongPass123!"}
+
+        first = client.post("/api/v1/auth/signin", json=payload)
+        assert first.status_code != 429
+
+        second = client.post("/api/v1/auth/signin", json=payload)
+        assert second.status_code == 429
+        assert int(second.headers["Retry-After"]) >= 1
@@ -0,0 +1,119 @@
+"""
+Unit tests for the request logging context.
+"""
+import asyncio
+import io
+import json
+import sys
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.log_sampling import LogSampler
+from app.core.logging_service import LogConfig, Logger, LoggingService, logging_service, get_logger
+from app.core.request_context import (
+    RequestContext,
+    close_request_context,
+    current_request_context,
+    open_request_context,
+    set_user_sub,
+)
+from app.middlewaremiddleware.logging_middleware import RequestLoggingMiddleware
+
+
+class TestRequestContext:
+    """Test cases for the request context"""
+
+    def test_merge_keeps_bound_values_and_skips_unset_fields(self):
+        extra = {"request_id": "bound"}
+
+        RequestContext("abc", route="/users").merge_into(extra)
+
+        assert extra == {"request_id": "bound", "route": "/users"}
+
+    def test_open_and_close(self):
+        token = open_request_context("abc", "/users")
+        set_user_sub("sub-1")
+        context = current_request_context()
+        close_request_context(token)
+
+        assert (context.request_id, context.route, context.user_sub) == ("abc", "/users", "sub-1")
+        assert current_request_context() is None
+
+    def test_set_user_sub_outside_request_is_ignored(self):
+        set_user_sub("sub-1")
+
+        assert current_request_context() is None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_are_isolated(self):
+        async def handle(request_id: str) -> str:
+            token = open_request_context(request_id)
+            try:
+                await asyncio.sleep(0.01)
+                return current_request_context().request_id
+            finally:
+                close_request_context(token)
+
+        results = await asyncio.gather(*(handle(f"request-{i}") for i in range(20)))
+
+        assert results == [f"request-{i}" for i in range(20)]
+
+
+class TestRequestCorrelation:
+    """Test cases for request fields on records logged from any module"""
+
+    @pytest.fixture
+    def records(self):
+        buffer = io.StringIO()
+        original_stdout = sys.stdout
+        sys.stdout = buffer
+        try:
+            service = LoggingService(LogConfig(json_format=True))
+        finally:
+            sys.stdout = original_stdout
+
+        def read():
+            service.shutdown()
+            return [json.loads(line) for line in buffer.getvalue().splitlines()]
+
+        yield read
+        logging_service.update_config(logging_service.config)
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(RequestLoggingMiddleware, sampler=LogSampler())
+        service_logger = get_logger("app.services.example")
+
+        @app.get("/users/me")
+        def me():
+            service_logger.info("Looking up user")
+            set_user_sub("sub-42")
+            service_logger.warning("Found user")
+            return {"sub": "sub-42"}
+
+        return TestClient(app)
+
+    def test_records_from_all_modules_share_request_fields(self, client, records):
+        assert client.get("/users/me").status_code == 200
+        get_logger("after").warning("outside any request")
+
+        logged = records()
+        started, lookup, found, completed, after = logged
+
+        request_id = started["request_id"]
+        assert all(record["request_id"] == request_id for record in logged[:4])
+        assert all(record["route"] == "/users/me" for record in logged[:4])
+        assert "user_sub" not in lookup
+        assert found["user_sub"] == "sub-42"
+        assert completed["user_sub"] == "sub-42"
+        assert "request_id" not in after
+
+    def test_no_logger_bound_per_request(self, client, records, monkeypatch):
+        def fail_bind(self, **kwargs):
+            raise AssertionError("Logger.bind called while handling a request")
+
+        monkeypatch.setattr(Logger, "bind", fail_bind)
+
+        assert client.get("/users/me").status_code == 200
+        assert len(records()) == 4
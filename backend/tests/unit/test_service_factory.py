@@ -0,0 +1,56 @@
+"""
+Unit tests for the service container in service_factory.
+"""
+import pytest
+from app.core.service_factory import ServiceContainer
+from app.core.mock_jwt_utils import mock_jwt_validator
+from app.services.mock_cognito_service import mock_cognito_service
+
+
+class TestServiceContainer:
+    """Test cases for ServiceContainer"""
+
+    @pytest.fixture
+    def container(self, monkeypatch):
+        import app.core.service_factory as service_factory
+        monkeypatch.setattr(service_factory.config_service, "use_mock_cognito", lambda: True)
+        return ServiceContainer()
+
+    def test_resolves_mock_providers(self, container):
+        assert container.cognito_service is mock_cognito_service
+        assert container.jwt_validator is mock_jwt_validator
+
+    def test_configuration_read_only_once(self, container, monkeypatch):
+        import app.core.service_factory as service_factory
+        calls = []
+
+        def use_mock_cognito():
+            calls.append(1)
+            return True
+
+        monkeypatch.setattr(service_factory.config_service, "use_mock_cognito", use_mock_cognito)
+        for _ in range(5):
+            container.cognito_service
+            container.jwt_validator
+
+        assert len(calls) == 1
+
+    def test_override_and_reset(self, container):
+        fake_service = object()
+        fake_validator = object()
+
+        container.override(cognito_service=fake_service, jwt_validator=fake_validator)
+        assert container.cognito_service is fake_service
+        assert container.jwt_validator is fake_validator
+
+        container.reset()
+        assert container.cognito_service is mock_cognito_service
+        assert container.jwt_validator is mock_jwt_validator
+
+    def test_partial_override_keeps_other_provider(self, container):
+        fake_validator = object()
+
+        container.override(jwt_validator=fake_validator)
+
+        assert container.jwt_validator is fake_validator
+        assert container.cognito_service is mock_cognito_service
@@ -0,0 +1,94 @@
+"""
+Unit tests for SingleFlight request coalescing.
+"""
+import asyncio
+import pytest
+from app.utils.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test that callers with the same key await a single in-flight call"""
+        flight = SingleFlight("test", ttl_seconds=5)
+        calls = 0
+        release = asyncio.Event()
+
+        async def refresh():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return {"access_token": "new"}
+
+        waiters = [asyncio.ensure_future(flight.run("key", refresh)) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        assert calls == 1
+        assert all(result == {"access_token": "new"} for result in results)
+
+    @pytest.mark.asyncio
+    async def test_result_is_cached_for_ttl(self):
+        """Test that a recent result is reused, and recomputed after expiry"""
+        flight = SingleFlight("test", ttl_seconds=0.05)
+        calls = 0
+
+        async def refresh():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flight.run("key", refresh) == 1
+        assert await flight.run("key", refresh) == 1
+        assert await flight.run("other", refresh) == 2
+
+        await asyncio.sleep(0.06)
+        assert await flight.run("key", refresh) == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_are_shared_but_not_cached(self):
+        """Test that waiting callers see the error and the next call retries"""
+        flight = SingleFlight("test", ttl_seconds=5)
+        calls = 0
+        release = asyncio.Event()
+
+        async def failing():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            raise ValueError("refresh failed")
+
+        waiters = [asyncio.ensure_future(flight.run("key", failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+
+        with pytest.raises(ValueError):
+            await flight.run("key", failing)
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that cancelling one waiter leaves the shared call running"""
+        flight = SingleFlight("test", ttl_seconds=5)
+        release = asyncio.Event()
+
+        async def refresh():
+            await release.wait()
+            return "ok"
+
+        first = asyncio.ensure_future(flight.run("key", refresh))
+        second = asyncio.ensure_future(flight.run("key", refresh))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+
+        assert await second == "ok"
+        with pytest.raises(asyncio.CancelledError):
+            await first
@@ -0,0 +1,56 @@
+"""
+Unit tests for the startup profiling helpers.
+"""
+from app.utils.startup_profiler import StartupTimer, package_totals, parse_importtime
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   yaml.error
+import time:       300 |        420 | yaml
+import time:        50 |         50 |     app.core.metrics
+import time:       200 |        250 |   app.core
+import time:      1000 |       1670 | app
+"""
+
+
+class TestParseImporttime:
+    """Test cases for parse_importtime"""
+
+    def test_parses_module_times_and_depth(self):
+        timings = parse_importtime(IMPORTTIME_OUTPUT)
+
+        assert [t.module for t in timings] == ["yaml.error", "yaml", "app.core.metrics", "app.core", "app"]
+        assert timings[1].self_us == 300
+        assert timings[1].cumulative_us == 420
+        assert [t.depth for t in timings] == [1, 0, 2, 1, 0]
+
+    def test_package_totals_sum_self_time(self):
+        totals = package_totals(parse_importtime(IMPORTTIME_OUTPUT))
+
+        assert totals == {"app": 1250, "yaml": 420}
+        assert list(totals) == ["app", "yaml"]
+
+
+class TestStartupTimer:
+    """Test cases for StartupTimer"""
+
+    def test_records_phases_in_order(self):
+        timer = StartupTimer()
+
+        with timer.phase("init_db"):
+            pass
+        with timer.phase("resolve_services"):
+            pass
+
+        assert list(timer.phases) == ["init_db", "resolve_services"]
+        assert all(seconds >= 0 for seconds in timer.phases.values())
+
+    def test_failed_phase_is_still_recorded(self):
+        timer = StartupTimer()
+
+        try:
+            with timer.phase("init_db"):
+                raise RuntimeError("database down")
+        except RuntimeError:
+            pass
+
+        assert "init_db" in timer.phases
@@ -0,0 +1,132 @@
+"""
+Unit tests for the Bloom filter and TokenRevocationService.
+"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.crud.revoked_token import RevokedTokenDAO
+from app.services.token_revocation_service import TokenRevocationService
+from app.utils.bloom_filter import BloomFilter
+
+
+class CountingRevokedTokenDAO(RevokedTokenDAO):
+    """RevokedTokenDAO that counts point lookups against the store."""
+
+    def __init__(self):
+        self.lookups = 0
+        self.full_loads = 0
+
+    def is_revoked(self, db, token_hash, now):
+        self.lookups += 1
+        return super().is_revoked(db, token_hash, now)
+
+    def get_revoked_since(self, db, now, since=None):
+        if since is None:
+            self.full_loads += 1
+        return super().get_revoked_since(db, now, since=since)
+
+
+class TestBloomFilter:
+    """Test cases for BloomFilter"""
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        keys = [f"key-{i}" for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        assert all(key in bloom for key in keys)
+
+    def test_false_positive_rate_is_bounded(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"key-{i}")
+
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+
+    def test_saturation_and_clear(self):
+        bloom = BloomFilter(capacity=2)
+        bloom.add("a")
+        assert not bloom.is_saturated()
+        bloom.add("b")
+        assert bloom.is_saturated()
+
+        bloom.clear()
+        assert "a" not in bloom
+        assert bloom.count == 0
+
+
+class TestTokenRevocationService:
+    """Test cases for TokenRevocationService"""
+
+    @pytest.fixture
+    def dao(self):
+        return CountingRevokedTokenDAO()
+
+    @pytest.fixture
+    def service(self, dao):
+        return TokenRevocationService(dao, capacity=1000, sync_interval=60)
+
+    def test_unrevoked_token_skips_store(self, db, service, dao):
+        for i in range(50):
+            assert service.is_revoked(db, f"token-{i}") is False
+
+        assert dao.lookups == 0
+
+    def test_revoked_token_is_detected(self, db, service):
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+        service.revoke(db, "stolen-token", expires_at=expires_at)
+
+        assert service.is_revoked(db, "stolen-token") is True
+        assert service.is_revoked(db, "other-token") is False
+
+    def test_revocation_is_persisted_for_other_workers(self, db, service, dao):
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+        service.revoke(db, "stolen-token", expires_at=expires_at)
+
+        # A second worker has no recent entries and learns about it from the store
+        other_worker = TokenRevocationService(dao, capacity=1000, sync_interval=60)
+        assert other_worker.is_revoked(db, "stolen-token") is True
+        assert dao.lookups == 1
+
+    def test_late_committed_revocation_is_picked_up(self, db, service, dao):
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(minutes=5)
+        other_worker = TokenRevocationService(dao, capacity=1000, sync_interval=60)
+        service.revoke(db, "first-token", expires_at=expires_at)
+        assert other_worker.is_revoked(db, "first-token") is True
+
+        # Stamped before the other worker's sync watermark, but only committed now
+        dao.add(db, service.hash_token("slow-token"), expires_at, now - timedelta(seconds=10))
+        other_worker._next_sync = 0.0
+
+        assert other_worker.is_revoked(db, "slow-token") is True
+
+    def test_more_revocations_than_capacity(self, db, dao):
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(minutes=5)
+        for i in range(25):
+            dao.add(db, TokenRevocationService.hash_token(f"token-{i}"), expires_at, now)
+        service = TokenRevocationService(dao, capacity=10, sync_interval=60)
+
+        assert service.is_revoked(db, "token-0") is True
+        assert service._bloom.capacity >= 50
+        assert not service._bloom.is_saturated()
+
+        # Later syncs stay incremental instead of reloading the whole table
+        service._next_sync = 0.0
+        assert service.is_revoked(db, "token-24") is True
+        assert dao.full_loads == 1
+
+    def test_expired_tokens_are_not_recorded(self, db, service):
+        expires_at = datetime.now(timezone.utc) - timedelta(minutes=5)
+        service.revoke(db, "old-token", expires_at=expires_at)
+
+        assert service.is_revoked(db, "old-token") is False
+
+    def test_expiry_read_from_jwt_claims(self, service):
+        from jose import jwt as jose_jwt
+        exp = int((datetime.now(timezone.utc) + timedelta(minutes=10)).timestamp())
+        token = jose_jwt.encode({"sub": "user", "exp": exp}, "secret", algorithm="HS256")
+
+        assert int(service._token_expiry(token).timestamp()) == exp
@@ -0,0 +1,110 @@
+"""
+Unit tests for TTLStore and the token store shared by the mock auth services.
+"""
+import asyncio
+import time
+import pytest
+from app.core.mock_jwt_utils import MockCognitoJWTValidator
+from app.services.mock_cognito_service import MockCognitoService
+from app.utils.ttl_store import TTLStore
+
+
+class TestTTLStore:
+    """Test cases for TTLStore"""
+
+    def test_expired_entries_are_invisible_before_sweep(self):
+        store = TTLStore()
+        now = time.time()
+        store.set("live", 1, expires_at=now + 60)
+        store.set("expired", 2, expires_at=now - 1)
+
+        assert store.get("live") == 1
+        assert "live" in store
+        assert store.get("expired") is None
+        assert "expired" not in store
+        with pytest.raises(KeyError):
+            store["expired"]
+
+    def test_sweep_removes_only_expired_entries(self):
+        store = TTLStore()
+        now = time.time()
+        for i in range(10):
+            store.set(f"expired-{i}", i, expires_at=now - 1)
+        store.set("live", "value", ttl=60)
+
+        assert len(store) == 11
+        assert store.sweep() == 10
+        assert len(store) == 1
+        assert store["live"] == "value"
+
+    def test_overwritten_key_keeps_its_new_expiry(self):
+        store = TTLStore()
+        now = time.time()
+        store.set("key", "old", expires_at=now - 1)
+        store.set("key", "new", expires_at=now + 60)
+
+        assert store.sweep() == 0
+        assert store["key"] == "new"
+
+    def test_max_size_evicts_soonest_to_expire(self):
+        store = TTLStore(max_size=3)
+        now = time.time()
+        store.set("late", 1, expires_at=now + 300)
+        store.set("soon", 2, expires_at=now + 10)
+        store.set("middle", 3, expires_at=now + 100)
+        store.set("new", 4, expires_at=now + 200)
+
+        assert len(store) == 3
+        assert "soon" not in store
+        assert all(key in store for key in ("late", "middle", "new"))
+
+    def test_heap_is_compacted_after_many_overwrites(self):
+        store = TTLStore()
+        for _ in range(1000):
+            store.set("key", "value", ttl=60)
+
+        assert len(store) == 1
+        assert len(store._heap) <= 2 * len(store) + 65
+
+    def test_pop_and_delete(self):
+        store = TTLStore()
+        store["a"] = 1
+        store["b"] = 2
+
+        assert store.pop("a") == 1
+        assert store.pop("a") is None
+        del store["b"]
+        assert len(store) == 0
+
+    @pytest.mark.asyncio
+    async def test_background_sweeper(self):
+        store = TTLStore()
+        store.set("expired", 1, expires_at=time.time() - 1)
+
+        store.start_sweeper(interval=0.01)
+        try:
+            await asyncio.sleep(0.05)
+            assert len(store) == 0
+        finally:
+            store.stop_sweeper()
+
+
+class TestSharedMockTokenStore:
+    """Test cases for the store shared by MockCognitoService and MockCognitoJWTValidator"""
+
+    @pytest.mark.asyncio
+    async def test_tokens_issued_by_service_are_known_to_validator(self, db, test_user, mock_cognito):
+        store = TTLStore()
+        service = MockCognitoService(token_store=store)
+        validator = MockCognitoJWTValidator(token_store=store)
+
+        tokens = await service.sign_in("test@example.com", "TestPassword123!")
+
+        assert len(store) == 2
+        token_data = validator.validate_token(tokens["access_token"])
+        assert token_data.user_sub == test_user["user_sub"]
+        assert token_data.username == "test@example.com"
+
+        validator.clear_all_tokens()
+        with pytest.raises(Exception):
+            service.validate_token(tokens["access_token"])
@@ -1,6 +1,8 @@
 """
 Unit tests for UserDAO to verify proper database operations and Pydantic object returns.
 """
+import pytest
+from app.core.exceptions import UserAlreadyExistsError
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.models.user import UserRole
 
@@ -140,3 +142,110 @@ def test_second_user_is_regular_user(db, user_dao):
     
     # Second user should be regular user
     assert result.role == UserRole.USER
+
+
+def test_get_by_principal_prefers_cognito_sub(db, user_dao):
+    """Test that a Cognito sub match wins over a username match."""
+    by_username = user_dao.create(db, obj_in=UserCreate(
+        username="shared-name",
+        email="byname@example.com"
+    ))
+    by_sub = user_dao.create(db, obj_in=UserCreate(
+        username="other-name",
+        email="bysub@example.com",
+        cognito_sub="principal-sub"
+    ))
+
+    result = user_dao.get_by_principal(db, cognito_sub="principal-sub", username="shared-name")
+    assert result.id == by_sub.id
+
+    result = user_dao.get_by_principal(db, cognito_sub="unknown-sub", username="shared-name")
+    assert result.id == by_username.id
+
+    assert user_dao.get_by_principal(db, cognito_sub="unknown-sub", username="unknown") is None
+    assert user_dao.get_by_principal(db) is None
+
+
+def test_backfill_cognito_sub_only_fills_missing(db, user_dao):
+    """Test that backfill sets a missing Cognito sub but never overwrites one."""
+    legacy = user_dao.create(db, obj_in=UserCreate(
+        username="legacy",
+        email="legacy@example.com"
+    ))
+
+    assert user_dao.backfill_cognito_sub(db, legacy.id, "new-sub") is True
+    assert user_dao.get_by_cognito_sub(db, "new-sub").id == legacy.id
+
+    assert user_dao.backfill_cognito_sub(db, legacy.id, "another-sub") is False
+    assert user_dao.get(db, legacy.id).cognito_sub == "new-sub"
+
+
+def test_upsert_from_identity_creates_first_user_as_admin(db, user_dao):
+    """Test that upserting an unknown identity creates the user, first one as admin."""
+    first = user_dao.upsert_from_identity(
+        db, email="first@example.com", cognito_sub="sub-first", full_name="First User"
+    )
+    second = user_dao.upsert_from_identity(
+        db, email="second@example.com", cognito_sub="sub-second", username="second"
+    )
+
+    assert first.username == "first@example.com"
+    assert first.full_name == "First User"
+    assert first.cognito_sub == "sub-first"
+    assert first.role == UserRole.ADMIN
+    assert second.username == "second"
+    assert second.role == UserRole.USER
+
+
+def test_upsert_from_identity_links_existing_email(db, user_dao):
+    """Test that an existing user matched by email is linked to the identity."""
+    existing = user_dao.create(db, obj_in=UserCreate(
+        username="existing",
+        email="existing@example.com",
+        full_name="Existing User"
+    ))
+
+    result = user_dao.upsert_from_identity(
+        db, email="existing@example.com", cognito_sub="sub-existing", full_name="Other Name"
+    )
+
+    assert result.id == existing.id
+    assert result.username == "existing"
+    assert result.full_name == "Existing User"
+    assert result.cognito_sub == "sub-existing"
+
+    # Signing in again is idempotent
+    again = user_dao.upsert_from_identity(db, email="existing@example.com", cognito_sub="sub-existing")
+    assert again.id == existing.id
+
+
+def test_upsert_from_identity_with_username_owned_by_other_email(db, user_dao):
+    """Test that a username taken by another user raises a conflict instead of an IntegrityError."""
+    owner = user_dao.create(db, obj_in=UserCreate(username="taken", email="owner@example.com"))
+
+    with pytest.raises(UserAlreadyExistsError) as exc_info:
+        user_dao.upsert_from_identity(db, email="new@example.com", cognito_sub="sub-new", username="taken")
+
+    assert exc_info.value.field == "username"
+    assert user_dao.get_by_email(db, "new@example.com") is None
+    assert user_dao.get(db, owner.id).cognito_sub is None
+
+
+def test_upsert_fallback_with_username_owned_by_other_email(db, user_dao):
+    """Test that the multi-statement upsert reports a username conflict the same way."""
+    user_dao.create(db, obj_in=UserCreate(username="taken", email="owner@example.com"))
+
+    with pytest.raises(UserAlreadyExistsError):
+        user_dao._upsert_from_identity_fallback(
+            db, email="new@example.com", cognito_sub="sub-new", username="taken"
+        )
+
+
+def test_upsert_from_identity_with_sub_owned_by_other_email(db, user_dao):
+    """Test that a sub already linked to a different email returns that user."""
+    owner = user_dao.upsert_from_identity(db, email="old@example.com", cognito_sub="sub-moved")
+
+    result = user_dao.upsert_from_identity(db, email="new@example.com", cognito_sub="sub-moved")
+
+    assert result.id == owner.id
+    assert user_dao.get_by_email(db, "new@example.com") is None